@@ -0,0 +1,47 @@
+"""
+Gunicorn settings, read automatically from the working directory
+(``gunicorn lms_platform.wsgi:application``).
+
+The app is preloaded in the master and warmed before workers are forked
+(see lms_platform/core/startup.py); set GUNICORN_PRELOAD=false to load it in
+each worker instead, e.g. for code reloading in development.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+
+def on_starting(server):
+    """Counters restart with the server; drop the previous run's per-worker files"""
+    from lms_platform.settings import METRICS_DIR
+
+    if METRICS_DIR and os.path.isdir(METRICS_DIR):
+        for name in os.listdir(METRICS_DIR):
+            if name.endswith('.json'):
+                os.remove(os.path.join(METRICS_DIR, name))
+
+
+def when_ready(server):
+    """Master is up; with preloading, warm once here before any fork"""
+    if server.cfg.preload_app:
+        from lms_platform.core import startup
+
+        timings = startup.warm()
+        server.log.info('Warmed app in master: %s', ', '.join(f'{k} {v:.0f} ms' for k, v in timings.items()))
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        from lms_platform.core import startup
+
+        startup.prepare_fork()
+
+
+def post_worker_init(worker):
+    """Without preloading, each worker warms itself before taking requests"""
+    if not worker.cfg.preload_app:
+        from lms_platform.core import startup
+
+        startup.warm()
@@ -2,8 +2,20 @@ from django.contrib import admin
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
-from .models import UserProfile, Course, Module, Assignment, Enrollment, Submission
+from .models import (
+    UserProfile, Course, Module, Assignment, Enrollment, Submission, BackgroundTask,
+    DeadlineExtension, ArchivedEnrollment,
+)
+from . import dashboard, enrollment as seats, metrics, revisions, similarity
+from .autograde import normalize_key
+from .changelists import LargeTableAdminMixin
+from .deadlines import reclassify
+from .demo import is_demo
+from .rollover import rollover_courses
+from .tasks import index_submission_similarity, reclassify_late_submissions, regrade_assignment
+from .templatetags.avatars import avatar
 from django import forms
+from django.contrib.admin.helpers import ActionForm
 
 # Import the UserAdmin from Django's auth module to customize the User model admin
 from django.contrib.auth.admin import UserAdmin
@@ -13,6 +25,16 @@ from django.contrib import messages
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 
+# For transcript views on the custom admin site
+from django.core.exceptions import PermissionDenied
+from django.db.models import Exists, OuterRef, Q
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils.html import format_html, format_html_join
+from . import transcripts
+
 
 class LMSAdminSite(admin.AdminSite):
     """
@@ -28,71 +50,110 @@ class LMSAdminSite(admin.AdminSite):
         """
         extra_context = extra_context or {}
         
-        # Get real counts from the database
+        # Counts come from the cached metrics gauges (a few seconds old at most)
+        gauges = metrics.get_gauges()
         extra_context.update({
             # User counts
-            'total_users': User.objects.count(),
-            'total_profiles': UserProfile.objects.count(),
-            'students_count': UserProfile.objects.filter(role='student').count(),
-            'instructors_count': UserProfile.objects.filter(role='instructor').count(),
-            'admins_count': UserProfile.objects.filter(role='admin').count(),
+            'total_users': gauges['users']['total'],
+            'total_profiles': gauges['profiles']['total'],
+            'students_count': gauges['profiles']['students'],
+            'instructors_count': gauges['profiles']['instructors'],
+            'admins_count': gauges['profiles']['admins'],
             
             # Academic content counts
-            'total_courses': Course.objects.count(),
-            'total_modules': Module.objects.count(),
-            'total_assignments': Assignment.objects.count(),
+            'total_courses': gauges['courses']['total'],
+            'total_modules': gauges['modules']['total'],
+            'total_assignments': gauges['assignments']['total'],
             
             # Activity counts
-            'total_enrollments': Enrollment.objects.count(),
-            'active_enrollments': Enrollment.objects.filter(status='active').count(),
-            'total_submissions': Submission.objects.count(),
-            'graded_submissions': Submission.objects.filter(status='graded').count(),
-            'pending_submissions': Submission.objects.filter(status='submitted').count(),
+            'total_enrollments': gauges['enrollments']['total'],
+            'active_enrollments': gauges['enrollments']['active'],
+            'total_submissions': gauges['submissions']['total'],
+            'graded_submissions': gauges['submissions']['graded'],
+            'pending_submissions': gauges['submissions']['pending'],
             
             # Recent activity (last 7 days)
-            'recent_enrollments': Enrollment.objects.filter(
-                enrollment_date__gte=timezone.now() - timedelta(days=7)
-            ).count(),
+            'recent_enrollments': gauges['enrollments']['recent'],
         })
         
         return super().index(request, extra_context)
 
+    def login(self, request, extra_context=None):
+        """Admin login that answers throttled attempts with 429 and Retry-After"""
+        response = super().login(request, extra_context)
+        if getattr(request, 'login_retry_after', None):
+            response.status_code = 429
+            response['Retry-After'] = request.login_retry_after
+        return response
+
+    def get_urls(self):
+        urls = [
+            path('transcripts/', self.admin_view(self.transcripts_view), name='transcripts'),
+            path('transcripts/export.csv', self.admin_view(self.transcript_export_view), name='transcript_export'),
+            path('transcripts/<int:user_id>/', self.admin_view(self.transcript_view), name='transcript'),
+        ]
+        return urls + super().get_urls()
+
+    def transcripts_view(self, request):
+        """Search students and export transcripts in bulk"""
+        if not request.user.has_perm('core.view_enrollment'):
+            raise PermissionDenied
+        query = request.GET.get('q', '').strip()
+        students = User.objects.none()
+        if query:
+            students = User.objects.filter(
+                Q(username__icontains=query) | Q(first_name__icontains=query) | Q(last_name__icontains=query),
+                Exists(Enrollment.objects.filter(student=OuterRef('pk'), status='completed'))
+                | Exists(ArchivedEnrollment.objects.filter(student=OuterRef('pk'))),
+            ).order_by('username')[:50]
+        context = {
+            **self.each_context(request),
+            'title': 'Transcripts',
+            'query': query,
+            'students': students,
+            'terms': Course.objects.order_by('term').values_list('term', flat=True).distinct(),
+        }
+        return TemplateResponse(request, 'admin/transcripts.html', context)
+
+    def transcript_view(self, request, user_id):
+        """One student's transcript with cumulative GPA"""
+        if not request.user.has_perm('core.view_enrollment'):
+            raise PermissionDenied
+        student = get_object_or_404(User, pk=user_id)
+        context = {
+            **self.each_context(request),
+            'title': f'Transcript: {student.get_full_name() or student.username}',
+            'student': student,
+            'transcript': transcripts.get_transcript(student.pk),
+        }
+        return TemplateResponse(request, 'admin/transcript.html', context)
 
-# Create our custom admin site instance
-admin_site = LMSAdminSite(name='lms_admin')
-
-
-class CourseAdmin(admin.ModelAdmin):
-    """ Custom admin for Course model to filter instructors """
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == "instructor":
-            # Only show users who have instructor role
-            instructor_profiles = UserProfile.objects.filter(role='instructor')
-            instructor_users = [profile.user.id for profile in instructor_profiles]
-            kwargs["queryset"] = User.objects.filter(id__in=instructor_users)
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
-
-
-class EnrollmentAdmin(admin.ModelAdmin):
-    """ Custom admin for Enrollment model to filter students """
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == "student":
-            # Only show users who have student role
-            student_profiles = UserProfile.objects.filter(role='student')
-            student_users = [profile.user.id for profile in student_profiles]
-            kwargs["queryset"] = User.objects.filter(id__in=student_users)
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    def transcript_export_view(self, request):
+        """
+        Stream transcripts as CSV for every student with completed training
+        in a department (course code prefix, e.g. SAFE) and/or term.
+        """
+        if not request.user.has_perm('core.view_enrollment'):
+            raise PermissionDenied
+        enrollments = transcripts.completed_enrollments()
+        archived = ArchivedEnrollment.objects.all()
+        department = request.GET.get('department', '').strip()
+        term = request.GET.get('term', '').strip()
+        if department:
+            enrollments = enrollments.filter(course__course_code__istartswith=department)
+            archived = archived.filter(course_code__istartswith=department)
+        if term:
+            enrollments = enrollments.filter(term=term)
+            archived = archived.filter(term=term)
+
+        response = StreamingHttpResponse(transcripts.export_rows(enrollments, archived), content_type='text/csv')
+        filename = '-'.join(filter(None, ['transcripts', department, term])).replace(' ', '_')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
 
 
-class SubmissionAdmin(admin.ModelAdmin):
-    """ Custom admin for Submission model to filter students """
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == "student":
-            # Only show users who have student role
-            student_profiles = UserProfile.objects.filter(role='student')
-            student_users = [profile.user.id for profile in student_profiles]
-            kwargs["queryset"] = User.objects.filter(id__in=student_users)
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+# Create our custom admin site instance
+admin_site = LMSAdminSite(name='lms_admin')
 
 
 class AssignmentAdminForm(forms.ModelForm):
@@ -123,18 +184,21 @@ class AssignmentAdminForm(forms.ModelForm):
             ),
         }
 
-
-class AssignmentAdmin(admin.ModelAdmin):
-    form = AssignmentAdminForm
-    list_display = ['assignment_name', 'module', 'due_date', 'max_points', 'assignment_type']
-    list_filter = ['assignment_type', 'due_date', 'module__course']
-    search_fields = ['assignment_name', 'description']
+    def clean_answer_key(self):
+        answer_key = self.cleaned_data.get('answer_key')
+        if answer_key:
+            try:
+                normalize_key(answer_key)
+            except ValueError as error:
+                raise forms.ValidationError(str(error))
+        return answer_key
 
 
-# Custom mixin to restrict demo user actions
+# Demo users get full access in the admin; DemoModeMiddleware rolls back
+# everything they do (see core/demo.py)
 class DemoUserMixin:
     """
-    Mixin to allow demo users full visual access but prevent actual changes
+    Mixin to allow demo users full visual access to every admin form and action
     """
     
     def has_add_permission(self, request):
@@ -145,92 +209,53 @@ class DemoUserMixin:
     
     def has_delete_permission(self, request, obj=None):
         return True
-    
-    def save_model(self, request, obj, form, change):
-        """Prevent demo users from saving any data"""
-        if request.user.username == 'PortfolioDemo':
-            return  # Don't save anything for demo users
-        super().save_model(request, obj, form, change)
-    
-    def delete_model(self, request, obj):
-        """Prevent demo users from deleting data"""
-        if request.user.username == 'PortfolioDemo':
-            return  # Don't delete anything for demo users
-        super().delete_model(request, obj)
-    
-    def delete_queryset(self, request, queryset):
-        """Prevent demo users from bulk deleting data"""
-        if request.user.username == 'PortfolioDemo':
-            return  # Don't delete anything for demo users
-        super().delete_queryset(request, queryset)
-    
-    def response_add(self, request, obj, post_url_continue=None):
-        """Handle demo user add responses"""
-        if request.user.username == 'PortfolioDemo':
-            messages.success(
-                request,
-                f'Demo Mode: {self.model._meta.verbose_name} would have been created successfully! '
-                f'The form validation and interface work perfectly, but no actual data was modified for this demonstration.'
-            )
-            return HttpResponseRedirect(
-                reverse(f'admin:{self.model._meta.app_label}_{self.model._meta.model_name}_changelist')
-            )
-        return super().response_add(request, obj, post_url_continue)
-    
-    def response_change(self, request, obj):
-        """Handle demo user change responses"""
-        if request.user.username == 'PortfolioDemo':
-            messages.success(
-                request,
-                f'Demo Mode: {self.model._meta.verbose_name} would have been updated successfully! '
-                f'The form validation and interface work perfectly, but no actual data was modified for this demonstration.'
-            )
-            return HttpResponseRedirect(
-                reverse(f'admin:{self.model._meta.app_label}_{self.model._meta.model_name}_changelist')
-            )
-        return super().response_change(request, obj)
-    
-    def delete_view(self, request, object_id, extra_context=None):
-        """Override delete view for demo users"""
-        if request.user.username == 'PortfolioDemo':
-            messages.success(
-                request,
-                f'Demo Mode: {self.model._meta.verbose_name} would have been deleted successfully! '
-                f'The delete process works perfectly, but no actual data was removed for this demonstration.'
-            )
-            return HttpResponseRedirect(
-                reverse(f'admin:{self.model._meta.app_label}_{self.model._meta.model_name}_changelist')
-            )
-        return super().delete_view(request, object_id, extra_context)
-    
-    def get_actions(self, request):
-        """Override bulk actions for demo users"""
-        actions = super().get_actions(request)
-        if request.user.username == 'PortfolioDemo':
-            # Remove the delete action for demo users but keep others for demonstration
-            if 'delete_selected' in actions:
-                actions['delete_selected'] = (
-                    self._demo_delete_selected,
-                    'delete_selected',
-                    'Delete selected %(verbose_name_plural)s'
-                )
-        return actions
-    
-    def _demo_delete_selected(self, request, queryset):
-        """Demo-safe bulk delete action"""
+
+
+class CourseActionForm(ActionForm):
+    """ Extra inputs shown next to the action dropdown, used by the rollover action """
+    new_term = forms.CharField(required=False, label='New term', max_length=50)
+    shift_days = forms.IntegerField(required=False, label='Shift due dates (days)', initial=0)
+
+
+# Update existing admin classes to use the mixin
+class CourseAdmin(DemoUserMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    """ Custom admin for Course model to filter instructors """
+    list_display = ['course_code', 'course_name', 'term', 'instructor', 'enrolled_count', 'max_enrollment']
+    list_select_related = ['instructor']
+    list_filter = ['term']
+    search_fields = ['course_code', 'course_name']
+    readonly_fields = ['enrolled_count']
+    action_form = CourseActionForm
+    actions = ['rollover_to_new_term']
+
+    @admin.action(description='Roll selected courses into a new term')
+    def rollover_to_new_term(self, request, queryset):
+        new_term = request.POST.get('new_term', '').strip()
+        try:
+            shift_days = int(request.POST.get('shift_days') or 0)
+        except ValueError:
+            shift_days = None
+        if not new_term or shift_days is None:
+            messages.error(request, 'Enter the new term and a whole number of days to shift due dates by.')
+            return
+        new_courses, duplicates = rollover_courses(queryset, new_term, timedelta(days=shift_days))
         messages.success(
             request,
-            f'Demo Mode: {queryset.count()} {self.model._meta.verbose_name_plural} would have been deleted successfully! '
-            f'The bulk delete process works perfectly, but no actual data was removed for this demonstration.'
-        )
-        return HttpResponseRedirect(
-            reverse(f'admin:{self.model._meta.app_label}_{self.model._meta.model_name}_changelist')
+            f'Copied {len(new_courses)} course(s) with their modules and assignments into {new_term}.'
         )
+        if duplicates:
+            messages.warning(
+                request,
+                'Skipped (same course code selected from a later term): '
+                + ', '.join(str(course) for course in duplicates)
+            )
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'max_enrollment' in form.changed_data:
+            # Extra seats go straight to the waitlist
+            seats.promote_waitlisted(obj.pk)
 
-# Update existing admin classes to use the mixin
-class CourseAdmin(DemoUserMixin, admin.ModelAdmin):
-    """ Custom admin for Course model to filter instructors """
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "instructor":
             # Only show users who have instructor role
@@ -240,8 +265,20 @@ class CourseAdmin(DemoUserMixin, admin.ModelAdmin):
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
-class EnrollmentAdmin(DemoUserMixin, admin.ModelAdmin):
+class EnrollmentAdmin(DemoUserMixin, LargeTableAdminMixin, admin.ModelAdmin):
     """ Custom admin for Enrollment model to filter students """
+    list_display = ['student', 'course', 'status', 'enrollment_date']
+    list_filter = ['status']
+    list_select_related = ['student', 'course']
+    search_fields = ['student__username', 'course__course_code']
+    actions = ['drop_enrollments']
+
+    @admin.action(description='Drop selected enrollments (promotes the waitlist)')
+    def drop_enrollments(self, request, queryset):
+        dropped = sum(seats.drop(enrollment) for enrollment in queryset.exclude(status='dropped'))
+        transcripts.invalidate(queryset.values_list('student_id', flat=True))
+        messages.success(request, f'Dropped {dropped} enrollment(s).')
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "student":
             # Only show users who have student role
@@ -250,9 +287,104 @@ class EnrollmentAdmin(DemoUserMixin, admin.ModelAdmin):
             kwargs["queryset"] = User.objects.filter(id__in=student_users)
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        transcripts.invalidate([obj.student_id])
+        if not change and obj.status == 'waitlisted':
+            messages.warning(request, f'{obj.course} is full; {obj.student} was added to the waitlist.')
+        if change and {'status', 'course'} & set(form.changed_data):
+            # Hand edits bypass seat allocation, so resync the affected courses
+            seats.recount([obj.course_id, form.initial.get('course')])
 
-class SubmissionAdmin(DemoUserMixin, admin.ModelAdmin):
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        transcripts.invalidate([obj.student_id])
+        seats.recount([obj.course_id])
+
+    def delete_queryset(self, request, queryset):
+        course_ids = set(queryset.values_list('course_id', flat=True))
+        super().delete_queryset(request, queryset)
+        seats.recount(course_ids)
+
+
+class SubmissionAdmin(DemoUserMixin, LargeTableAdminMixin, admin.ModelAdmin):
     """ Custom admin for Submission model to filter students """
+    list_display = ['student', 'assignment', 'status', 'is_late', 'submission_date', 'grade']
+    list_filter = ['status', 'is_late']
+    list_select_related = ['student', 'assignment__module__course']
+    readonly_fields = ['is_late', 'revision_history', 'similar_submissions']
+
+    @admin.display(description='Similar submissions')
+    def similar_submissions(self, obj):
+        if obj.pk is None:
+            return '-'
+        matches = similarity.similar_to(obj)
+        if not matches:
+            return 'No similar submissions found.'
+        return format_html_join(
+            format_html('<br>'), '<a href="{}">{}</a> &ndash; {} ({}, {}%)',
+            (
+                (
+                    reverse(f'{self.admin_site.name}:core_submission_change', args=[other.pk]),
+                    other.student.username,
+                    other.assignment.assignment_name,
+                    other.assignment.module.course,
+                    round(score * 100),
+                )
+                for other, score in matches
+            ),
+        )
+
+    @admin.display(description='Revisions')
+    def revision_history(self, obj):
+        if obj.pk is None:
+            return '-'
+        count = obj.revisions.count()
+        url = reverse(f'{self.admin_site.name}:core_submission_revisions', args=[obj.pk])
+        return format_html('<a href="{}">{} version(s) &ndash; compare</a>', url, count)
+
+    def get_urls(self):
+        urls = [
+            path(
+                '<path:object_id>/revisions/',
+                self.admin_site.admin_view(self.revisions_view),
+                name='core_submission_revisions',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def revisions_view(self, request, object_id):
+        """Version list for one submission with a diff between two versions"""
+        submission = self.get_object(request, object_id)
+        if submission is None or not self.has_view_permission(request, submission):
+            raise PermissionDenied
+        versions = list(submission.revisions.defer('data').order_by('number'))
+        latest = versions[-1].number if versions else 0
+        try:
+            new = int(request.GET.get('new', latest))
+            old = int(request.GET.get('old', new - 1))
+        except ValueError:
+            new, old = latest, latest - 1
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Revisions: {submission}',
+            'submission': submission,
+            'versions': versions,
+            'old': old,
+            'new': new,
+            'diff': revisions.diff(submission.pk, old, new) if old >= 1 and new > old else [],
+            'text': revisions.reconstruct(submission.pk, new) if new else '',
+            'opts': self.model._meta,
+        }
+        return TemplateResponse(request, 'admin/submission_revisions.html', context)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        dashboard.invalidate([obj.student_id])
+        if {'submission_content', 'file_upload'} & set(form.changed_data):
+            revisions.record(obj.pk, obj.submission_content, obj.file_upload.name or '')
+            index_submission_similarity.enqueue([obj.pk])
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "student":
             # Only show users who have student role
@@ -261,40 +393,91 @@ class SubmissionAdmin(DemoUserMixin, admin.ModelAdmin):
             kwargs["queryset"] = User.objects.filter(id__in=student_users)
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        dashboard.invalidate([obj.student_id])
 
-class AssignmentAdmin(DemoUserMixin, admin.ModelAdmin):
+
+class AssignmentAdmin(DemoUserMixin, LargeTableAdminMixin, admin.ModelAdmin):
     form = AssignmentAdminForm
     list_display = ['assignment_name', 'module', 'due_date', 'max_points', 'assignment_type']
+    list_select_related = ['module__course']
     list_filter = ['assignment_type', 'due_date', 'module__course']
     search_fields = ['assignment_name', 'description']
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and {'due_date', 'grace_period'} & set(form.changed_data):
+            # Existing submissions may have become (or stopped being) late
+            reclassify_late_submissions.enqueue([obj.pk])
+        if {'answer_key', 'max_points', 'assignment_type'} & set(form.changed_data):
+            regrade_assignment.enqueue(obj.pk)
+
+
+class DeadlineExtensionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """ Per-student deadline extensions; saving one reclassifies that submission """
+    list_display = ['student', 'assignment', 'due_date', 'granted_by', 'created_at']
+    search_fields = ['student__username', 'assignment__assignment_name']
+    raw_id_fields = ['student', 'assignment']
+    exclude = ['granted_by']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.granted_by = request.user
+        super().save_model(request, obj, form, change)
+        self._reclassify(obj)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._reclassify(obj)
+
+    def _reclassify(self, extension):
+        reclassify(Submission.objects.filter(
+            student_id=extension.student_id, assignment_id=extension.assignment_id
+        ))
+
 
 # Add mixin to other admin classes
-class UserProfileAdmin(DemoUserMixin, admin.ModelAdmin):
-    pass
+class UserProfileAdmin(DemoUserMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ['picture', '__str__', 'role']
+    list_filter = ['role']
+
+    @admin.display(description='Picture')
+    def picture(self, obj):
+        # Small thumbnail instead of the full-size upload
+        return avatar(obj, 'thumb')
 
 
-class ModuleAdmin(DemoUserMixin, admin.ModelAdmin):
+class ModuleAdmin(DemoUserMixin, LargeTableAdminMixin, admin.ModelAdmin):
     pass
 
 
 
-# Register models with both the default admin and our custom admin
-# Default admin (keep existing functionality)
-admin.site.register(UserProfile, UserProfileAdmin)
-admin.site.register(Course, CourseAdmin)
-admin.site.register(Module, ModuleAdmin)
-admin.site.register(Assignment, AssignmentAdmin)
-admin.site.register(Enrollment, EnrollmentAdmin)
-admin.site.register(Submission, SubmissionAdmin)
+class BackgroundTaskAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """ Read-mostly view of the background task queue """
+    list_display = ['name', 'status', 'priority', 'attempts', 'run_at', 'finished_at']
+    list_filter = ['status', 'name']
+    readonly_fields = ['locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at']
+    actions = ['retry_tasks']
+
+    @admin.action(description='Retry selected tasks now')
+    def retry_tasks(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='queued', run_at=timezone.now(), attempts=0, locked_by='', locked_at=None
+        )
+        messages.success(request, f'{updated} task(s) queued for retry.')
+
 
-# Custom admin with dashboard data AND demo user restrictions
+# Register models with the custom admin (dashboard data and demo user restrictions).
+# It is the only admin mounted in urls.py; django.contrib.admin.site is unused.
 admin_site.register(UserProfile, UserProfileAdmin)
 admin_site.register(Course, CourseAdmin)
 admin_site.register(Module, ModuleAdmin)
 admin_site.register(Assignment, AssignmentAdmin)
 admin_site.register(Enrollment, EnrollmentAdmin)
 admin_site.register(Submission, SubmissionAdmin)
+admin_site.register(BackgroundTask, BackgroundTaskAdmin)
+admin_site.register(DeadlineExtension, DeadlineExtensionAdmin)
 
 # Register Django's built-in User model with demo restrictions
 from django.contrib.auth.admin import UserAdmin
@@ -332,7 +515,7 @@ class DemoUserAdmin(DemoUserMixin, UserAdmin):
         # Get the default readonly fields from parent class
         readonly_fields = list(super().get_readonly_fields(request, obj))
         
-        if obj and obj.username == 'PortfolioDemo':
+        if obj and is_demo(obj):
             # For demo users, make more fields readonly
             readonly_fields.extend(['username', 'is_staff', 'is_superuser'])
         
@@ -342,7 +525,7 @@ class DemoUserAdmin(DemoUserMixin, UserAdmin):
         """Override password change view to block demo users"""
         try:
             user = self.get_object(request, id)
-            if user and user.username == 'PortfolioDemo':
+            if user and is_demo(user):
                 messages.error(
                     request, 
                     'Password changes are disabled for the demo account.'
@@ -366,19 +549,16 @@ class DemoUserAdmin(DemoUserMixin, UserAdmin):
                     # Django checks for this specific context variable
                     # Show password change for superusers, but not for demo users
                     extra_context['has_change_password_permission'] = (
-                        user.username != 'PortfolioDemo' and
+                        not is_demo(user) and
                         request.user.is_superuser and
                         self.has_change_permission(request, user)
                     )
                     # Also set show_password_fields to True for non-demo users
-                    extra_context['show_password_fields'] = user.username != 'PortfolioDemo'
+                    extra_context['show_password_fields'] = not is_demo(user)
             except:
                 extra_context['has_change_password_permission'] = False
                 extra_context['show_password_fields'] = False
                 
         return super().change_view(request, object_id, form_url, extra_context)
 
-# Register with both admin sites to ensure password functionality works
-admin.site.unregister(User)  # Unregister the default User admin first
-admin.site.register(User, DemoUserAdmin)
 admin_site.register(User, DemoUserAdmin)
\ No newline at end of file
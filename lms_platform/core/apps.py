@@ -3,4 +3,13 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'lms_platform.core'
\ No newline at end of file
+    name = 'lms_platform.core'
+
+    def ready(self):
+        # Register background tasks with the queue
+        from . import tasks  # noqa: F401
+
+        from django.conf import settings
+        if settings.TEMPLATE_SLOW_RENDER_MS:
+            from . import templating
+            templating.instrument()
@@ -0,0 +1,119 @@
+"""
+Archiving closed terms.
+
+archive_term() writes a term's enrollments, submissions and submission
+revisions to gzipped CSV files in a directory of settings.ARCHIVE_ROOT, then
+removes them from the database: on PostgreSQL by detaching and dropping the
+term's partitions (core.partitions), elsewhere with plain deletes. The
+transcript columns of its completed enrollments stay behind as
+ArchivedEnrollment rows, so transcripts and cumulative GPAs read exactly
+as before (core.transcripts). Everything happens in one transaction, and
+the files are complete on disk before a single row is removed.
+
+Each file has a header row of column names and writes NULL as \\N, so
+PostgreSQL can load it back with
+``COPY ... FROM PROGRAM 'gzip -dc FILE' WITH (FORMAT csv, HEADER, NULL '\\N')``.
+Similarity signatures and buckets are dropped rather than archived; they
+are rebuilt from the text.
+"""
+import csv
+import gzip
+import hashlib
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils.text import slugify
+
+from . import partitions, transcripts
+from .models import (
+    ArchivedEnrollment, ArchivedTerm, Enrollment, SimilarityBucket, Submission, SubmissionRevision,
+    SubmissionSignature,
+)
+
+NULL = '\\N'
+
+# Finalized terms have none of these left (see core.grading.finalize_term)
+OPEN_STATUSES = ['active', 'waitlisted']
+
+
+def directory_name(term):
+    """Archive directory for ``term``: a readable slug plus a hash, as terms are free text"""
+    digest = hashlib.blake2b(term.encode(), digest_size=4).hexdigest()
+    return f"{slugify(term)}-{digest}"
+
+
+def _value(value):
+    if value is None:
+        return NULL
+    if isinstance(value, (bytes, memoryview)):
+        return '\\x' + bytes(value).hex()
+    return value
+
+
+def write_csv(path, queryset, batch_size=None):
+    """Write every row of ``queryset`` to a gzipped CSV file; returns the row count"""
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    columns = [field.attname for field in queryset.model._meta.concrete_fields]
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    count = 0
+    with gzip.open(temp_path, 'wt', encoding='utf-8', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        for row in queryset.order_by('pk').values_list(*columns).iterator(chunk_size=batch_size):
+            writer.writerow([_value(value) for value in row])
+            count += 1
+    with open(temp_path, 'rb') as handle:
+        os.fsync(handle.fileno())
+    os.replace(temp_path, path)
+    return count
+
+
+def archive_term(term):
+    """
+    Move ``term``'s enrollments and submissions out of the database.
+    Returns the new ArchivedTerm.
+    """
+    path = directory_name(term)
+    directory = os.path.join(settings.ARCHIVE_ROOT, path)
+    os.makedirs(directory, exist_ok=True)
+
+    enrollments = Enrollment.objects.filter(term=term)
+    submissions = Submission.objects.filter(term=term)
+    revisions = SubmissionRevision.objects.filter(submission__in=submissions.values('pk'))
+
+    with transaction.atomic():
+        # Nothing can be written to the term between the export and the drop
+        partitions.lock(term)
+
+        archive = ArchivedTerm.objects.create(
+            term=term,
+            path=path,
+            enrollments=write_csv(os.path.join(directory, 'enrollments.csv.gz'), enrollments),
+            submissions=write_csv(os.path.join(directory, 'submissions.csv.gz'), submissions),
+            revisions=write_csv(os.path.join(directory, 'submission_revisions.csv.gz'), revisions),
+        )
+        completed = enrollments.filter(status='completed')
+        ArchivedEnrollment.objects.bulk_create(
+            (
+                ArchivedEnrollment(archive=archive, **row)
+                for row in completed.values(
+                    'student_id', 'term', 'final_grade', 'gpa_points',
+                    course_code=F('course__course_code'),
+                    course_name=F('course__course_name'),
+                    credits=F('course__credits'),
+                    completed=F('enrollment_date'),
+                ).iterator(chunk_size=settings.ARCHIVE_BATCH_SIZE)
+            ),
+            batch_size=settings.ARCHIVE_BATCH_SIZE,
+        )
+        student_ids = set(completed.values_list('student_id', flat=True))
+
+        for model in (SubmissionRevision, SubmissionSignature, SimilarityBucket):
+            model.objects.filter(submission__in=submissions.values('pk')).delete()
+        if not partitions.detach(term):
+            submissions.delete()
+            enrollments.delete()
+        transaction.on_commit(lambda: transcripts.invalidate(student_ids))
+    return archive
@@ -0,0 +1,249 @@
+"""
+Static asset bundles.
+
+settings.ASSET_BUNDLES maps a bundle name (e.g. bundles/student.css) to the
+source files it concatenates. CSS @imports of other local files are inlined
+once, so a portal page loads one stylesheet instead of a chain of
+round trips, and CSS is minified. JS is concatenated unchanged: stripping
+comments safely needs a real tokenizer (strings, regex literals, template
+literals), and gzip/Brotli recover most of the difference anyway.
+
+settings.ASSET_CRITICAL maps a critical CSS file name to a bundle and the
+templates of a page; the file holds the rules of the bundle those templates
+actually use, so it can be inlined and the full bundle loaded without
+blocking first paint.
+
+BundleFinder builds both kinds into ASSET_BUILD_DIR whenever a source
+changes and exposes them like any other static file, so collectstatic
+hashes and precompresses them (gzip and Brotli, via WhiteNoise) alongside
+everything else. Requests never build anything: critical_css() reads the
+collected file once per process (startup.warm does so before forking).
+"""
+import logging
+import os
+import posixpath
+import re
+import threading
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.finders import BaseFinder
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.storage import FileSystemStorage
+from django.template.loader import get_template
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+STRING_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+IMPORT_RE = re.compile(r'''@import\s+(?:url\()?\s*['"]?([^'")\s]+)['"]?\s*\)?\s*;''')
+URL_RE = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+CLASS_ATTR_RE = re.compile(r'''class\s*=\s*["']([^"']*)["']''')
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+
+logger = logging.getLogger(__name__)
+
+_build_lock = threading.Lock()
+_built = {}
+# Critical CSS file name -> contents, read once per process
+_critical = {}
+
+
+def minify_css(text):
+    """Strip comments and insignificant whitespace, leaving strings untouched"""
+    parts = STRING_RE.split(CSS_COMMENT_RE.sub('', text))
+    for index in range(0, len(parts), 2):
+        part = re.sub(r'\s+', ' ', parts[index])
+        part = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+        part = re.sub(r':\s+', ':', part)
+        parts[index] = part.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def source_path(name):
+    path = finders.find(name)
+    if path is None:
+        raise FileNotFoundError(f"Asset bundle source {name!r} not found")
+    return path
+
+
+def _inline_css(name, bundle, seen):
+    """CSS of ``name`` with local @imports inlined once and url()s made relative to ``bundle``"""
+    if name in seen:
+        return ''
+    seen.add(name)
+    with open(source_path(name), encoding='utf-8') as handle:
+        text = handle.read()
+    directory = posixpath.dirname(name)
+
+    def inline(match):
+        target = match.group(1)
+        if '//' in target:
+            return match.group(0)
+        return _inline_css(posixpath.normpath(posixpath.join(directory, target)), bundle, seen)
+
+    def rebase(match):
+        quote, target = match.groups()
+        if target.startswith(('data:', '/', '#')) or '//' in target:
+            return match.group(0)
+        resolved = posixpath.normpath(posixpath.join(directory, target))
+        return f"url({quote}{posixpath.relpath(resolved, posixpath.dirname(bundle))}{quote})"
+
+    return URL_RE.sub(rebase, IMPORT_RE.sub(inline, text))
+
+
+def render_bundle(bundle):
+    """Minified contents of one bundle"""
+    sources = settings.ASSET_BUNDLES[bundle]
+    if bundle.endswith('.css'):
+        seen = set()
+        return minify_css('\n'.join(_inline_css(name, bundle, seen) for name in sources))
+    texts = []
+    for name in sources:
+        with open(source_path(name), encoding='utf-8') as handle:
+            texts.append(handle.read().strip())
+    return ';\n'.join(texts) + '\n'
+
+
+def render(name):
+    """Contents of a bundle or critical CSS file, straight from the sources"""
+    if name in settings.ASSET_BUNDLES:
+        return render_bundle(name)
+    bundle, template_names = settings.ASSET_CRITICAL[name]
+    return extract_critical(render_bundle(bundle), template_names)
+
+
+def source_paths(name):
+    """Every file ``name`` is built from"""
+    if name in settings.ASSET_BUNDLES:
+        return [source_path(source) for source in settings.ASSET_BUNDLES[name]]
+    bundle, template_names = settings.ASSET_CRITICAL[name]
+    return source_paths(bundle) + [get_template(template).origin.name for template in template_names]
+
+
+def build(name):
+    """
+    Write bundle or critical CSS file ``name`` to ASSET_BUILD_DIR if any
+    source changed since the last build in this process, and return its
+    contents. Only BundleFinder calls this: at collectstatic time, or when
+    the development server serves static files itself.
+    """
+    stamp = tuple(os.path.getmtime(path) for path in source_paths(name))
+    with _build_lock:
+        cached = _built.get(name)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        text = render(name)
+        path = os.path.join(settings.ASSET_BUILD_DIR, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+        os.replace(temp_path, path)
+        _built[name] = (stamp, text)
+        return text
+
+
+class BundleFinder(BaseFinder):
+    """Staticfiles finder that serves (and collects) the built bundles and critical CSS"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = FileSystemStorage(location=settings.ASSET_BUILD_DIR)
+
+    def find(self, path, find_all=False, **kwargs):
+        if path not in settings.ASSET_BUNDLES and path not in settings.ASSET_CRITICAL:
+            return []
+        build(path)
+        match = self.storage.path(path)
+        return [match] if find_all else match
+
+    def list(self, ignore_patterns):
+        for name in [*settings.ASSET_BUNDLES, *settings.ASSET_CRITICAL]:
+            build(name)
+            yield name, self.storage
+
+
+def _rules(css):
+    """Yield (prelude, body) for each top-level block of minified CSS"""
+    depth, start, prelude = 0, 0, ''
+    for index, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude, start = css[start:index], index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                yield prelude.strip(), css[start:index]
+                start = index + 1
+        elif char == ';' and depth == 0:
+            start = index + 1
+
+
+def template_classes(template_names):
+    """Every literal class name used in the templates"""
+    classes = set()
+    for name in template_names:
+        with open(get_template(name).origin.name, encoding='utf-8') as handle:
+            for value in CLASS_ATTR_RE.findall(handle.read()):
+                classes.update(token for token in value.split() if '{' not in token and '%' not in token)
+    return classes
+
+
+def _selector_used(selector, classes):
+    """Element-only selectors always apply; class selectors need every class present"""
+    return all(name in classes for name in SELECTOR_CLASS_RE.findall(selector))
+
+
+def extract_critical(css, template_names):
+    """
+    The rules of minified ``css`` whose selectors only use classes found in
+    ``template_names``, plus element rules. @media blocks are filtered the
+    same way; other at-rules (keyframes, font-face) are left to the full
+    stylesheet.
+    """
+    classes = template_classes(template_names)
+
+    def keep(css):
+        kept = []
+        for prelude, body in _rules(css):
+            if prelude.startswith('@media'):
+                inner = keep(body)
+                if inner:
+                    kept.append(f"{prelude}{{{inner}}}")
+            elif not prelude.startswith('@'):
+                selectors = [s for s in prelude.split(',') if _selector_used(s.strip(), classes)]
+                if selectors:
+                    kept.append(f"{','.join(selectors)}{{{body}}}")
+        return ''.join(kept)
+
+    return keep(css)
+
+
+def _read_critical(name):
+    if settings.DEBUG:
+        # Rebuilt by BundleFinder whenever a source or template changes
+        with open(finders.find(name), encoding='utf-8') as handle:
+            return handle.read()
+    try:
+        stored = staticfiles_storage.stored_name(name)
+    except ValueError:
+        logger.warning("%s is not in the staticfiles manifest; run collectstatic", name)
+        return render(name)
+    with staticfiles_storage.open(stored) as handle:
+        return handle.read().decode('utf-8')
+
+
+def critical_css(name):
+    """Contents of critical CSS file ``name``, read once per process (every call in DEBUG)"""
+    if settings.DEBUG:
+        return _read_critical(name)
+    text = _critical.get(name)
+    if text is None:
+        text = _critical[name] = _read_critical(name)
+    return text
+
+
+def load_critical():
+    """Read every critical CSS file now, so no request has to"""
+    for name in settings.ASSET_CRITICAL:
+        critical_css(name)
@@ -0,0 +1,140 @@
+"""
+Automatic grading of multiple-choice quizzes.
+
+An assignment's ``answer_key`` maps question numbers to the correct option
+letter, a list of accepted letters, or ``{"answer": ..., "points": n}`` to
+weight a question (default weight 1)::
+
+    {"1": "A", "2": ["B", "C"], "3": {"answer": "D", "points": 2}}
+
+Answers are read from lines such as ``1. A) Activate the fire alarm`` or
+``2) b``; the first answer given for a question counts. Grades are scaled to
+the assignment's max_points. A whole batch is scored in Python and written
+with one executemany UPDATE, then the affected course grades are
+recomputed.
+"""
+import re
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import dashboard
+from .grading import recompute_current_grades
+from .models import Submission
+
+TWO_PLACES = Decimal('0.01')
+
+ANSWER_LINE = re.compile(r'^\s*(\d+)\s*[.):-]\s*\(?([A-Za-z])(?:[).]|\s|$)', re.MULTILINE)
+
+
+def normalize_key(raw):
+    """{question: (accepted letters, weight)}; raises ValueError if malformed"""
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError('The answer key must be a non-empty object of question numbers.')
+    key = {}
+    for question, entry in raw.items():
+        if not str(question).strip().isdigit():
+            raise ValueError(f'"{question}" is not a question number.')
+        weight = 1
+        if isinstance(entry, dict):
+            weight = entry.get('points', 1)
+            entry = entry.get('answer')
+        answers = [entry] if isinstance(entry, str) else entry
+        if (
+            not isinstance(answers, list) or not answers
+            or not all(isinstance(a, str) and len(a.strip()) == 1 and a.strip().isalpha() for a in answers)
+        ):
+            raise ValueError(f'Question {question}: answers must be single letters.')
+        if not isinstance(weight, (int, float)) or weight <= 0:
+            raise ValueError(f'Question {question}: points must be a positive number.')
+        key[int(question)] = ({a.strip().upper() for a in answers}, Decimal(str(weight)))
+    return key
+
+
+def parse_answers(text):
+    """{question: letter} from a submission's text"""
+    answers = {}
+    for question, letter in ANSWER_LINE.findall(text or ''):
+        answers.setdefault(int(question), letter.upper())
+    return answers
+
+
+def score(key, answers, max_points):
+    """(grade, feedback) for parsed ``answers`` against a normalized key"""
+    total = sum(weight for _, weight in key.values())
+    earned, missed = Decimal(0), []
+    for question in sorted(key):
+        accepted, weight = key[question]
+        if answers.get(question) in accepted:
+            earned += weight
+        else:
+            missed.append(str(question))
+    grade = (earned * max_points / total).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+    feedback = f'Auto-graded: {len(key) - len(missed)} of {len(key)} questions correct.'
+    if missed:
+        feedback += f' Review question(s) {", ".join(missed)}.'
+    return grade, feedback
+
+
+def gradable(assignment):
+    return assignment.assignment_type == 'quiz' and bool(assignment.answer_key)
+
+
+def grade_submissions(assignment, submissions=None, now=None):
+    """
+    Score ``submissions`` (default: every submission for ``assignment`` that
+    was not graded by hand) and write the results in one batch. Returns the
+    number of submissions graded.
+    """
+    if not gradable(assignment):
+        return 0
+    key = normalize_key(assignment.answer_key)
+    now = now or timezone.now()
+    if submissions is None:
+        submissions = Submission.objects.filter(assignment=assignment).filter(
+            ~Q(status='graded') | Q(autograded=True)
+        )
+
+    rows = []
+    students = set()
+    for pk, student_id, text in submissions.values_list('pk', 'student_id', 'submission_content').iterator():
+        grade, feedback = score(key, parse_answers(text), assignment.max_points)
+        rows.append((grade, feedback, now, pk))
+        students.add(student_id)
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        write_grades(rows)
+        recompute_current_grades(students, [assignment.module.course_id])
+        transaction.on_commit(lambda: dashboard.invalidate(students))
+    return len(rows)
+
+
+def write_grades(rows):
+    """
+    Write (grade, feedback, graded_at, pk) rows in one executemany.
+
+    Feedback differs per submission, so grouping into ``UPDATE ... WHERE id
+    IN`` like grading.write_final_grades doesn't apply, and bulk_update's
+    per-row CASE expressions cost more than the statement itself.
+    """
+    table = connection.ops.quote_name(Submission._meta.db_table)
+    field = Submission._meta.get_field('graded_at')
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {table} SET grade = %s, feedback = %s, graded_at = %s, "
+            f"status = 'graded', autograded = %s, graded_by_id = NULL WHERE id = %s",
+            [
+                (
+                    connection.ops.adapt_decimalfield_value(grade, 5, 2),
+                    feedback,
+                    field.get_db_prep_save(graded_at, connection),
+                    True,
+                    pk,
+                )
+                for grade, feedback, graded_at, pk in rows
+            ],
+        )
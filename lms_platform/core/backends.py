@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from django.db.models import Exists, OuterRef
+
+from . import logins
+
+UserModel = get_user_model()
+
+
+class ThrottledModelBackend(ModelBackend):
+    """
+    ModelBackend that refuses throttled clients before hashing anything and
+    caps how many passwords are hashed at once.
+
+    A refused attempt sets ``request.login_retry_after`` (seconds) so login
+    views can tell throttling apart from a wrong password.
+
+    Users are always loaded together with their UserProfile and their demo
+    group membership in one query, both at login and when the session user
+    is resolved on each request, so neither costs a second query.
+    """
+
+    def users(self):
+        demo_membership = UserModel.groups.through.objects.filter(
+            user=OuterRef('pk'), group__name=settings.DEMO_GROUP
+        )
+        return UserModel._default_manager.select_related('userprofile').annotate(
+            in_demo_group=Exists(demo_membership)
+        )
+
+    def get_user(self, user_id):
+        try:
+            user = self.users().get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    def check_credentials(self, username, password):
+        """ModelBackend.authenticate(), with the profile joined in"""
+        try:
+            user = self.users().get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            UserModel().set_password(password)
+        else:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        if request is None:
+            return self.check_credentials(username, password)
+
+        wait = logins.retry_after(request, username)
+        if wait:
+            request.login_retry_after = wait
+            raise PermissionDenied
+
+        slots = logins.hash_slots()
+        if not slots.acquire(timeout=settings.LOGIN_HASH_WAIT):
+            request.login_retry_after = 1
+            raise PermissionDenied
+        try:
+            user = self.check_credentials(username, password)
+        finally:
+            slots.release()
+
+        if user is None:
+            logins.record_failure(request, username)
+        else:
+            logins.clear(username)
+        return user
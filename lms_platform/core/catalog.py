@@ -0,0 +1,67 @@
+"""
+Student course catalog.
+
+The listing for a term is one query over Course joined to the instructor,
+with seats left computed from the denormalized ``enrolled_count``, and is
+cached for a few seconds so a busy catalog page costs almost nothing. Seat
+counts may therefore lag slightly; enrolling always goes through the real
+capacity check in core.enrollment.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from . import demo, metrics
+from .models import Course, Enrollment
+
+
+def cache_key(term):
+    # Terms are free text; memcached keys can't hold spaces or control characters
+    digest = hashlib.blake2b(term.encode(), digest_size=16).hexdigest()
+    return f"catalog:term:{digest}"
+
+
+def current_term():
+    """settings.CURRENT_TERM, or the term of the most recently created course"""
+    if settings.CURRENT_TERM:
+        return settings.CURRENT_TERM
+    term = cache.get('catalog:current_term')
+    if term is None:
+        term = Course.objects.order_by('-created_at').values_list('term', flat=True).first() or ''
+        demo.cache_set(cache, 'catalog:current_term', term, settings.CATALOG_CACHE_TTL)
+    return term
+
+
+def build_listing(term):
+    """Catalog rows for ``term``, straight from the database"""
+    return list(
+        Course.objects.filter(term=term)
+        .order_by('course_code')
+        .values(
+            'id', 'course_code', 'course_name', 'description', 'credits', 'term', 'max_enrollment',
+            seats_left=F('max_enrollment') - F('enrolled_count'),
+            instructor_first_name=Coalesce('instructor__userprofile__first_name', 'instructor__first_name'),
+            instructor_last_name=Coalesce('instructor__userprofile__last_name', 'instructor__last_name'),
+        )
+    )
+
+
+def get_listing(term):
+    """Cached catalog rows for ``term``"""
+    listing = cache.get(cache_key(term))
+    metrics.record_cache('catalog', listing is not None)
+    if listing is None:
+        listing = build_listing(term)
+        demo.cache_set(cache, cache_key(term), listing, settings.CATALOG_CACHE_TTL)
+    return listing
+
+
+def enrollment_status(student, term):
+    """{course_id: status} for the student's enrollments in ``term``"""
+    return dict(
+        Enrollment.objects.filter(student=student, term=term)
+        .values_list('course_id', 'status')
+    )
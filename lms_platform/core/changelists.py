@@ -0,0 +1,126 @@
+"""
+Admin changelists that stay fast on very large tables.
+
+Django's changelist runs an exact ``COUNT(*)`` for the paginator (plus a
+second one for the unfiltered total) and builds some ``list_filter``
+choices with a scan of the table. On PostgreSQL the paginator here uses the
+planner's row estimate instead: ``pg_class.reltuples`` for an unfiltered
+table, ``EXPLAIN`` for a filtered one. Estimates below
+ADMIN_COUNT_ESTIMATE_THRESHOLD, and every count on other databases, fall
+back to an exact count. Filter choices are cached for ADMIN_FILTER_CACHE_TTL
+seconds.
+"""
+import json
+
+from django.conf import settings
+from django.contrib.admin import AllValuesFieldListFilter, RelatedFieldListFilter
+from django.contrib.admin.utils import get_fields_from_path
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.utils.functional import cached_property
+
+from . import demo, metrics
+
+
+def _reltuples(connection, table):
+    with connection.cursor() as cursor:
+        # A partitioned table has no rows of its own; its partitions do
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE relkind = 'r' AND (oid = %s::regclass "
+            "OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass))",
+            [table, table],
+        )
+        rows = [row[0] for row in cursor.fetchall()]
+    # -1 means the table has never been analyzed
+    if not rows or any(value < 0 for value in rows):
+        return None
+    return int(sum(rows))
+
+
+def _plan_rows(connection, queryset):
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimated_count(queryset, threshold=None):
+    """Planner estimate of ``queryset.count()`` where that is cheap and big enough to matter"""
+    threshold = settings.ADMIN_COUNT_ESTIMATE_THRESHOLD if threshold is None else threshold
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    if queryset.query.where or queryset.query.distinct:
+        estimate = _plan_rows(connection, queryset)
+    else:
+        estimate = _reltuples(connection, queryset.model._meta.db_table)
+    if estimate is None or estimate < threshold:
+        return queryset.count()
+    return estimate
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count comes from estimated_count()"""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+
+def _filter_cache_key(model_admin, field_path):
+    return f"admin-filter:{model_admin.model._meta.label_lower}:{field_path}"
+
+
+class CachedRelatedFieldListFilter(RelatedFieldListFilter):
+    """Related-object filter whose choice list is cached"""
+
+    def field_choices(self, field, request, model_admin):
+        key = _filter_cache_key(model_admin, self.field_path)
+        choices = cache.get(key)
+        metrics.record_cache('admin_filter', choices is not None)
+        if choices is None:
+            choices = list(super().field_choices(field, request, model_admin))
+            demo.cache_set(cache, key, choices, settings.ADMIN_FILTER_CACHE_TTL)
+        return choices
+
+
+class CachedAllValuesFieldListFilter(AllValuesFieldListFilter):
+    """Distinct-values filter that caches its SELECT DISTINCT scan"""
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        key = _filter_cache_key(model_admin, field_path)
+        choices = cache.get(key)
+        metrics.record_cache('admin_filter', choices is not None)
+        if choices is None:
+            choices = list(self.lookup_choices)
+            demo.cache_set(cache, key, choices, settings.ADMIN_FILTER_CACHE_TTL)
+        self.lookup_choices = choices
+
+
+def cached_filter(model, entry):
+    """Swap a plain list_filter field name for the cached filter class that fits it"""
+    if not isinstance(entry, str):
+        return entry
+    field = get_fields_from_path(model, entry)[-1]
+    if field.remote_field:
+        return (entry, CachedRelatedFieldListFilter)
+    if field.choices or isinstance(field, (models.BooleanField, models.DateField)):
+        return entry  # Built from the field definition, no query
+    return (entry, CachedAllValuesFieldListFilter)
+
+
+class LargeTableAdminMixin:
+    """
+    Estimated counts, no second full-table count and cached filter choices
+    for ModelAdmins over big tables.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_list_filter(self, request):
+        return [cached_filter(self.model, entry) for entry in super().get_list_filter(request)]
@@ -0,0 +1,41 @@
+"""
+Cached student dashboard figures.
+
+The submission counts on the dashboard are one aggregate query over the
+current term's partition, cached per student and invalidated whenever that
+student's submissions change.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from . import demo, metrics
+from .models import Submission
+
+
+def cache_key(user_id):
+    return f"dashboard:{user_id}"
+
+
+def build_stats(user_id, term):
+    stats = Submission.objects.filter(student_id=user_id, term=term).aggregate(
+        total_submissions=Count('pk'),
+        graded_submissions=Count('pk', filter=Q(status='graded')),
+    )
+    return {**stats, 'term': term}
+
+
+def get_stats(user_id, term):
+    """Cached submission counts for one student in ``term``"""
+    stats = cache.get(cache_key(user_id))
+    if stats is not None and stats['term'] != term:
+        stats = None  # Cached before the current term moved on
+    metrics.record_cache('dashboard', stats is not None)
+    if stats is None:
+        stats = build_stats(user_id, term)
+        demo.cache_set(cache, cache_key(user_id), stats, settings.DASHBOARD_CACHE_TTL)
+    return stats
+
+
+def invalidate(user_ids):
+    cache.delete_many([cache_key(user_id) for user_id in set(user_ids)])
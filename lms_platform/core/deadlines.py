@@ -0,0 +1,75 @@
+"""
+Late submission classification.
+
+A submission is late when it arrives after the student's deadline: their
+DeadlineExtension if they have one, otherwise the assignment's due date plus
+its grace period. The result is stored on Submission.is_late (and as the
+'late' status until the work is graded) so listing late work never needs a
+per-row comparison in Python.
+"""
+from django.db import transaction
+from django.db.models import (
+    BooleanField, Case, DateTimeField, ExpressionWrapper, F, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Assignment, DeadlineExtension
+
+
+def deadline_for(assignment, student_id):
+    """The effective deadline for one student on one assignment"""
+    extension = DeadlineExtension.objects.filter(
+        assignment=assignment, student_id=student_id
+    ).values_list('due_date', flat=True).first()
+    if extension is not None:
+        return extension
+    return assignment.due_date + assignment.grace_period
+
+
+def late_status(is_late, status):
+    """Status to store for a submission; grading always wins over 'late'"""
+    if status == 'graded':
+        return status
+    return 'late' if is_late else 'submitted'
+
+
+def classify(submission, deadline=None):
+    """Set is_late and status on an unsaved submission in place"""
+    submitted_at = submission.submission_date or timezone.now()
+    if deadline is None:
+        deadline = deadline_for(submission.assignment, submission.student_id)
+    submission.is_late = submitted_at > deadline
+    submission.status = late_status(submission.is_late, submission.status)
+    return submission
+
+
+def deadline_expression():
+    """SQL expression for each submission row's effective deadline"""
+    extension_due = DeadlineExtension.objects.filter(
+        student=OuterRef('student'), assignment=OuterRef('assignment'),
+    ).values('due_date')[:1]
+    assignment_due = Assignment.objects.filter(pk=OuterRef('assignment')).annotate(
+        deadline=ExpressionWrapper(F('due_date') + F('grace_period'), output_field=DateTimeField()),
+    ).values('deadline')[:1]
+    return Coalesce(Subquery(extension_due), Subquery(assignment_due), output_field=DateTimeField())
+
+
+def reclassify(submissions):
+    """
+    Recompute is_late and status for a Submission queryset.
+
+    Used after a due date, grace period or extension changes. The deadline
+    subqueries run once per row, in the UPDATE that sets is_late; status is
+    then derived from is_late with no subqueries at all. Returns the number
+    of rows updated.
+    """
+    with transaction.atomic():
+        updated = submissions.update(is_late=ExpressionWrapper(
+            Q(submission_date__gt=deadline_expression()), output_field=BooleanField(),
+        ))
+        submissions.exclude(status='graded').update(status=Case(
+            When(is_late=True, then=Value('late')),
+            default=Value('submitted'),
+        ))
+    return updated
@@ -0,0 +1,42 @@
+from functools import wraps
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseForbidden
+
+from .models import UserProfile
+
+ROLE_LABELS = dict(UserProfile.ROLE_CHOICES)
+
+
+def profile_for(user):
+    """The user's UserProfile (already joined by the auth backend), or None"""
+    try:
+        return user.userprofile
+    except UserProfile.DoesNotExist:
+        return None
+
+
+def role_required(*roles):
+    """
+    Require a signed-in user whose profile has one of ``roles``.
+
+    The profile is available to the view as ``request.profile``.
+    """
+    label = ROLE_LABELS.get(roles[0], roles[0].title())
+
+    def decorator(view):
+        @wraps(view)
+        @login_required
+        def wrapper(request, *args, **kwargs):
+            profile = profile_for(request.user)
+            if profile is None:
+                return HttpResponseForbidden(f"{label} profile not found.")
+            if profile.role not in roles:
+                return HttpResponseForbidden(f"Access denied. {label}s only.")
+            request.profile = profile
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+student_required = role_required('student')
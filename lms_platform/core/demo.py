@@ -0,0 +1,48 @@
+"""
+Demo mode.
+
+Members of settings.DEMO_GROUP can use every page and action, but each of
+their requests runs inside a database transaction that is always rolled
+back (DemoModeMiddleware), so nothing they do is ever committed: admin
+saves, inlines, bulk actions, custom views and background tasks queued
+along the way all disappear together. Only the session and message
+cookies, written after the transaction ends, survive. Uploaded files are
+the exception, as storage is not transactional.
+
+Two things must not be rolled back with the rest. Logging out (or any
+other session key change) deletes the old session row, and that delete is
+repeated once the transaction is gone so the old session can't be reused.
+And nothing a demo request read may be cached, since the cache would keep
+data from a transaction that never committed: the cache-aside helpers go
+through cache_set(), which does nothing during a demo request.
+"""
+import contextvars
+
+from django.conf import settings
+
+# True while the current request's transaction is bound to be rolled back
+_rolled_back = contextvars.ContextVar('demo_rolled_back', default=False)
+
+
+def is_demo(user):
+    """
+    Whether ``user`` is in the demo group. The auth backend annotates
+    ``in_demo_group`` on the session user, so this normally costs no query.
+    """
+    if not user.is_authenticated:
+        return False
+    flag = getattr(user, 'in_demo_group', None)
+    if flag is None:
+        flag = user.in_demo_group = user.groups.filter(name=settings.DEMO_GROUP).exists()
+    return flag
+
+
+def rolled_back():
+    """Whether the current request's database work will be rolled back"""
+    return _rolled_back.get()
+
+
+def cache_set(cache, key, value, timeout):
+    """``cache.set()``, unless the value may hold data that is about to be rolled back"""
+    if not _rolled_back.get():
+        cache.set(key, value, timeout)
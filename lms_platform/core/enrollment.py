@@ -0,0 +1,126 @@
+"""
+Seat allocation, waitlists and drops.
+
+``Course.enrolled_count`` is the number of seats taken. A seat is claimed
+with a single conditional UPDATE (``enrolled_count < max_enrollment``), so
+the check and the increment happen atomically in the database and
+concurrent sign-ups can never overfill a course; the row lock is held only
+for that one statement's transaction rather than for a count-then-insert
+round trip. Students who don't get a seat are waitlisted and promoted
+oldest-first as seats free up.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Course, Enrollment
+
+# Statuses that hold a seat in the course
+SEAT_STATUSES = ('active', 'completed')
+
+
+def take_seat(course_id):
+    """Claim one seat; False when the course is full"""
+    return bool(
+        Course.objects.filter(pk=course_id, enrolled_count__lt=F('max_enrollment'))
+        .update(enrolled_count=F('enrolled_count') + 1)
+    )
+
+
+def enroll(student, course):
+    """
+    Enroll ``student`` in ``course``, or waitlist them when it is full.
+
+    Re-enrolling after a drop reuses the existing row. Returns the
+    enrollment; check its status to see whether a seat was granted.
+    """
+    existing = Enrollment.objects.filter(student=student, course=course).first()
+    if existing is None:
+        try:
+            with transaction.atomic():
+                enrollment = Enrollment(student=student, course=course)
+                enrollment.save()
+                return enrollment
+        except IntegrityError:
+            # Lost a race with a second request from the same student
+            return Enrollment.objects.get(student=student, course=course)
+
+    if existing.status != 'dropped':
+        return existing
+    with transaction.atomic():
+        status = 'active' if take_seat(course.pk) else 'waitlisted'
+        if Enrollment.objects.filter(pk=existing.pk, status='dropped').update(status=status):
+            existing.status = status
+        elif status == 'active':
+            # Another request re-enrolled first; give the seat back
+            release_seat(course.pk)
+            existing.refresh_from_db()
+    return existing
+
+
+def drop(enrollment):
+    """Drop an enrollment, handing its seat to the next waitlisted student"""
+    with transaction.atomic():
+        previous = enrollment.status
+        dropped = Enrollment.objects.filter(pk=enrollment.pk, status=previous).update(status='dropped')
+        if dropped and previous in SEAT_STATUSES:
+            release_seat(enrollment.course_id)
+    enrollment.status = 'dropped'
+    return bool(dropped)
+
+
+def release_seat(course_id):
+    """Give a freed seat to the oldest waitlisted student, or return it to the pool"""
+    with transaction.atomic():
+        if not promote_waitlisted(course_id, 1, seats_taken=True):
+            Course.objects.filter(pk=course_id, enrolled_count__gt=0).update(
+                enrolled_count=F('enrolled_count') - 1
+            )
+
+
+def promote_waitlisted(course_id, limit=None, seats_taken=False):
+    """
+    Move up to ``limit`` waitlisted students (oldest first) into free seats.
+
+    With ``seats_taken`` the caller already holds the seats being handed
+    over, so the course counter is left alone. Returns the number promoted.
+    """
+    with transaction.atomic():
+        course = Course.objects.select_for_update().get(pk=course_id)
+        if not seats_taken:
+            free = max(course.max_enrollment - course.enrolled_count, 0)
+            limit = free if limit is None else min(limit, free)
+        if not limit:
+            return 0
+        ids = list(
+            Enrollment.objects.filter(course_id=course_id, status='waitlisted')
+            .order_by('enrollment_date', 'pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        promoted = Enrollment.objects.filter(pk__in=ids, status='waitlisted').update(status='active')
+        if promoted and not seats_taken:
+            Course.objects.filter(pk=course_id).update(enrolled_count=F('enrolled_count') + promoted)
+    return promoted
+
+
+def recount(course_ids):
+    """
+    Rebuild ``enrolled_count`` from the enrollments themselves and fill any
+    free seats from the waitlist, e.g. after edits that bypass enroll()/drop().
+    """
+    course_ids = set(course_ids)
+    seats = (
+        Enrollment.objects.filter(course=OuterRef('pk'), status__in=SEAT_STATUSES)
+        .order_by().values('course').annotate(taken=Count('pk')).values('taken')
+    )
+    with transaction.atomic():
+        Course.objects.filter(pk__in=course_ids).update(
+            enrolled_count=Coalesce(Subquery(seats), 0)
+        )
+        waiting = (
+            Course.objects.filter(pk__in=course_ids, enrolled_count__lt=F('max_enrollment'))
+            .filter(enrollments__status='waitlisted')
+            .values_list('pk', flat=True).distinct()
+        )
+        for course_id in waiting:
+            promote_waitlisted(course_id)
@@ -0,0 +1,17 @@
+from django import forms
+
+
+class SubmissionForm(forms.Form):
+    """ Student work for an assignment: a text response, a file, or both """
+    submission_content = forms.CharField(
+        required=False,
+        label='Response',
+        widget=forms.Textarea(attrs={'rows': 10, 'placeholder': 'Type your response...'}),
+    )
+    file_upload = forms.FileField(required=False, label='Attach a file')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('submission_content', '').strip() and not cleaned_data.get('file_upload'):
+            raise forms.ValidationError('Enter a response or attach a file.')
+        return cleaned_data
@@ -0,0 +1,185 @@
+"""
+Course grade aggregation and GPA conversion.
+
+Course grades are the percentage of points earned out of everything due so
+far in that course, with missing work counting as zero, computed with a
+fixed handful of GROUP BY queries for any number of enrollments.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DateTimeField, Exists, ExpressionWrapper, F, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import transcripts
+from .models import Assignment, Course, DeadlineExtension, Enrollment, Submission
+
+TWO_PLACES = Decimal('0.01')
+
+
+def course_percentages(course_ids, student_ids=None, term=None):
+    """
+    {(student_id, course_id): percentage} for students with active
+    enrollments or graded work in the given courses (ids or a Course
+    queryset), optionally only for ``student_ids``.
+
+    Points earned are divided by the points of every assignment that is past
+    due for the student (due date plus grace period, or their extension),
+    plus any graded early. Missing past-due work counts as zero, so skipping
+    an assignment can never raise a grade. Students with nothing graded or
+    due yet are absent. Passing the courses' ``term`` keeps the scans to
+    that term's partitions.
+    """
+    now = timezone.now()
+    past_due = Assignment.objects.filter(module__course_id__in=course_ids).alias(
+        deadline=ExpressionWrapper(F('due_date') + F('grace_period'), output_field=DateTimeField()),
+    ).filter(deadline__lte=now)
+    graded = Submission.objects.filter(
+        grade__isnull=False,
+        assignment__module__course_id__in=course_ids,
+    )
+    enrollments = Enrollment.objects.filter(course_id__in=course_ids, status='active')
+    if term is not None:
+        graded = graded.filter(term=term)
+        enrollments = enrollments.filter(term=term)
+    if student_ids is not None:
+        graded = graded.filter(student_id__in=student_ids)
+        enrollments = enrollments.filter(student_id__in=student_ids)
+
+    extended = DeadlineExtension.objects.filter(assignment__in=past_due, due_date__gt=now).exclude(
+        Exists(graded.filter(student=OuterRef('student'), assignment=OuterRef('assignment')))
+    )
+    if student_ids is not None:
+        extended = extended.filter(student_id__in=student_ids)
+    due_points = dict(
+        past_due.values('module__course_id').annotate(points=Sum('max_points'))
+        .order_by().values_list('module__course_id', 'points')
+    )
+    points, possible = defaultdict(Decimal), {}
+    for student_id, course_id in enrollments.values_list('student_id', 'course_id'):
+        possible[(student_id, course_id)] = due_points.get(course_id, 0)
+    rows = (
+        graded
+        .values('student_id', course_id=F('assignment__module__course_id'))
+        .annotate(
+            earned=Sum('grade'),
+            early=Coalesce(Sum('assignment__max_points', filter=~Q(assignment__in=past_due)), 0),
+        )
+        .order_by()
+    )
+    for row in rows:
+        key = (row['student_id'], row['course_id'])
+        points[key] = row['earned']
+        possible[key] = due_points.get(row['course_id'], 0) + row['early']
+    # Work the student can still hand in late on an extension isn't missing yet
+    for student_id, course_id, max_points in extended.values_list(
+        'student_id', 'assignment__module__course_id', 'assignment__max_points'
+    ):
+        if (student_id, course_id) in possible:
+            possible[(student_id, course_id)] -= max_points
+    return {
+        key: (Decimal(points[key]) * 100 / total).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+        for key, total in possible.items()
+        if total
+    }
+
+
+def gpa_for(percentage, scale=None):
+    """Map a percentage onto GPA points using settings.GPA_SCALE"""
+    if percentage is None:
+        return None
+    scale = sorted(scale or settings.GPA_SCALE)
+    thresholds = [Decimal(str(minimum)) for minimum, _ in scale]
+    index = bisect_right(thresholds, Decimal(percentage)) - 1
+    if index < 0:
+        return Decimal('0.00')
+    return Decimal(str(scale[index][1])).quantize(TWO_PLACES)
+
+
+def recompute_current_grades(student_ids, course_ids, batch_size=500):
+    """
+    Refresh current_grade on the students' active enrollments in
+    ``course_ids`` after submissions are graded. Returns the rows updated.
+    """
+    student_ids = list(student_ids)
+    percentages = course_percentages(course_ids, student_ids)
+    groups = defaultdict(list)
+    enrollments = Enrollment.objects.filter(
+        student_id__in=student_ids, course_id__in=course_ids, status='active'
+    ).values_list('pk', 'student_id', 'course_id')
+    for pk, student_id, course_id in enrollments:
+        if (student_id, course_id) in percentages:
+            groups[percentages[(student_id, course_id)]].append(pk)
+
+    updated = 0
+    with transaction.atomic():
+        for current_grade, ids in groups.items():
+            for start in range(0, len(ids), batch_size):
+                updated += Enrollment.objects.filter(pk__in=ids[start:start + batch_size]).update(
+                    current_grade=current_grade
+                )
+    return updated
+
+
+def finalize_term(term, dry_run=False, batch_size=500):
+    """
+    Lock final grades and GPA points for every active enrollment in ``term``
+    and mark them completed. Grades come from course_percentages(), so work
+    never handed in counts as zero.
+
+    Returns a list of (enrollment, old final_grade, old gpa_points) tuples
+    describing the changes; nothing is written when ``dry_run`` is set.
+    """
+    enrollments = list(
+        Enrollment.objects.filter(term=term, status='active')
+        .select_related('student', 'course')
+        .order_by('course__course_code', 'student__username')
+    )
+    percentages = course_percentages(Course.objects.filter(term=term), term=term)
+
+    changes = []
+    for enrollment in enrollments:
+        final_grade = percentages.get(
+            (enrollment.student_id, enrollment.course_id), enrollment.current_grade
+        )
+        changes.append((enrollment, enrollment.final_grade, enrollment.gpa_points))
+        enrollment.final_grade = final_grade
+        enrollment.current_grade = final_grade
+        enrollment.gpa_points = gpa_for(final_grade)
+        enrollment.status = 'completed'
+
+    if not dry_run:
+        write_final_grades(enrollments, batch_size)
+    return changes
+
+
+def write_final_grades(enrollments, batch_size=500):
+    """
+    Batched bulk update of final grades.
+
+    Django's bulk_update() builds a CASE expression per row, which costs far
+    more than the SQL itself at 100k rows. Many enrollments share the same
+    grade, so rows are grouped by value and written with plain
+    ``UPDATE ... WHERE id IN (...)`` statements of up to ``batch_size`` ids.
+    """
+    groups = defaultdict(list)
+    for enrollment in enrollments:
+        groups[(enrollment.final_grade, enrollment.gpa_points)].append(enrollment.pk)
+
+    with transaction.atomic():
+        # Cached transcripts are stale as soon as the grades commit
+        transaction.on_commit(lambda: transcripts.invalidate(
+            enrollment.student_id for enrollment in enrollments
+        ))
+        for (final_grade, gpa_points), ids in groups.items():
+            for start in range(0, len(ids), batch_size):
+                Enrollment.objects.filter(pk__in=ids[start:start + batch_size]).update(
+                    final_grade=final_grade,
+                    current_grade=final_grade,
+                    gpa_points=gpa_points,
+                    status='completed',
+                )
@@ -0,0 +1,100 @@
+"""
+Liveness and readiness probes.
+
+Liveness only proves the process can answer, so it never leaves memory.
+Readiness checks the database, the cache and media storage. Each probe runs
+in a small thread pool and is abandoned after HEALTH_PROBE_TIMEOUT seconds,
+so a hung dependency turns into a fast 503 instead of a hung health check.
+A probe that is still stuck is not started again until it returns. Results
+are kept in process memory (not the cache, which may be the thing that is
+down) for HEALTH_CACHE_TTL seconds, so however often the load balancer
+asks, each worker touches Postgres at most once per interval.
+"""
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='health')
+_lock = threading.Lock()
+_in_flight = {}
+_result = None  # (checked_at, ok, checks)
+
+
+def check_database():
+    try:
+        for alias in connections:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+    finally:
+        # Probe threads are reused; don't leave connections open in them
+        connections.close_all()
+
+
+def check_cache():
+    key = f"health:{uuid.uuid4().hex}"
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        cache.set(key, 1, 10)
+        if cache.get(key) != 1:
+            raise RuntimeError(f"cache {alias!r} did not return the value just written")
+        cache.delete(key)
+
+
+def check_media():
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=settings.MEDIA_ROOT, prefix='.health-'):
+        pass
+
+
+PROBES = {
+    'database': check_database,
+    'cache': check_cache,
+    'media': check_media,
+}
+
+
+def _timed(probe):
+    started = time.perf_counter()
+    probe()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_probes(timeout=None):
+    """(ok, {name: {'ok': bool, 'ms': float} or {'ok': False, 'error': str}})"""
+    timeout = settings.HEALTH_PROBE_TIMEOUT if timeout is None else timeout
+    with _lock:
+        futures = {}
+        for name, probe in PROBES.items():
+            future = _in_flight.get(name)
+            if future is None or future.done():
+                future = _in_flight[name] = _executor.submit(_timed, probe)
+            futures[name] = future
+
+    deadline = time.monotonic() + timeout
+    checks = {}
+    for name, future in futures.items():
+        try:
+            checks[name] = {'ok': True, 'ms': round(future.result(max(deadline - time.monotonic(), 0)), 1)}
+        except TimeoutError:
+            checks[name] = {'ok': False, 'error': f'timed out after {timeout}s'}
+        except Exception as exc:  # noqa: BLE001 - reported as a failed probe
+            checks[name] = {'ok': False, 'error': f'{type(exc).__name__}: {exc}'}
+    return all(check['ok'] for check in checks.values()), checks
+
+
+def readiness():
+    """Cached (ok, checks, age in seconds)"""
+    global _result
+    now = time.monotonic()
+    result = _result
+    if result is None or now - result[0] >= settings.HEALTH_CACHE_TTL:
+        ok, checks = run_probes()
+        result = _result = (time.monotonic(), ok, checks)
+    return result[1], result[2], round(time.monotonic() - result[0], 1)
@@ -0,0 +1,193 @@
+"""
+Resized variants for uploaded profile pictures.
+
+Originals stay untouched under MEDIA_ROOT/profiles/. Square thumbnails are
+written to profiles/variants/ in WebP and JPEG so pages that show avatars only
+ship a few kilobytes per user. Uploads are resized by the background worker;
+a variant requested before that has run is rendered in a small process pool
+so the Pillow work never holds up a request thread.
+
+A render that outlives IMAGE_VARIANT_TIMEOUT keeps going in the pool while
+the request is answered with 503 and Retry-After; an original Pillow can't
+decode has no variants at all and is answered with 404.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = 'profiles/variants'
+
+# File extension -> Pillow format name
+VARIANT_FORMATS = {
+    'webp': 'WEBP',
+    'jpg': 'JPEG',
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+_in_flight = {}
+
+
+def variant_name(original_name, size, ext):
+    """
+    Storage name of one variant, e.g. profiles/variants/avatar_1a2b3c4d_small.webp.
+
+    The hash covers the whole original name, so avatar.png and avatar.jpg
+    (or the same file name in two directories) never share variants.
+    """
+    stem = PurePosixPath(original_name).stem
+    digest = hashlib.blake2b(original_name.encode(), digest_size=4).hexdigest()
+    return f"{VARIANT_DIR}/{stem}_{digest}_{size}.{ext}"
+
+
+def render_variants(source_path, targets, quality):
+    """
+    Resize one original into every requested variant.
+
+    Runs inside a pool process, so it only receives plain paths and never
+    touches Django. ``targets`` is a list of (destination path, pixels,
+    Pillow format) tuples.
+    """
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # JPEG has no alpha channel, flatten onto white for every format
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        # Largest first so each smaller size resamples less data
+        for destination, pixels, image_format in sorted(targets, key=lambda t: -t[1]):
+            resized = ImageOps.fit(image, (pixels, pixels), Image.Resampling.LANCZOS)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            temp_path = f"{destination}.{os.getpid()}.tmp"
+            resized.save(temp_path, image_format, quality=quality, optimize=True)
+            os.replace(temp_path, destination)  # Readers never see half-written files
+            image = resized
+    return [target[0] for target in targets]
+
+
+def get_executor():
+    """Lazily start the shared process pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn rather than fork so children don't inherit DB connections
+            # or threads from the web worker
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def missing_targets(original_name, sizes=None):
+    targets = []
+    for size in sizes or settings.PROFILE_PICTURE_SIZES:
+        pixels = settings.PROFILE_PICTURE_SIZES[size]
+        for ext, image_format in VARIANT_FORMATS.items():
+            destination = default_storage.path(variant_name(original_name, size, ext))
+            if not os.path.exists(destination):
+                targets.append((destination, pixels, image_format))
+    return targets
+
+
+def schedule_variants(original_name, sizes=None):
+    """
+    Queue generation of any missing variants for an uploaded picture.
+
+    Returns the pending future, or None when everything already exists.
+    Calls for the same picture while a job is running share that job.
+    """
+    if not original_name:
+        return None
+
+    key = (original_name, tuple(sizes or ()))
+    with _executor_lock:
+        future = _in_flight.get(key)
+    if future is not None and not future.done():
+        return future
+
+    targets = missing_targets(original_name, sizes)
+    if not targets:
+        return None
+
+    future = get_executor().submit(
+        render_variants,
+        default_storage.path(original_name),
+        targets,
+        settings.IMAGE_VARIANT_QUALITY,
+    )
+    with _executor_lock:
+        _in_flight[key] = future
+    future.add_done_callback(lambda f: _in_flight.pop(key, None))
+    return future
+
+
+def generate_variants(original_name, sizes=None):
+    """Render any missing variants in the current process"""
+    targets = missing_targets(original_name, sizes)
+    if targets:
+        render_variants(
+            default_storage.path(original_name), targets, settings.IMAGE_VARIANT_QUALITY
+        )
+    return len(targets)
+
+
+def ensure_variant(original_name, size, ext):
+    """
+    Return the storage name of a variant, generating it first if needed.
+
+    Returns None when the original can't be read as an image. Raises
+    TimeoutError when rendering takes longer than IMAGE_VARIANT_TIMEOUT or
+    the pool has to be restarted; the next request can try again.
+    """
+    global _executor
+    name = variant_name(original_name, size, ext)
+    if not default_storage.exists(name):
+        try:
+            future = schedule_variants(original_name, sizes=[size])
+            if future is not None:
+                future.result(timeout=settings.IMAGE_VARIANT_TIMEOUT)
+        except TimeoutError:
+            # Also an OSError; the render carries on in the pool
+            raise
+        except BrokenProcessPool:
+            # A pool process died (out of memory, killed); start a fresh pool next time
+            with _executor_lock:
+                _executor = None
+            raise TimeoutError(f"Image pool restarted while rendering {original_name}") from None
+        except (OSError, Image.DecompressionBombError) as exc:
+            logger.warning("Cannot render variants of %s: %s", original_name, exc)
+            return None
+    return name
+
+
+def variant_url(profile, size, ext):
+    """
+    URL for a profile picture variant.
+
+    Points straight at the media file once it exists, otherwise at the view
+    that renders it on first request.
+    """
+    if not profile.profile_picture:
+        return ''
+    name = variant_name(profile.profile_picture.name, size, ext)
+    if default_storage.exists(name):
+        return default_storage.url(name)
+    return reverse('profile_picture_variant', args=[profile.pk, size, ext])
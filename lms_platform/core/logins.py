@@ -0,0 +1,109 @@
+"""
+Login throttling.
+
+Failed logins are counted per client IP and per username in the 'logins'
+cache, which every worker shares (Redis, or a file cache on one host), with
+a sliding window: the current and previous fixed windows are kept, and the
+previous one is weighted by how much of it still overlaps the window. Once
+either count reaches its limit further attempts are refused before any
+password is hashed, so abusive traffic costs a couple of cache reads.
+Hashing itself is bounded by a per-process semaphore so a burst of
+legitimate logins queues briefly instead of starving every other request
+of CPU.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+_hash_slots = None
+_hash_slots_lock = threading.Lock()
+
+
+def client_ip(request):
+    """Client address, honouring X-Forwarded-For behind LOGIN_TRUSTED_PROXIES proxies"""
+    proxies = settings.LOGIN_TRUSTED_PROXIES
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(',')]
+        return hops[max(len(hops) - proxies, 0)]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def scopes(request, username):
+    """(scope, value, limit) for every counter that applies to this attempt"""
+    return [
+        ('ip', client_ip(request), settings.LOGIN_IP_LIMIT),
+        ('user', (username or '').strip().lower(), settings.LOGIN_USERNAME_LIMIT),
+    ]
+
+
+def counters():
+    return caches['logins']
+
+
+def cache_key(scope, value, window):
+    digest = hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+    return f"login:{scope}:{digest}:{window}"
+
+
+def retry_after(request, username, now=None):
+    """Seconds until another attempt is allowed, 0 when not throttled"""
+    now = time.time() if now is None else now
+    period = settings.LOGIN_THROTTLE_WINDOW
+    window = int(now // period)
+    overlap = 1 - (now % period) / period
+
+    keys = {}
+    for scope, value, limit in scopes(request, username):
+        keys[scope] = (cache_key(scope, value, window), cache_key(scope, value, window - 1), limit)
+    counts = counters().get_many([key for current, previous, _ in keys.values() for key in (current, previous)])
+
+    wait = 0
+    for current, previous, limit in keys.values():
+        if counts.get(current, 0) + counts.get(previous, 0) * overlap < limit:
+            continue
+        if counts.get(current, 0) >= limit:
+            # Full until the current window becomes the previous one
+            wait = max(wait, period - now % period + period * (1 - limit / counts[current]))
+        else:
+            # Wait for the previous window's weight to fall far enough
+            needed = (limit - counts.get(current, 0)) / counts[previous]
+            wait = max(wait, (overlap - needed) * period)
+    return math.ceil(wait) if wait else 0
+
+
+def record_failure(request, username, now=None):
+    """Count one failed attempt against the client IP and the username"""
+    now = time.time() if now is None else now
+    period = settings.LOGIN_THROTTLE_WINDOW
+    window = int(now // period)
+    cache = counters()
+    for scope, value, _ in scopes(request, username):
+        key = cache_key(scope, value, window)
+        cache.add(key, 0, period * 2)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, period * 2)
+
+
+def clear(username, now=None):
+    """Forget failed attempts for a username after a successful login"""
+    now = time.time() if now is None else now
+    window = int(now // settings.LOGIN_THROTTLE_WINDOW)
+    value = (username or '').strip().lower()
+    counters().delete_many([cache_key('user', value, window), cache_key('user', value, window - 1)])
+
+
+def hash_slots():
+    """Semaphore bounding concurrent password hashing in this process"""
+    global _hash_slots
+    with _hash_slots_lock:
+        if _hash_slots is None:
+            _hash_slots = threading.BoundedSemaphore(settings.LOGIN_HASH_CONCURRENCY)
+        return _hash_slots
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_platform.core.archive import OPEN_STATUSES, archive_term
+from lms_platform.core.models import ArchivedTerm, Course, Enrollment
+
+
+class Command(BaseCommand):
+    help = 'Move a finalized term\'s enrollments and submissions into compressed archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('term', help='Term to archive, e.g. "Q1 2025"')
+        parser.add_argument('--force', action='store_true',
+                            help='Archive even if the term still has active or waitlisted enrollments')
+
+    def handle(self, *args, **options):
+        term = options['term']
+        if not Course.objects.filter(term=term).exists():
+            raise CommandError(f'No courses found in term "{term}".')
+        if ArchivedTerm.objects.filter(term=term).exists():
+            raise CommandError(f'"{term}" is already archived.')
+        still_open = Enrollment.objects.filter(term=term, status__in=OPEN_STATUSES).count()
+        if still_open and not options['force']:
+            raise CommandError(
+                f'"{term}" has {still_open} active or waitlisted enrollment(s); run finalize_term first '
+                f'or pass --force.'
+            )
+
+        archive = archive_term(term)
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived "{term}": {archive.enrollments} enrollment(s), {archive.submissions} submission(s) '
+            f'and {archive.revisions} revision(s) to {archive.path}/'
+        ))
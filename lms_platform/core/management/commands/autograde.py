@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from lms_platform.core.autograde import grade_submissions
+from lms_platform.core.models import Assignment
+
+
+class Command(BaseCommand):
+    help = 'Score quiz submissions against their answer keys (skips work graded by hand)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assignment', type=int, action='append', dest='assignments',
+                            help='Assignment id to grade (repeatable)')
+        parser.add_argument('--course', help='Only quizzes in this course code')
+        parser.add_argument('--term', help='Only quizzes in courses in this term')
+
+    def handle(self, *args, **options):
+        assignments = Assignment.objects.filter(assignment_type='quiz', answer_key__isnull=False)
+        if options['assignments']:
+            assignments = assignments.filter(pk__in=options['assignments'])
+        if options['course']:
+            assignments = assignments.filter(module__course__course_code=options['course'])
+        if options['term']:
+            assignments = assignments.filter(module__course__term=options['term'])
+
+        total = 0
+        for assignment in assignments.select_related('module'):
+            graded = grade_submissions(assignment)
+            total += graded
+            self.stdout.write(f'{assignment}: {graded} graded')
+        self.stdout.write(self.style.SUCCESS(f'Auto-graded {total} submission(s)'))
@@ -1,11 +1,12 @@
 from django.core.management.base import BaseCommand
-from django.contrib.auth.models import User, Permission
+from django.conf import settings
+from django.contrib.auth.models import Group, User, Permission
 from django.contrib.contenttypes.models import ContentType
 from lms_platform.core.models import UserProfile
 
 
 class Command(BaseCommand):
-    help = 'Create a demo user for portfolio viewing (read-only access)'
+    help = 'Create a demo user for portfolio viewing (demo mode: every change is rolled back)'
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Creating demo user for portfolio...'))
@@ -52,6 +53,11 @@ class Command(BaseCommand):
         else:
             self.stdout.write('✅ Demo user profile already exists')
         
+        # Demo group members can use everything; their requests are rolled back
+        demo_group, _ = Group.objects.get_or_create(name=settings.DEMO_GROUP)
+        demo_user.groups.add(demo_group)
+        self.stdout.write(f'✅ Added demo user to the {settings.DEMO_GROUP} group')
+
         # Clear existing permissions
         demo_user.user_permissions.clear()
         
@@ -81,7 +87,7 @@ class Command(BaseCommand):
                 f'\n🎉 Demo user created successfully!\n'
                 f'Username: {username}\n'
                 f'Password: {password}\n'
-                f'Access: Read-only (can view but not modify)\n'
+                f'Access: Demo mode (changes are rolled back)\n'
                 f'Perfect for portfolio demonstrations!'
             )
         )
@@ -91,6 +97,6 @@ class Command(BaseCommand):
                 '\n📝 Add these credentials to your portfolio:\n'
                 f'   Username: {username}\n'
                 f'   Password: {password}\n'
-                '   Note: Read-only access for demonstration purposes'
+                '   Note: Demo mode, nothing is saved'
             )
         )
\ No newline at end of file
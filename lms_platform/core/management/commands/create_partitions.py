@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from lms_platform.core import partitions
+from lms_platform.core.models import Course
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the enrollment and submission partitions of terms that have none yet, moving their '
+        'rows out of the default partition (PostgreSQL only)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*',
+                            help='Terms to create (default: every term with a course)')
+
+    def handle(self, *args, **options):
+        if not partitions.enabled(connection):
+            self.stdout.write(f'{connection.vendor} tables are not partitioned; nothing to create')
+            return
+        terms = options['terms'] or sorted(Course.objects.values_list('term', flat=True).distinct())
+        for term in terms:
+            partitions.ensure(term)
+        self.stdout.write(self.style.SUCCESS(f'Partitions in place for {len(terms)} term(s)'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_platform.core.grading import finalize_term
+from lms_platform.core.models import Course
+
+
+def _show(value):
+    # A grade of 0.00 is a real grade, not a missing one
+    return '-' if value is None else value
+
+
+class Command(BaseCommand):
+    help = 'Lock final grades and GPA points for every active enrollment in a term'
+
+    def add_arguments(self, parser):
+        parser.add_argument('term', help='Term to finalize, e.g. "Q1 2025"')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Show what would change without writing anything')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Enrollments written per UPDATE')
+
+    def handle(self, *args, **options):
+        term = options['term']
+        if not Course.objects.filter(term=term).exists():
+            raise CommandError(f'No courses found in term "{term}".')
+
+        self.stdout.write('Final grades count missing past-due work as zero.')
+        changes = finalize_term(term, dry_run=options['dry_run'], batch_size=options['batch_size'])
+
+        if options['dry_run']:
+            for enrollment, old_grade, old_gpa in changes:
+                self.stdout.write(
+                    f'{enrollment.course.course_code:<12} {enrollment.student.username:<20} '
+                    f'final {_show(old_grade)} -> {_show(enrollment.final_grade)}  '
+                    f'GPA {_show(old_gpa)} -> {_show(enrollment.gpa_points)}'
+                )
+            self.stdout.write(self.style.WARNING(f'Dry run: {len(changes)} enrollment(s) would be finalized'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Finalized {len(changes)} enrollment(s) in "{term}"'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from lms_platform.core import similarity
+from lms_platform.core.models import Submission
+
+
+class Command(BaseCommand):
+    help = 'Compute MinHash signatures and LSH buckets for submissions (backfill or rebuild)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assignment', type=int, action='append', dest='assignments',
+                            help='Assignment id to index (repeatable)')
+        parser.add_argument('--course', help='Only submissions for this course code')
+        parser.add_argument('--term', help='Only submissions for courses in this term')
+        parser.add_argument('--missing', action='store_true',
+                            help='Only submissions that have no signature yet')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.exclude(submission_content='')
+        if options['assignments']:
+            submissions = submissions.filter(assignment_id__in=options['assignments'])
+        if options['course']:
+            submissions = submissions.filter(assignment__module__course__course_code=options['course'])
+        if options['term']:
+            submissions = submissions.filter(term=options['term'])
+        if options['missing']:
+            submissions = submissions.filter(signature__isnull=True)
+
+        indexed = similarity.index(submissions, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} submission(s)'))
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+DB_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in small batches so the session table is never locked for long'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Sessions deleted per statement (default 5000)')
+        parser.add_argument('--sleep', type=float, default=0.1,
+                            help='Seconds to pause between batches (default 0.1)')
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_ENGINES:
+            # Cache entries and signed cookies carry their own expiry
+            self.stdout.write(f'{settings.SESSION_ENGINE} expires sessions on its own; nothing to purge')
+            return
+
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            if len(keys) < options['batch_size']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired session(s)'))
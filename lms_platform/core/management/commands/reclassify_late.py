@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from lms_platform.core.deadlines import reclassify
+from lms_platform.core.models import Submission
+
+
+class Command(BaseCommand):
+    help = 'Recompute late status for submissions after due dates, grace periods or extensions change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assignment', type=int, action='append', dest='assignments',
+                            help='Assignment id to reclassify (repeatable)')
+        parser.add_argument('--course', help='Only submissions for this course code')
+        parser.add_argument('--term', help='Only submissions for courses in this term')
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.all()
+        if options['assignments']:
+            submissions = submissions.filter(assignment_id__in=options['assignments'])
+        if options['course']:
+            submissions = submissions.filter(assignment__module__course__course_code=options['course'])
+        if options['term']:
+            submissions = submissions.filter(term=options['term'])
+
+        updated = reclassify(submissions)
+        self.stdout.write(self.style.SUCCESS(f'Reclassified {updated} submission(s)'))
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_platform.core.models import Course
+from lms_platform.core.rollover import rollover_courses
+
+
+class Command(BaseCommand):
+    help = 'Copy courses with their modules and assignments into a new term'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-term', required=True, help='Term to copy from, e.g. "Q1 2025"')
+        parser.add_argument('--to-term', required=True, help='Term to create, e.g. "Q2 2025"')
+        parser.add_argument('--shift-days', type=int, default=0,
+                            help='Days to move every assignment due date by')
+        parser.add_argument('--course', action='append', dest='course_codes',
+                            help='Only roll over this course code (repeatable)')
+        parser.add_argument('--instructor', help='Username to assign as instructor on every copy')
+
+    def handle(self, *args, **options):
+        courses = Course.objects.filter(term=options['from_term'])
+        if options['course_codes']:
+            courses = courses.filter(course_code__in=options['course_codes'])
+        if not courses.exists():
+            raise CommandError(f'No courses found in term "{options["from_term"]}".')
+
+        instructor = None
+        if options['instructor']:
+            try:
+                instructor = User.objects.get(username=options['instructor'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["instructor"]}" does not exist.')
+
+        new_courses, _ = rollover_courses(
+            courses, options['to_term'], timedelta(days=options['shift_days']), instructor
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled {len(new_courses)} course(s) from "{options["from_term"]}" into "{options["to_term"]}"'
+        ))
@@ -0,0 +1,82 @@
+import multiprocessing
+import signal
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+# Only what a worker needs: the command's options also hold its stdout
+WORKER_OPTIONS = ('once', 'batch_size', 'sleep')
+
+
+def work(options):
+    """
+    Run one worker until SIGTERM, finishing the current task first.
+
+    Module level, and importing nothing from the app until Django is set
+    up, so it also works as a process target under the spawn start method
+    (macOS and Windows), where the child starts from a fresh interpreter.
+    """
+    if not apps.ready:
+        django.setup()
+    from lms_platform.core import queue
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    return queue.work(
+        once=options['once'],
+        batch_size=options['batch_size'],
+        sleep=options['sleep'],
+        should_stop=lambda: bool(stopping),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Run background task workers (database-backed queue, no broker needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Number of worker processes to start')
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Tasks claimed per database round trip')
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when no due tasks are left')
+        parser.add_argument('--purge-days', type=int, default=7,
+                            help='Delete finished tasks older than this many days on startup')
+
+    def handle(self, *args, **options):
+        from lms_platform.core import queue
+
+        requeued = queue.requeue_stale()
+        purged = queue.purge_finished(options['purge_days'])
+        self.stdout.write(f'Requeued {requeued} stale task(s), purged {purged} finished task(s)')
+
+        worker_options = {name: options[name] for name in WORKER_OPTIONS}
+        if options['processes'] <= 1:
+            processed = work(worker_options)
+            self.stdout.write(self.style.SUCCESS(f'Worker stopped after {processed} task(s)'))
+            return
+
+        # Children must open their own database connections
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=work, args=(worker_options,), daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(self.style.SUCCESS(f'Started {len(workers)} worker process(es)'))
+
+        def stop(signum, frame):
+            for worker in workers:
+                worker.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            stop(None, None)
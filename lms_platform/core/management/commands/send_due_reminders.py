@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from lms_platform.core.reminders import send_due_reminders
+
+
+class Command(BaseCommand):
+    help = 'Remind students about assignments due soon that they have not submitted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, action='append', dest='windows',
+                            help='Reminder window in hours (repeatable, defaults to REMINDER_WINDOWS)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Reminders recorded and delivered per batch')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Count pending reminders without sending them')
+
+    def handle(self, *args, **options):
+        sent = send_due_reminders(
+            windows=options['windows'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'Would send' if options['dry_run'] else 'Sent'
+        for window_hours, count in sent.items():
+            self.stdout.write(f'{verb} {count} reminder(s) for the {window_hours}h window')
+        self.stdout.write(self.style.SUCCESS(f'{verb} {sum(sent.values())} reminder(s) in total'))
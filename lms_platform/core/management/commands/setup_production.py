@@ -180,8 +180,8 @@ class Command(BaseCommand):
         
         for course_data in courses_data:
             # Check if course already exists
-            if Course.objects.filter(course_code=course_data['course_code']).exists():
-                course = Course.objects.get(course_code=course_data['course_code'])
+            if Course.objects.filter(course_code=course_data['course_code'], term=term).exists():
+                course = Course.objects.get(course_code=course_data['course_code'], term=term)
                 # Update course details
                 course.course_name = course_data['course_name']
                 course.description = course_data['description']
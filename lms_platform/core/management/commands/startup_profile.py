@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter so nothing is already imported
+PROFILE_SCRIPT = '''
+import json, os, sys, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lms_platform.settings")
+started = time.perf_counter()
+from lms_platform.wsgi import application
+timings = {"django.setup + wsgi": (time.perf_counter() - started) * 1000}
+if sys.argv[1] == "warm":
+    from lms_platform.core import startup
+    timings.update(startup.warm())
+print(json.dumps(timings))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Profile process start-up with python -X importtime and time each warm-up stage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Modules to list (default 25)')
+        parser.add_argument('--no-warm', action='store_true',
+                            help='Stop after loading the WSGI app (what a non-preloaded worker does at boot)')
+        parser.add_argument('--self', action='store_true', dest='by_self',
+                            help='Rank modules by their own import time instead of cumulative time')
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT, 'cold' if options['no_warm'] else 'warm'],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'lms_platform.settings')},
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'profile run failed')
+
+        modules = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, cumulative, name = line[len('import time:'):].split('|')
+            # Nesting shows as indentation: one space at top level, two more per level
+            modules.append((name.strip(), int(own), int(cumulative), len(name) - len(name.lstrip())))
+
+        # Only top-level imports add up to the total
+        total = sum(cumulative for _, _, cumulative, depth in modules if depth == 1)
+        key = 1 if options['by_self'] else 2
+        self.stdout.write(f'{"self ms":>9} {"cumul ms":>9}  module')
+        for name, own, cumulative, _ in sorted(modules, key=lambda row: -row[key])[:options['limit']]:
+            self.stdout.write(f'{own / 1000:9.1f} {cumulative / 1000:9.1f}  {name}')
+
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        self.stdout.write('')
+        for stage, ms in timings.items():
+            self.stdout.write(f'{ms:9.1f} ms  {stage}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(modules)} module(s) imported in {total / 1000:.0f} ms; '
+            f'start-up stages took {sum(timings.values()):.0f} ms'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from lms_platform.core import templating
+
+
+class Command(BaseCommand):
+    help = (
+        'Check that every template compiles and optionally report compile times and '
+        'per-iteration queries in templates (serving processes warm up in gunicorn.conf.py)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--report', action='store_true',
+                            help='List compile time and expensive lookups per template')
+
+    def handle(self, *args, **options):
+        results = templating.warm()
+        errors = [(name, error) for name, _, error in results if error]
+
+        if options['report']:
+            for name, elapsed, error in sorted(results, key=lambda row: -row[1]):
+                self.stdout.write(f'{elapsed:8.1f} ms  {name}')
+                if error:
+                    self.stdout.write(self.style.ERROR(f'             {error}'))
+                    continue
+                for line, lookup in templating.analyse(name):
+                    self.stdout.write(self.style.WARNING(
+                        f'             line {line}: {{{{ {lookup} }}}} runs a query on every loop iteration'
+                    ))
+
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        total = sum(elapsed for _, elapsed, _ in results)
+        self.stdout.write(self.style.SUCCESS(
+            f'Compiled {len(results) - len(errors)} template(s) in {total:.0f} ms'
+        ))
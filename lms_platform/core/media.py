@@ -0,0 +1,187 @@
+"""
+Permission-checked serving of uploaded media.
+
+Django only decides *whether* a file may be downloaded. The bytes are handed
+to the front server (nginx X-Accel-Redirect or Apache/lighttpd X-Sendfile)
+when one is configured, so large submissions never tie up a Python worker.
+Without a front server the file goes out as a FileResponse, which gunicorn
+streams with sendfile(), with single-range support for resumable downloads.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import stat as stat_module
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+from .models import Submission
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+# Compressed uploads are served as the archive they are, never decoded by the
+# browser (as Django's FileResponse does)
+ENCODING_CONTENT_TYPES = {
+    'br': 'application/x-brotli',
+    'bzip2': 'application/x-bzip2',
+    'compress': 'application/x-compress',
+    'gzip': 'application/gzip',
+    'xz': 'application/x-xz',
+}
+
+
+def is_admin(user):
+    """Staff accounts and users with the admin role can read every file"""
+    if user.is_staff or user.is_superuser:
+        return True
+    profile = getattr(user, 'userprofile', None)
+    return profile is not None and profile.role == 'admin'
+
+
+def clean_name(name):
+    """
+    ``name`` as a normalised path relative to MEDIA_ROOT, or None if it is
+    absolute or has a ``..`` component (e.g. profiles/../submissions/x).
+    """
+    if not name or name.startswith('/') or '\\' in name or '\x00' in name:
+        return None
+    if '..' in name.split('/'):
+        return None
+    name = posixpath.normpath(name)
+    if name in ('.', '') or name.startswith('/'):
+        return None
+    return name
+
+
+def can_access(user, name):
+    """
+    Decide whether ``user`` may download the media file ``name``.
+
+    Submission uploads are visible to the submitting student, the course
+    instructor and admins. Profile pictures are visible to any signed-in
+    user. Anything else is admin-only. The prefix rules only ever see the
+    normalised name.
+    """
+    name = clean_name(name)
+    if name is None or not user.is_authenticated:
+        return False
+    if name.startswith('profiles/'):
+        return True
+    if is_admin(user):
+        return True
+    if name.startswith('submissions/'):
+        allowed = Q(student=user) | Q(assignment__module__course__instructor=user)
+        # Earlier uploads stay reachable through the revision history
+        return (
+            Submission.objects.filter(allowed, file_upload=name).exists()
+            or Submission.objects.filter(allowed, revisions__file_name=name).exists()
+        )
+    return False
+
+
+def _content_headers(response, name, path, stat):
+    content_type, encoding = mimetypes.guess_type(path)
+    content_type = ENCODING_CONTENT_TYPES.get(encoding, content_type)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if name.startswith('submissions/'):
+        filename = os.path.basename(name)
+        response['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    return response
+
+
+class RangeFileWrapper:
+    """Iterate over ``length`` bytes of an open file starting at ``offset``"""
+
+    def __init__(self, filelike, offset, length):
+        self.filelike = filelike
+        self.filelike.seek(offset)
+        self.remaining = length
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.filelike.read(min(CHUNK_SIZE, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.filelike.close()
+
+
+def parse_range(header, size):
+    """
+    Turn a single-range ``Range`` header into (start, end) inclusive.
+
+    Returns None for anything we don't handle (multiple ranges, garbage),
+    which means the whole file is sent. Raises ValueError for ranges that
+    can't be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            # An empty file has no final bytes to send (RFC 9110 14.1.2)
+            raise ValueError('Empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError('Range not satisfiable')
+    return start, min(end, size - 1)
+
+
+def serve(request, name):
+    """Build the response that delivers media file ``name``"""
+    path = safe_join(settings.MEDIA_ROOT, name)
+    stat = os.stat(path)  # FileNotFoundError is turned into a 404 by the view
+    if not stat_module.S_ISREG(stat.st_mode):
+        raise Http404("File not found.")
+    backend = settings.MEDIA_SENDFILE_BACKEND
+
+    if backend == 'nginx':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+        return _content_headers(response, name, path, stat)
+
+    if backend == 'xsendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return _content_headers(response, name, path, stat)
+
+    range_header = request.headers.get('Range')
+    if range_header:
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(
+                RangeFileWrapper(open(path, 'rb'), start, length), status=206
+            )
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Accept-Ranges'] = 'bytes'
+            return _content_headers(response, name, path, stat)
+
+    # A real file object lets the WSGI server use sendfile()
+    response = FileResponse(open(path, 'rb'))
+    response['Accept-Ranges'] = 'bytes'
+    return _content_headers(response, name, path, stat)
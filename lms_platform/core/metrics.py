@@ -0,0 +1,343 @@
+"""
+Operational metrics in the Prometheus text exposition format.
+
+Request latency, database queries and cache lookups are counted in memory
+by MetricsMiddleware and the cache-aside helpers, so recording them costs a
+lock and a few additions. Anything that needs the database (queue depth,
+pending submissions, sessions, table totals) is a gauge computed by one
+batch of aggregate queries and cached for METRICS_GAUGE_TTL seconds, which
+keeps scrapes cheap however often they come. The admin index reads the
+same cached figures.
+
+Counters are kept per process, and each process also writes its totals to
+a file of its own in METRICS_DIR: a daemon thread does so within
+METRICS_FLUSH_INTERVAL seconds of any change, and a process answering a
+scrape writes first. A scrape sums every file, so
+whichever gunicorn worker answers, the series are totals across all of
+them and only go down when the directory is cleared at master start-up
+(gunicorn.conf.py), which rate() reads as the counter reset it is. Files
+of exited workers stay and keep contributing their final counts.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from . import demo, templating
+from .models import Assignment, BackgroundTask, Course, Enrollment, Module, Submission, UserProfile
+
+logger = logging.getLogger(__name__)
+
+GAUGES_CACHE_KEY = 'metrics:gauges'
+
+DB_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+_lock = threading.Lock()
+# (view, method) -> [bucket counts..., +Inf count], sum
+_latency_buckets = defaultdict(lambda: [0] * (len(settings.METRICS_LATENCY_BUCKETS) + 1))
+_latency_sum = defaultdict(float)
+# (view, method, status) -> requests
+_responses = defaultdict(int)
+# view -> [queries, seconds]
+_queries = defaultdict(lambda: [0, 0.0])
+# (cache name, 'hit' | 'miss') -> lookups
+_cache_lookups = defaultdict(int)
+# (pid, this process's file in METRICS_DIR), renewed after a fork
+_process_file = (None, None)
+# pid whose flusher thread is running; threads don't survive a fork
+_flusher_pid = None
+_dirty = threading.Event()
+_flush_lock = threading.Lock()
+
+
+def observe_request(view, method, status, seconds, queries, query_seconds):
+    """Record one finished request"""
+    bucket = bisect_left(settings.METRICS_LATENCY_BUCKETS, seconds)
+    with _lock:
+        _latency_buckets[(view, method)][bucket] += 1
+        _latency_sum[(view, method)] += seconds
+        _responses[(view, method, status)] += 1
+        totals = _queries[view]
+        totals[0] += queries
+        totals[1] += query_seconds
+    _changed()
+
+
+def record_cache(name, hit):
+    """Count one lookup in a cache-aside helper, e.g. record_cache('transcript', True)"""
+    with _lock:
+        _cache_lookups[(name, 'hit' if hit else 'miss')] += 1
+    _changed()
+
+
+class QueryTimer:
+    """connection.execute_wrapper() callable that counts and times queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def build_gauges():
+    """Database-backed figures, a handful of aggregate queries in total"""
+    now = timezone.now()
+    gauges = {
+        'users': User.objects.aggregate(total=Count('pk')),
+        'profiles': UserProfile.objects.aggregate(
+            total=Count('pk'),
+            students=Count('pk', filter=Q(role='student')),
+            instructors=Count('pk', filter=Q(role='instructor')),
+            admins=Count('pk', filter=Q(role='admin')),
+        ),
+        'courses': Course.objects.aggregate(total=Count('pk')),
+        'modules': Module.objects.aggregate(total=Count('pk')),
+        'assignments': Assignment.objects.aggregate(total=Count('pk')),
+        'enrollments': Enrollment.objects.aggregate(
+            total=Count('pk'),
+            active=Count('pk', filter=Q(status='active')),
+            waitlisted=Count('pk', filter=Q(status='waitlisted')),
+            recent=Count('pk', filter=Q(enrollment_date__gte=now - timedelta(days=7))),
+        ),
+        'submissions': Submission.objects.aggregate(
+            total=Count('pk'),
+            graded=Count('pk', filter=Q(status='graded')),
+            # Late work waits for grading too
+            pending=Count('pk', filter=~Q(status='graded')),
+        ),
+        'tasks': {
+            row['status']: row['count']
+            for row in BackgroundTask.objects.exclude(status='done')
+            .values('status').annotate(count=Count('pk')).order_by()
+        },
+        'sessions': None,
+    }
+    oldest = BackgroundTask.objects.filter(status='queued', run_at__lte=now).aggregate(oldest=Min('run_at'))['oldest']
+    gauges['tasks']['oldest_queued_seconds'] = (now - oldest).total_seconds() if oldest else 0
+    if settings.SESSION_ENGINE in DB_SESSION_ENGINES:
+        gauges['sessions'] = Session.objects.filter(expire_date__gt=now).count()
+    gauges['computed_at'] = time.time()
+    return gauges
+
+
+def get_gauges():
+    """Cached gauges, shared by every worker through the cache"""
+    gauges = cache.get(GAUGES_CACHE_KEY)
+    if gauges is None:
+        gauges = build_gauges()
+        demo.cache_set(cache, GAUGES_CACHE_KEY, gauges, settings.METRICS_GAUGE_TTL)
+    return gauges
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _family(lines, name, kind, help_text, samples):
+    """Append one metric family; ``samples`` is [(suffix, labels dict, value)]"""
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for suffix, labels, value in samples:
+        lines.append(f'{name}{suffix}{_labels(**labels) if labels else ""} {_format_number(value)}')
+
+
+def reset():
+    """Forget this process's counters, e.g. in the gunicorn master before forking"""
+    with _lock:
+        for series in (_latency_buckets, _latency_sum, _responses, _queries, _cache_lookups):
+            series.clear()
+
+
+def snapshot():
+    """This process's counters as JSON-friendly rows"""
+    with _lock:
+        data = {
+            'latency': [[view, method, list(counts), _latency_sum[(view, method)]]
+                        for (view, method), counts in _latency_buckets.items()],
+            'responses': [[*key, count] for key, count in _responses.items()],
+            'queries': [[view, *totals] for view, totals in _queries.items()],
+            'cache_lookups': [[*key, count] for key, count in _cache_lookups.items()],
+        }
+    data['templates'] = [[name, count, count * mean_ms / 1000] for name, count, mean_ms, _ in templating.render_stats()]
+    return data
+
+
+def process_file():
+    """This process's file in METRICS_DIR; unique even when a pid is reused"""
+    global _process_file
+    pid, path = _process_file
+    if pid != os.getpid():
+        pid = os.getpid()
+        path = os.path.join(settings.METRICS_DIR, f'{pid}-{uuid.uuid4().hex[:8]}.json')
+        _process_file = (pid, path)
+    return path
+
+
+def _changed():
+    """Note unsaved counts, starting this process's flusher thread if needed"""
+    global _flusher_pid
+    if not settings.METRICS_DIR:
+        return
+    _dirty.set()
+    if _flusher_pid != os.getpid():
+        with _lock:
+            if _flusher_pid != os.getpid():
+                _flusher_pid = os.getpid()
+                threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True).start()
+
+
+def _flush_loop():
+    while True:
+        _dirty.wait()
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)  # Batch up a burst of requests
+        _dirty.clear()
+        flush()
+
+
+def flush():
+    """Write this process's counters to its file in METRICS_DIR"""
+    if not settings.METRICS_DIR:
+        return
+    path = process_file()
+    with _flush_lock:
+        try:
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            with open(f'{path}.tmp', 'w') as handle:
+                json.dump(snapshot(), handle)
+            os.replace(f'{path}.tmp', path)  # Scrapes never read half-written files
+        except OSError as exc:
+            logger.warning('Cannot write metrics to %s: %s', path, exc)
+
+
+def collect():
+    """Counters summed over every process that has written to METRICS_DIR, plus this one"""
+    snapshots = [snapshot()]
+    if settings.METRICS_DIR:
+        flush()
+        own = os.path.basename(process_file())
+        names = os.listdir(settings.METRICS_DIR) if os.path.isdir(settings.METRICS_DIR) else []
+        for name in names:
+            if not name.endswith('.json') or name == own:
+                continue
+            try:
+                with open(os.path.join(settings.METRICS_DIR, name)) as handle:
+                    snapshots.append(json.load(handle))
+            except (OSError, ValueError):
+                continue  # Removed or replaced while listing
+
+    latency = defaultdict(lambda: [0] * (len(settings.METRICS_LATENCY_BUCKETS) + 1))
+    latency_sum = defaultdict(float)
+    responses = defaultdict(int)
+    queries = defaultdict(lambda: [0, 0.0])
+    cache_lookups = defaultdict(int)
+    templates = defaultdict(lambda: [0, 0.0])
+    for data in snapshots:
+        for view, method, counts, seconds in data['latency']:
+            totals = latency[(view, method)]
+            for bucket, count in enumerate(counts[:len(totals)]):
+                totals[bucket] += count
+            latency_sum[(view, method)] += seconds
+        for view, method, status, count in data['responses']:
+            responses[(view, method, status)] += count
+        for view, count, seconds in data['queries']:
+            queries[view][0] += count
+            queries[view][1] += seconds
+        for name, result, count in data['cache_lookups']:
+            cache_lookups[(name, result)] += count
+        for name, count, seconds in data['templates']:
+            templates[name][0] += count
+            templates[name][1] += seconds
+    return latency, latency_sum, responses, queries, cache_lookups, templates
+
+
+def render():
+    """The full exposition text"""
+    latency, latency_sum, responses, queries, cache_lookups, templates = collect()
+
+    lines = []
+    samples = []
+    bounds = [repr(float(bound)) for bound in settings.METRICS_LATENCY_BUCKETS] + ['+Inf']
+    for (view, method), counts in sorted(latency.items()):
+        cumulative = 0
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            samples.append(('_bucket', {'view': view, 'method': method, 'le': bound}, cumulative))
+        samples.append(('_sum', {'view': view, 'method': method}, latency_sum[(view, method)]))
+        samples.append(('_count', {'view': view, 'method': method}, cumulative))
+    _family(lines, 'lms_http_request_duration_seconds', 'histogram',
+            'Time from request to response, per view.', samples)
+
+    _family(lines, 'lms_http_responses_total', 'counter', 'Responses by view, method and status.', [
+        ('', {'view': view, 'method': method, 'status': status}, count)
+        for (view, method, status), count in sorted(responses.items())
+    ])
+    _family(lines, 'lms_db_queries_total', 'counter', 'Database queries run while handling requests.', [
+        ('', {'view': view}, totals[0]) for view, totals in sorted(queries.items())
+    ])
+    _family(lines, 'lms_db_query_seconds_total', 'counter', 'Time spent in database queries.', [
+        ('', {'view': view}, totals[1]) for view, totals in sorted(queries.items())
+    ])
+    _family(lines, 'lms_cache_lookups_total', 'counter', 'Cache-aside lookups by cache and result.', [
+        ('', {'cache': name, 'result': result}, count)
+        for (name, result), count in sorted(cache_lookups.items())
+    ])
+
+    if templates:
+        _family(lines, 'lms_template_renders_total', 'counter', 'Template renders (TEMPLATE_SLOW_RENDER_MS enabled).', [
+            ('', {'template': name}, count) for name, (count, _) in sorted(templates.items())
+        ])
+        _family(lines, 'lms_template_render_seconds_total', 'counter', 'Time spent rendering templates.', [
+            ('', {'template': name}, seconds) for name, (_, seconds) in sorted(templates.items())
+        ])
+
+    gauges = get_gauges()
+    _family(lines, 'lms_task_queue', 'gauge', 'Background tasks by status (excluding done).', [
+        ('', {'status': status}, gauges['tasks'].get(status, 0)) for status in ('queued', 'running', 'failed')
+    ])
+    _family(lines, 'lms_task_queue_oldest_seconds', 'gauge', 'Age of the oldest runnable queued task.', [
+        ('', None, gauges['tasks']['oldest_queued_seconds']),
+    ])
+    _family(lines, 'lms_submissions', 'gauge', 'Submissions by state.', [
+        ('', {'state': state}, gauges['submissions'][state]) for state in ('total', 'graded', 'pending')
+    ])
+    _family(lines, 'lms_enrollments', 'gauge', 'Enrollments by state.', [
+        ('', {'state': state}, gauges['enrollments'][state]) for state in ('total', 'active', 'waitlisted')
+    ])
+    if gauges['sessions'] is not None:
+        _family(lines, 'lms_sessions_active', 'gauge', 'Unexpired database sessions.', [
+            ('', None, gauges['sessions']),
+        ])
+    _family(lines, 'lms_gauges_age_seconds', 'gauge', 'Age of the cached database gauges.', [
+        ('', None, max(time.time() - gauges['computed_at'], 0.0)),
+    ])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,96 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import connections, transaction
+from django.http import HttpResponse, JsonResponse
+
+from . import demo, health, metrics
+
+
+class HealthCheckMiddleware:
+    """
+    Answer HEALTH_LIVENESS_PATH and HEALTH_READINESS_PATH before anything
+    else runs: no host validation (load balancers often probe by IP), no
+    session, no URL resolution.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == settings.HEALTH_LIVENESS_PATH:
+            response = HttpResponse('ok', content_type='text/plain')
+        elif request.path == settings.HEALTH_READINESS_PATH:
+            ok, checks, age = health.readiness()
+            response = JsonResponse(
+                {'status': 'ok' if ok else 'unavailable', 'age': age, 'checks': checks},
+                status=200 if ok else 503,
+            )
+        else:
+            return self.get_response(request)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class MetricsMiddleware:
+    """Time each request and count its database queries, per resolved view"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = metrics.QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.route) if match else 'unmatched'
+        metrics.observe_request(
+            view,
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+            timer.count,
+            timer.seconds,
+        )
+        return response
+
+
+class DemoModeMiddleware:
+    """
+    Run every request from a demo user in transactions that are always
+    rolled back (see core/demo.py). Must come after the session,
+    authentication and message middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not demo.is_demo(request.user):
+            return self.get_response(request)
+
+        session_key = request.session.session_key
+        token = demo._rolled_back.set(True)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(transaction.atomic(using=alias))
+                response = self.get_response(request)
+                for alias in connections:
+                    transaction.set_rollback(True, using=alias)
+        finally:
+            demo._rolled_back.reset(token)
+
+        if session_key and request.session.session_key != session_key:
+            # Logout or a key rotation deleted the old session; the rollback
+            # brought it back, so delete it for good
+            request.session.delete(session_key)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            messages.info(request, 'Demo mode: changes are rolled back and were not saved.')
+        return response
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:17
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_duedatereminder"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadlineExtension",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("due_date", models.DateTimeField()),
+                ("reason", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="assignment",
+            name="grace_period",
+            field=models.DurationField(blank=True, default=datetime.timedelta(0)),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="is_late",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                condition=models.Q(("is_late", True)),
+                fields=["assignment"],
+                name="core_submission_late_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deadlineextension",
+            name="assignment",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="deadline_extensions",
+                to="core.assignment",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deadlineextension",
+            name="granted_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="granted_extensions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="deadlineextension",
+            name="student",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="deadline_extensions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="deadlineextension",
+            unique_together={("student", "assignment")},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_late_submissions"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="course",
+            name="course_code",
+            field=models.CharField(max_length=20),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:28
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_seats(apps, schema_editor):
+    Course = apps.get_model("core", "Course")
+    Enrollment = apps.get_model("core", "Enrollment")
+    seats = (
+        Enrollment.objects.filter(
+            course=OuterRef("pk"), status__in=["active", "completed"]
+        )
+        .order_by()
+        .values("course")
+        .annotate(taken=Count("pk"))
+        .values("taken")
+    )
+    Course.objects.update(enrolled_count=Coalesce(Subquery(seats), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_course_code_per_term"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="enrolled_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="enrollment",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("active", "Active"),
+                    ("waitlisted", "Waitlisted"),
+                    ("completed", "Completed"),
+                    ("dropped", "Dropped"),
+                ],
+                default="active",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                fields=["course", "status", "enrollment_date"],
+                name="core_enroll_waitlist_idx",
+            ),
+        ),
+        migrations.RunPython(count_seats, migrations.RunPython.noop),
+    ]
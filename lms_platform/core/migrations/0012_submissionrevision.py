@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:32
+
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_existing(apps, schema_editor):
+    """Current content of existing submissions becomes their version 1"""
+    Submission = apps.get_model("core", "Submission")
+    SubmissionRevision = apps.get_model("core", "SubmissionRevision")
+    batch = []
+    for pk, content, file_name in Submission.objects.values_list(
+        "pk", "submission_content", "file_upload"
+    ).iterator(chunk_size=1000):
+        batch.append(
+            SubmissionRevision(
+                submission_id=pk,
+                number=1,
+                is_snapshot=True,
+                data=zlib.compress(content.encode("utf-8")),
+                file_name=file_name or "",
+                size=len(content),
+            )
+        )
+        if len(batch) == 1000:
+            SubmissionRevision.objects.bulk_create(batch)
+            batch = []
+    SubmissionRevision.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_enrollment_capacity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionRevision",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("is_snapshot", models.BooleanField(default=False)),
+                ("data", models.BinaryField()),
+                ("file_name", models.CharField(blank=True, max_length=255)),
+                ("size", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "submission",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revisions",
+                        to="core.submission",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["submission", "number"],
+                "unique_together": {("submission", "number")},
+            },
+        ),
+        migrations.RunPython(snapshot_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_similarity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assignment",
+            name="answer_key",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="autograded",
+            field=models.BooleanField(default=False),
+        ),
+    ]
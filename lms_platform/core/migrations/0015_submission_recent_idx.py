@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_autograding"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                fields=["-submission_date"], name="core_submission_recent_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:54
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_demo_group(apps, schema_editor):
+    """The demo group replaces the hard-coded PortfolioDemo username checks"""
+    Group = apps.get_model("auth", "Group")
+    User = apps.get_model("auth", "User")
+    group, _ = Group.objects.get_or_create(name=settings.DEMO_GROUP)
+    for user in User.objects.filter(username="PortfolioDemo"):
+        user.groups.add(group)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0015_submission_recent_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_demo_group, migrations.RunPython.noop),
+    ]
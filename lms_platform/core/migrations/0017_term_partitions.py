@@ -0,0 +1,278 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:59
+
+import hashlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.migrations.exceptions import IrreversibleError
+from django.db.models import OuterRef, Subquery
+from django.utils.text import slugify
+
+# The DDL below is a frozen copy of what lms_platform.core.partitions did
+# when this migration was written, so later changes there can't alter it.
+# partition_name() must keep producing the names partitions.ensure() expects.
+TABLES = ["core_enrollment", "core_submission"]
+
+
+def partition_name(table, term):
+    digest = hashlib.blake2b(term.encode(), digest_size=4).hexdigest()
+    return f"{table}_{slugify(term).replace('-', '_')[:30]}_{digest}"
+
+
+def default_name(table):
+    return f"{table}_default"
+
+
+def create_partition(schema_editor, table, term):
+    """
+    Add ``term``'s partition to ``table``, moving over any of its rows that
+    landed in the default partition before it existed.
+    """
+    quote = schema_editor.quote_name
+    name, default = partition_name(table, term), default_name(table)
+    schema_editor.execute(
+        f"CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    schema_editor.execute(f"INSERT INTO {quote(name)} SELECT * FROM {quote(default)} WHERE term = %s", [term])
+    schema_editor.execute(f"DELETE FROM {quote(default)} WHERE term = %s", [term])
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES IN ({schema_editor.quote_value(term)})"
+    )
+
+
+def partition_table(schema_editor, table):
+    """
+    Rebuild ``table`` as a table partitioned by term with the same columns,
+    constraints and indexes, one partition per existing term.
+    """
+    quote = schema_editor.quote_name
+    old = f"{table}_unpartitioned"
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() "
+            "AND tablename = %s AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+            [table, table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+        sequence = cursor.fetchone()[0]
+        cursor.execute(f"SELECT DISTINCT term FROM {quote(table)}")
+        terms = [row[0] for row in cursor.fetchall()]
+
+    # Free the constraint and index names, and the id sequence, for the new table
+    schema_editor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+    for name, _ in indexes:
+        schema_editor.execute(f"DROP INDEX {quote(name)}")
+    for name, _, _ in constraints:
+        schema_editor.execute(f"ALTER TABLE {quote(old)} DROP CONSTRAINT {quote(name)}")
+    schema_editor.execute(f"ALTER TABLE {quote(old)} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+    schema_editor.execute(f"ALTER TABLE {quote(old)} ALTER COLUMN id DROP DEFAULT")
+    if sequence:
+        schema_editor.execute(f"DROP SEQUENCE IF EXISTS {sequence}")
+
+    schema_editor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY LIST (term)"
+    )
+    id_sequence = f"{table}_id_seq"
+    schema_editor.execute(f"CREATE SEQUENCE {quote(id_sequence)} OWNED BY {quote(table)}.id")
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{id_sequence}'::regclass)"
+    )
+    schema_editor.execute(
+        f"SELECT setval('{id_sequence}'::regclass, COALESCE((SELECT max(id) FROM {quote(old)}), 0) + 1, false)"
+    )
+    for name, kind, definition in constraints:
+        if kind == 'p':
+            definition = 'PRIMARY KEY (id, term)'
+        schema_editor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}")
+    for _, definition in indexes:
+        schema_editor.execute(definition)
+
+    schema_editor.execute(f"CREATE TABLE {quote(default_name(table))} PARTITION OF {quote(table)} DEFAULT")
+    for term in terms:
+        create_partition(schema_editor, table, term)
+    schema_editor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+    schema_editor.execute(f"DROP TABLE {quote(old)}")
+    schema_editor.execute(f"ANALYZE {quote(table)}")
+
+
+def copy_course_terms(apps, schema_editor):
+    """Fill the new term columns from each row's course"""
+    Course = apps.get_model("core", "Course")
+    Enrollment = apps.get_model("core", "Enrollment")
+    Submission = apps.get_model("core", "Submission")
+    Enrollment.objects.update(
+        term=Subquery(Course.objects.filter(pk=OuterRef("course_id")).values("term"))
+    )
+    Submission.objects.update(
+        term=Subquery(
+            Course.objects.filter(
+                modules__assignments=OuterRef("assignment_id")
+            ).values("term")
+        )
+    )
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for table in TABLES:
+            partition_table(schema_editor, table)
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        raise IrreversibleError(
+            "Partitioned tables can't be turned back into plain ones"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_demo_group"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=50, unique=True)),
+                ("path", models.CharField(max_length=255)),
+                ("enrollments", models.PositiveIntegerField(default=0)),
+                ("submissions", models.PositiveIntegerField(default=0)),
+                ("revisions", models.PositiveIntegerField(default=0)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name="enrollment",
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name="submission",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="enrollment",
+            name="term",
+            field=models.CharField(default="", editable=False, max_length=50),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="term",
+            field=models.CharField(default="", editable=False, max_length=50),
+        ),
+        migrations.RunPython(copy_course_terms, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="similaritybucket",
+            name="submission",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="similarity_buckets",
+                to="core.submission",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="submissionrevision",
+            name="submission",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="revisions",
+                to="core.submission",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="submissionsignature",
+            name="submission",
+            field=models.OneToOneField(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="signature",
+                to="core.submission",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="enrollment",
+            unique_together={("student", "course", "term")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="submission",
+            unique_together={("student", "assignment", "term")},
+        ),
+        migrations.CreateModel(
+            name="ArchivedEnrollment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=50)),
+                ("course_code", models.CharField(max_length=20)),
+                ("course_name", models.CharField(max_length=200)),
+                ("credits", models.PositiveIntegerField()),
+                (
+                    "final_grade",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=5, null=True
+                    ),
+                ),
+                (
+                    "gpa_points",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=3, null=True
+                    ),
+                ),
+                ("completed", models.DateTimeField()),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_enrollments",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "archive",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transcript_rows",
+                        to="core.archivedterm",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["student", "completed"],
+                        name="core_archived_student_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:20
+
+from django.db import migrations
+from django.db.models import (
+    BooleanField, Case, DateTimeField, ExpressionWrapper, F, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce
+
+
+def classify_existing_submissions(apps, schema_editor):
+    """
+    0009 added is_late with a default of False, so rows submitted before it
+    were never classified. This is a frozen copy of deadlines.reclassify():
+    the extension's due date if there is one, otherwise the assignment's due
+    date plus its grace period; graded rows keep their status.
+    """
+    Assignment = apps.get_model("core", "Assignment")
+    DeadlineExtension = apps.get_model("core", "DeadlineExtension")
+    Submission = apps.get_model("core", "Submission")
+    extension_due = DeadlineExtension.objects.filter(
+        student=OuterRef("student"), assignment=OuterRef("assignment"),
+    ).values("due_date")[:1]
+    assignment_due = Assignment.objects.filter(pk=OuterRef("assignment")).annotate(
+        deadline=ExpressionWrapper(F("due_date") + F("grace_period"), output_field=DateTimeField()),
+    ).values("deadline")[:1]
+    deadline = Coalesce(Subquery(extension_due), Subquery(assignment_due), output_field=DateTimeField())
+    Submission.objects.update(is_late=ExpressionWrapper(
+        Q(submission_date__gt=deadline), output_field=BooleanField(),
+    ))
+    Submission.objects.exclude(status="graded").update(status=Case(
+        When(is_late=True, then=Value("late")),
+        default=Value("submitted"),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_term_partitions"),
+    ]
+
+    operations = [
+        migrations.RunPython(classify_existing_submissions, migrations.RunPython.noop),
+    ]
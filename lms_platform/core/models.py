@@ -1,5 +1,8 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class UserProfile(models.Model):
     """
@@ -24,6 +27,15 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.role})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.profile_picture:
+            # Thumbnails are built by the background worker, off the request path
+            from . import images
+            from .tasks import generate_profile_variants
+            if images.missing_targets(self.profile_picture.name):
+                generate_profile_variants.enqueue(self.profile_picture.name)
+
 
 class Course(models.Model):
     """
@@ -33,18 +45,34 @@ class Course(models.Model):
     with different instructors.
     """ 
 
-    course_code = models.CharField(max_length=20, unique=True)  # e.g., "MATH101"
+    course_code = models.CharField(max_length=20)  # e.g., "MATH101", unique per term (see Meta)
     course_name = models.CharField(max_length=200)  # e.g., "Introduction to Mathematics"
     description = models.TextField()
     credits = models.PositiveIntegerField()
     term = models.CharField(max_length=50)  # e.g., "Spring 2024"
     instructor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='courses_taught')
     max_enrollment = models.PositiveIntegerField()
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)  # Seats taken, maintained by core.enrollment
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.course_code} - {self.course_name} ({self.term})"
+
+    def save(self, *args, **kwargs):
+        # Enrollments and submissions keep a copy of the term (their
+        # partition key on PostgreSQL), so a term change is pushed down to them.
+        # No DDL here: a term without partitions lands in the default one
+        # until rollover or `manage.py create_partitions` creates them.
+        from . import partitions
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            previous_term = None
+            if not self._state.adding and (update_fields is None or 'term' in update_fields):
+                previous_term = Course.objects.filter(pk=self.pk).values_list('term', flat=True).first()
+            super().save(*args, **kwargs)
+            if previous_term is not None and previous_term != self.term:
+                partitions.set_course_term(self.pk, self.term)
     
     class Meta:
         unique_together = ['course_code', 'term']  # Same course can exist in different terms
@@ -89,7 +117,9 @@ class Assignment(models.Model):
     module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='assignments')
     assignment_name = models.CharField(max_length=200)  # e.g., "Addition Homework"
     description = models.TextField()
-    due_date = models.DateTimeField()
+    due_date = models.DateTimeField(db_index=True)  # Range-scanned by the reminder job
+    grace_period = models.DurationField(default=timedelta(0), blank=True)  # Extra time before a submission counts as late
+    answer_key = models.JSONField(null=True, blank=True)  # Quiz answers, e.g. {"1": "A", "2": ["B", "C"]} (see core.autograde)
     max_points = models.PositiveIntegerField()  # Total points possible
     assignment_type = models.CharField(max_length=20, choices=ASSIGNMENT_TYPES)
     instructions = models.TextField()  # Detailed instructions for students
@@ -111,6 +141,7 @@ class Enrollment(models.Model):
 
     STATUS_CHOICES = [
         ('active', 'Active'),
+        ('waitlisted', 'Waitlisted'),
         ('completed', 'Completed'),
         ('dropped', 'Dropped'),
     ]
@@ -121,13 +152,39 @@ class Enrollment(models.Model):
     current_grade = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)  # e.g., 85.50
     final_grade = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)  # Locked at term end
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    term = models.CharField(max_length=50, default='', editable=False)  # Copy of course.term, the partition key (see core.partitions)
     gpa_points = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)  # For GPA calculation
     
     def __str__(self):
         return f"{self.student.username} enrolled in {self.course.course_code}"
+
+    def validate_unique(self, exclude=None):
+        # Forms never include the derived term, which would otherwise skip
+        # the (student, course, term) check altogether
+        if self.course_id:
+            self.term = self.course.term
+        super().validate_unique(exclude=set(exclude or ()) - {'term'})
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or not self.term or Enrollment.course.is_cached(self):
+            self.term = self.course.term
+        if self._state.adding and self.status == 'active':
+            # New enrollments need a seat; a full course puts the student on
+            # the waitlist instead of going over max_enrollment
+            from .enrollment import take_seat
+            with transaction.atomic():
+                if not take_seat(self.course_id):
+                    self.status = 'waitlisted'
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
     
     class Meta:
-        unique_together = ['student', 'course']  # Student can only enroll once per course
+        unique_together = ['student', 'course', 'term']  # Student can only enroll once per course (term follows the course)
+        indexes = [
+            # Oldest waitlisted student first when a seat frees up
+            models.Index(fields=['course', 'status', 'enrollment_date'], name='core_enroll_waitlist_idx'),
+        ]
 
 class Submission(models.Model):
     """
@@ -152,10 +209,222 @@ class Submission(models.Model):
     graded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='graded_submissions')
     graded_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='submitted')
+    is_late = models.BooleanField(default=False)  # Derived on save, kept after grading
+    autograded = models.BooleanField(default=False)  # Scored from the answer key; re-scored when it changes
+    term = models.CharField(max_length=50, default='', editable=False)  # Copy of the course's term, the partition key (see core.partitions)
     
     def __str__(self):
         return f"{self.student.username} - {self.assignment.assignment_name}"
+
+    def validate_unique(self, exclude=None):
+        # Forms never include the derived term, which would otherwise skip
+        # the (student, assignment, term) check altogether
+        if self.assignment_id:
+            self.term = self.assignment.module.course.term
+        super().validate_unique(exclude=set(exclude or ()) - {'term'})
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        submission = super().from_db(db, field_names, values)
+        submission._classified_as = submission._deadline_inputs()
+        return submission
+
+    def _deadline_inputs(self):
+        # Deferred fields are left out rather than loaded
+        return tuple(self.__dict__.get(name) for name in ('submission_date', 'student_id', 'assignment_id'))
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or not self.term or Submission.assignment.is_cached(self):
+            self.term = self.assignment.module.course.term
+        # Late status is derived at write time from the deadline (with grace
+        # period and any extension), never computed when listing. Grading and
+        # other edits leave the date alone, so they skip the extension lookup.
+        if self._state.adding or self._deadline_inputs() != getattr(self, '_classified_as', None):
+            from .deadlines import classify
+            classify(self)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'is_late', 'status'}
+        super().save(*args, **kwargs)
+        self._classified_as = self._deadline_inputs()
     
     class Meta:
-        unique_together = ['student', 'assignment']  # One submission per student per assignment
-        ordering = ['-submission_date']
\ No newline at end of file
+        unique_together = ['student', 'assignment', 'term']  # One submission per student per assignment (term follows the course)
+        ordering = ['-submission_date']
+        indexes = [
+            # Newest-first listings (admin changelist, dashboards) without a sort
+            models.Index(fields=['-submission_date'], name='core_submission_recent_idx'),
+            # Only late rows are indexed, so "late work in course X" stays cheap
+            models.Index(fields=['assignment'], condition=models.Q(is_late=True), name='core_submission_late_idx'),
+        ]
+
+
+class SubmissionRevision(models.Model):
+    """
+    One submitted version of a submission's text and file.
+    Most rows store a compressed line delta against the previous version;
+    every few versions a full compressed snapshot keeps reconstruction short
+    (see core.revisions).
+    """
+
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='revisions', db_constraint=False)  # Partitioned target (see core.partitions)
+    number = models.PositiveIntegerField()  # 1 for the first submission
+    is_snapshot = models.BooleanField(default=False)  # Full text rather than a delta
+    data = models.BinaryField()  # zlib-compressed snapshot text or delta ops
+    file_name = models.CharField(max_length=255, blank=True)  # Storage name of the file at this version
+    size = models.PositiveIntegerField(default=0)  # Length of the full text
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.submission} (v{self.number})"
+
+    class Meta:
+        unique_together = ['submission', 'number']
+        ordering = ['submission', 'number']
+
+
+class SubmissionSignature(models.Model):
+    """
+    MinHash signature of a submission's text, used to estimate similarity
+    with other submissions without comparing the texts (see core.similarity).
+    """
+
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, related_name='signature', db_constraint=False)
+    minhash = models.BinaryField()  # Packed unsigned 64-bit MinHash values
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Signature for {self.submission}"
+
+
+class SimilarityBucket(models.Model):
+    """
+    Locality-sensitive hashing index: one row per signature band. Submissions
+    sharing any bucket key are candidate near-duplicates.
+    """
+
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='similarity_buckets', db_constraint=False)
+    key = models.BigIntegerField(db_index=True)  # Hash of (band number, band values)
+
+    def __str__(self):
+        return f"{self.key} -> {self.submission_id}"
+
+
+class DeadlineExtension(models.Model):
+    """
+    A per-student deadline for one assignment, replacing the assignment's
+    due date and grace period when deciding whether a submission is late.
+    """
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='deadline_extensions')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='deadline_extensions')
+    due_date = models.DateTimeField()  # New deadline for this student
+    reason = models.TextField(blank=True)
+    granted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='granted_extensions')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.student.username} - {self.assignment.assignment_name} until {self.due_date:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        unique_together = ['student', 'assignment']
+
+
+class DueDateReminder(models.Model):
+    """
+    Records that a student was reminded about an assignment for one reminder
+    window (e.g. 24 hours before the due date). The unique constraint makes
+    the reminder job idempotent: each student gets one reminder per window.
+    """
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='due_date_reminders')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='due_date_reminders')
+    window_hours = models.PositiveIntegerField()  # Which window triggered it, e.g. 24
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.student.username} - {self.assignment.assignment_name} ({self.window_hours}h)"
+
+    class Meta:
+        unique_together = ['student', 'assignment', 'window_hours']
+
+
+class BackgroundTask(models.Model):
+    """
+    A unit of work queued for the background worker (``manage.py run_worker``).
+    The database is the broker: workers claim due rows in priority order,
+    failed runs are retried with exponential backoff until max_attempts.
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)  # Registered task name, e.g. "lms_platform.core.tasks.generate_profile_variants"
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)  # Higher runs first
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)  # Not picked up before this time
+    locked_by = models.CharField(max_length=100, blank=True)  # Worker currently running it
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        indexes = [
+            # Matches the worker's claim query
+            models.Index(fields=['status', '-priority', 'run_at'], name='core_task_claim_idx'),
+        ]
+
+
+class ArchivedTerm(models.Model):
+    """
+    A closed term whose enrollments and submissions were moved out of the
+    database into compressed CSV files under settings.ARCHIVE_ROOT (see
+    core.archive).
+    """
+
+    term = models.CharField(max_length=50, unique=True)
+    path = models.CharField(max_length=255)  # Directory of the archive files, relative to ARCHIVE_ROOT
+    enrollments = models.PositiveIntegerField(default=0)  # Rows written to each file
+    submissions = models.PositiveIntegerField(default=0)
+    revisions = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.term} (archived {self.archived_at:%Y-%m-%d})"
+
+
+class ArchivedEnrollment(models.Model):
+    """
+    The transcript columns of a completed enrollment from an archived term,
+    kept in the database so transcripts and GPAs still include it.
+    """
+
+    archive = models.ForeignKey(ArchivedTerm, on_delete=models.CASCADE, related_name='transcript_rows')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_enrollments')
+    term = models.CharField(max_length=50)
+    course_code = models.CharField(max_length=20)
+    course_name = models.CharField(max_length=200)
+    credits = models.PositiveIntegerField()
+    final_grade = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    gpa_points = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    completed = models.DateTimeField()  # The enrollment date, as on live transcripts
+
+    def __str__(self):
+        return f"{self.student.username} - {self.course_code} ({self.term})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'completed'], name='core_archived_student_idx'),
+        ]
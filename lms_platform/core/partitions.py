@@ -0,0 +1,129 @@
+"""
+Term partitions for enrollments and submissions.
+
+Enrollment and Submission carry a copy of their course's term, kept in step
+by the models' save() and by Course.save() when a course moves term. On
+PostgreSQL both tables are partitioned BY LIST (term) by migration 0017,
+which carries its own copy of the DDL: one partition per term, plus a
+default partition for rows whose term has none yet. Queries that filter on
+``term`` only touch that term's partition, and a closed term is archived by
+detaching and dropping its partitions (core.archive) rather than deleting
+rows one at a time.
+
+Course.save() never runs DDL. Partitions are created by a term rollover or
+by ``manage.py create_partitions``, which also moves a term's rows out of
+the default partition; a course created for a brand new term in the admin
+lands in the default partition until then.
+
+PostgreSQL wants the partition key in every unique constraint, so the
+primary key is (id, term) and both unique_together sets include term,
+which changes nothing since term follows the course. Foreign keys into a
+partitioned table need such a constraint too, so revisions, signatures and
+similarity buckets point at submissions without a database constraint;
+Django still cascades their deletes.
+
+On other databases the tables stay plain and everything here is a no-op.
+"""
+import hashlib
+
+from django.db import connections, transaction
+from django.utils.text import slugify
+
+TABLES = ['core_enrollment', 'core_submission']
+
+# (database alias, term) pairs known to have partitions
+_known = set()
+
+
+def enabled(connection):
+    return connection.vendor == 'postgresql'
+
+
+def partition_name(table, term):
+    """Table name of ``term``'s partition, within PostgreSQL's 63 characters"""
+    digest = hashlib.blake2b(term.encode(), digest_size=4).hexdigest()
+    return f"{table}_{slugify(term).replace('-', '_')[:30]}_{digest}"
+
+
+def default_name(table):
+    return f"{table}_default"
+
+
+def _exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    return cursor.fetchone()[0]
+
+
+def create_partition(schema_editor, table, term):
+    """
+    Add ``term``'s partition to ``table``, moving over any of its rows that
+    landed in the default partition before it existed.
+    """
+    quote = schema_editor.quote_name
+    name, default = partition_name(table, term), default_name(table)
+    schema_editor.execute(
+        f"CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    schema_editor.execute(f"INSERT INTO {quote(name)} SELECT * FROM {quote(default)} WHERE term = %s", [term])
+    schema_editor.execute(f"DELETE FROM {quote(default)} WHERE term = %s", [term])
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES IN ({schema_editor.quote_value(term)})"
+    )
+
+
+def ensure(term, using='default'):
+    """Create ``term``'s partitions if they don't exist yet"""
+    connection = connections[using]
+    if not enabled(connection) or not term or (using, term) in _known:
+        return
+    with transaction.atomic(using=using), connection.schema_editor(atomic=False) as editor:
+        with connection.cursor() as cursor:
+            for table in TABLES:
+                name = partition_name(table, term)
+                # Two requests creating the same term wait for each other
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [name])
+                if not _exists(cursor, name):
+                    create_partition(editor, table, term)
+        # A rolled-back transaction takes its partitions with it
+        transaction.on_commit(lambda: _known.add((using, term)), using=using)
+
+
+def lock(term, using='default'):
+    """Block writes (not reads) to ``term``'s partitions until the transaction ends"""
+    connection = connections[using]
+    if not enabled(connection):
+        return
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            name = partition_name(table, term)
+            # A term without partitions lives in the default one
+            cursor.execute(
+                f"LOCK TABLE {connection.ops.quote_name(name if _exists(cursor, name) else default_name(table))} "
+                f"IN EXCLUSIVE MODE"
+            )
+
+
+def detach(term, using='default'):
+    """Detach and drop ``term``'s partitions. Returns False where tables aren't partitioned."""
+    connection = connections[using]
+    if not enabled(connection):
+        return False
+    with connection.schema_editor() as editor, connection.cursor() as cursor:
+        for table in TABLES:
+            name = partition_name(table, term)
+            if _exists(cursor, name):
+                editor.execute(f"ALTER TABLE {editor.quote_name(table)} DETACH PARTITION {editor.quote_name(name)}")
+                editor.execute(f"DROP TABLE {editor.quote_name(name)}")
+            else:
+                # Never given a partition; its rows are in the default one
+                editor.execute(f"DELETE FROM {editor.quote_name(default_name(table))} WHERE term = %s", [term])
+    _known.discard((using, term))
+    return True
+
+
+def set_course_term(course_id, term):
+    """Move a course's enrollments and submissions to ``term`` (rows change partition on PostgreSQL)"""
+    from .models import Enrollment, Submission
+
+    Enrollment.objects.filter(course_id=course_id).update(term=term)
+    Submission.objects.filter(assignment__module__course_id=course_id).update(term=term)
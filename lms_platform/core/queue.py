@@ -0,0 +1,213 @@
+"""
+Database-backed background task queue.
+
+Tasks are plain functions registered with ``@task``. Calling ``enqueue`` (or
+``func.enqueue``) stores a BackgroundTask row; ``manage.py run_worker`` runs
+them outside the request cycle. No broker is needed: workers claim rows with
+SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL and a conditional UPDATE
+everywhere, so a row is only ever run by one worker.
+
+A claimed batch waits in the worker while earlier tasks run, so each task's
+lock is renewed when it actually starts, and a task that requeue_stale()
+gave to someone else in the meantime is skipped. Tasks still waiting when
+the worker is told to stop go back to the queue at once.
+"""
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func=None, *, name=None, priority=0, max_attempts=None):
+    """
+    Register a function as a background task.
+
+    The function gets an ``enqueue(*args, **kwargs)`` attribute. Arguments
+    must be JSON serialisable, so pass ids rather than model instances.
+    """
+    def register(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        _registry[task_name] = func
+        func.task_name = task_name
+
+        def enqueue_task(*args, **kwargs):
+            return enqueue(
+                task_name, *args,
+                priority=priority, max_attempts=max_attempts,
+                **kwargs,
+            )
+
+        func.enqueue = enqueue_task
+        return func
+
+    if func is not None:
+        return register(func)
+    return register
+
+
+def enqueue(task_name, *args, priority=0, delay=None, max_attempts=None, **kwargs):
+    """
+    Queue ``task_name`` to run in a worker.
+
+    Inside a transaction the row commits (or rolls back) with the caller's
+    changes, so a worker never sees a task for data that doesn't exist yet.
+    """
+    if task_name not in _registry:
+        raise KeyError(f"Unknown background task: {task_name}")
+    run_at = timezone.now()
+    if delay:
+        run_at += delay if isinstance(delay, timedelta) else timedelta(seconds=delay)
+    return BackgroundTask.objects.create(
+        name=task_name,
+        args=list(args),
+        kwargs=kwargs,
+        priority=priority,
+        run_at=run_at,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker_id, batch_size=1):
+    """Lock up to ``batch_size`` due tasks for this worker and return them"""
+    now = timezone.now()
+    with transaction.atomic():
+        due = BackgroundTask.objects.filter(
+            status='queued', run_at__lte=now
+        ).order_by('-priority', 'run_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return []
+        # The status check makes this safe even where FOR UPDATE is a no-op
+        BackgroundTask.objects.filter(id__in=ids, status='queued').update(
+            status='running',
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+    return list(
+        BackgroundTask.objects.filter(id__in=ids, status='running', locked_by=worker_id)
+        .order_by('-priority', 'run_at', 'id')
+    )
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number ``attempts`` (1-based), with jitter"""
+    delay = min(settings.TASK_RETRY_BACKOFF * 2 ** (attempts - 1), settings.TASK_MAX_BACKOFF)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def release(tasks):
+    """Return claimed tasks (one worker's batch) that never started to the queue"""
+    if not tasks:
+        return 0
+    return BackgroundTask.objects.filter(
+        pk__in=[background_task.pk for background_task in tasks],
+        status='running', locked_by=tasks[0].locked_by,
+    ).update(status='queued', locked_by='', locked_at=None, attempts=F('attempts') - 1)
+
+
+def run(background_task):
+    """
+    Execute one claimed task and record the outcome: True on success, False
+    on failure, None when the claim was lost to requeue_stale()
+    """
+    started = BackgroundTask.objects.filter(
+        pk=background_task.pk, status='running', locked_by=background_task.locked_by,
+    ).update(locked_at=timezone.now())
+    if not started:
+        logger.warning("Task %s #%s was requeued before it started; skipping",
+                       background_task.name, background_task.pk)
+        return None
+    func = _registry.get(background_task.name)
+    try:
+        if func is None:
+            raise KeyError(f"Unknown background task: {background_task.name}")
+        func(*background_task.args, **background_task.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Task %s #%s failed (attempt %s)", background_task.name,
+                       background_task.pk, background_task.attempts)
+        if func is not None and background_task.attempts < background_task.max_attempts:
+            BackgroundTask.objects.filter(pk=background_task.pk).update(
+                status='queued',
+                run_at=timezone.now() + timedelta(seconds=backoff(background_task.attempts)),
+                locked_by='',
+                locked_at=None,
+                last_error=error,
+            )
+        else:
+            BackgroundTask.objects.filter(pk=background_task.pk).update(
+                status='failed', finished_at=timezone.now(), last_error=error,
+            )
+        return False
+
+    BackgroundTask.objects.filter(pk=background_task.pk).update(
+        status='done', finished_at=timezone.now(), locked_by='', locked_at=None,
+    )
+    return True
+
+
+def requeue_stale(timeout=None):
+    """Put back tasks whose worker died mid-run"""
+    cutoff = timezone.now() - timedelta(seconds=timeout or settings.TASK_LOCK_TIMEOUT)
+    return BackgroundTask.objects.filter(status='running', locked_at__lt=cutoff).update(
+        status='queued', locked_by='', locked_at=None,
+    )
+
+
+def purge_finished(days):
+    """Delete completed tasks older than ``days``; failed ones are kept for inspection"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = BackgroundTask.objects.filter(status='done', finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def work(worker_id=None, once=False, batch_size=10, sleep=1.0, should_stop=lambda: False):
+    """
+    Worker loop: claim due tasks, run them, sleep when the queue is empty.
+
+    Stale tasks of dead workers are requeued every TASK_REQUEUE_INTERVAL
+    seconds. With ``once`` the loop exits as soon as nothing is due. Returns
+    the number of tasks processed.
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    requeued_at = None
+    while not should_stop():
+        close_old_connections()
+        if requeued_at is None or time.monotonic() - requeued_at >= settings.TASK_REQUEUE_INTERVAL:
+            requeue_stale()
+            requeued_at = time.monotonic()
+        tasks = claim(worker_id, batch_size)
+        if not tasks:
+            if once:
+                break
+            time.sleep(sleep)
+            continue
+        for index, background_task in enumerate(tasks):
+            if should_stop():
+                release(tasks[index:])
+                break
+            if run(background_task) is not None:
+                processed += 1
+    return processed
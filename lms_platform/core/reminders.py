@@ -0,0 +1,207 @@
+"""
+Due date reminders.
+
+Each configured window (settings.REMINDER_WINDOWS, in hours) owns the band of
+due dates between it and the next smaller window, so an assignment due in 20
+hours only triggers the 24h reminder, never the 72h one as well. For every
+band a single query joins active enrollments to the course's assignments and
+anti-joins Submission and DueDateReminder, giving exactly the students who
+still need a nudge. Those rows are recorded and delivered in batches through
+a pluggable backend (settings.REMINDER_BACKEND), in the style of Django's
+email backends.
+"""
+import json
+import sys
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import DueDateReminder, Enrollment, Submission
+
+ReminderMessage = namedtuple('ReminderMessage', [
+    'student_id', 'assignment_id', 'window_hours',
+    'email', 'name', 'course_code', 'assignment_name', 'due_date',
+])
+
+
+class BaseBackend:
+    """Delivers a batch of ReminderMessage tuples, returns how many were sent"""
+
+    def send_messages(self, messages):
+        raise NotImplementedError
+
+    def format(self, message):
+        due = timezone.localtime(message.due_date).strftime('%b %d, %Y %I:%M %p')
+        subject = f"Reminder: {message.assignment_name} is due soon"
+        body = (
+            f"Hi {message.name},\n\n"
+            f"{message.course_code} - {message.assignment_name} is due {due} "
+            f"and we haven't received your submission yet.\n"
+        )
+        return subject, body
+
+
+class ConsoleBackend(BaseBackend):
+    """Writes reminders to stdout, for development"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send_messages(self, messages):
+        for message in messages:
+            subject, _ = self.format(message)
+            self.stream.write(f"[reminder {message.window_hours}h] {message.email}: {subject}\n")
+        self.stream.flush()
+        return len(messages)
+
+
+class FileBackend(BaseBackend):
+    """Appends reminders as JSON lines to settings.REMINDER_FILE_PATH"""
+
+    def __init__(self, path=None):
+        self.path = path or settings.REMINDER_FILE_PATH
+
+    def send_messages(self, messages):
+        with open(self.path, 'a', encoding='utf-8') as handle:
+            for message in messages:
+                subject, body = self.format(message)
+                handle.write(json.dumps({
+                    'to': message.email,
+                    'subject': subject,
+                    'body': body,
+                    'student_id': message.student_id,
+                    'assignment_id': message.assignment_id,
+                    'window_hours': message.window_hours,
+                }) + '\n')
+        return len(messages)
+
+
+class EmailBackend(BaseBackend):
+    """Sends reminders through Django's email backend over one connection per batch"""
+
+    def send_messages(self, messages):
+        emails = []
+        for message in messages:
+            if not message.email:
+                continue
+            subject, body = self.format(message)
+            emails.append(EmailMessage(subject, body, to=[message.email]))
+        return get_connection().send_messages(emails) or 0
+
+
+def get_backend():
+    return import_string(settings.REMINDER_BACKEND)()
+
+
+def window_bands(windows, now):
+    """Yield (window_hours, lower, upper) due date bands, smallest window first"""
+    lower = now
+    for hours in sorted(set(windows)):
+        upper = now + timedelta(hours=hours)
+        yield hours, lower, upper
+        lower = upper
+
+
+def pending_reminders(window_hours, lower, upper):
+    """
+    Students with an active enrollment, an assignment due in (lower, upper],
+    no submission for it and no reminder yet for this window. One query.
+    """
+    already_submitted = Submission.objects.filter(
+        student=OuterRef('student_id'), assignment=OuterRef('assignment_id'),
+    )
+    already_reminded = DueDateReminder.objects.filter(
+        student=OuterRef('student_id'), assignment=OuterRef('assignment_id'),
+        window_hours=window_hours,
+    )
+    rows = (
+        Enrollment.objects.filter(
+            status='active',
+            course__modules__assignments__due_date__gt=lower,
+            course__modules__assignments__due_date__lte=upper,
+        )
+        # The annotations reuse the (inner) join made by the filter above
+        .annotate(
+            assignment_id=F('course__modules__assignments__id'),
+            due_date=F('course__modules__assignments__due_date'),
+            assignment_name=F('course__modules__assignments__assignment_name'),
+        )
+        .filter(~Exists(already_submitted), ~Exists(already_reminded))
+        .values_list(
+            'student_id', 'assignment_id', 'student__email', 'student__first_name',
+            'student__username', 'course__course_code', 'assignment_name', 'due_date',
+        )
+    )
+    return [
+        ReminderMessage(
+            student_id, assignment_id, window_hours, email, first_name or username,
+            course_code, assignment_name, due_date,
+        )
+        for (student_id, assignment_id, email, first_name, username,
+             course_code, assignment_name, due_date) in rows
+    ]
+
+
+def record_reminders(batch, window_hours, now):
+    """
+    Insert DueDateReminder rows for a batch, skipping ones that already
+    exist, and return the messages whose row this call inserted.
+
+    Another run working on the same window concurrently loses the conflict
+    for every reminder it didn't insert itself, so each reminder is claimed,
+    and sent, by exactly one run. Multi-row INSERT ... RETURNING rather than
+    bulk_create: building 100k model instances cost more than the anti-join
+    query itself.
+    """
+    table = connection.ops.quote_name(DueDateReminder._meta.db_table)
+    sent_at = DueDateReminder._meta.get_field('sent_at').get_db_prep_save(now, connection)
+    columns = ['student_id', 'assignment_id', 'window_hours', 'sent_at']
+    rows_per_statement = connection.ops.bulk_batch_size(columns, batch) or len(batch)
+    inserted = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(batch), rows_per_statement):
+            chunk = batch[start:start + rows_per_statement]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s)'] * len(chunk))} "
+                f"ON CONFLICT DO NOTHING RETURNING student_id, assignment_id",
+                [value for message in chunk
+                 for value in (message.student_id, message.assignment_id, window_hours, sent_at)],
+            )
+            inserted.update(cursor.fetchall())
+    return [message for message in batch if (message.student_id, message.assignment_id) in inserted]
+
+
+def send_due_reminders(windows=None, now=None, backend=None, batch_size=None, dry_run=False):
+    """
+    Find and deliver every pending reminder. Returns {window_hours: count}.
+
+    Reminders are recorded before delivery, so a crash mid-batch can lose a
+    reminder but never send one twice, and only reminders this run recorded
+    are sent, so overlapping runs never double up either.
+    """
+    windows = windows or settings.REMINDER_WINDOWS
+    now = now or timezone.now()
+    backend = backend or get_backend()
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+
+    sent = {}
+    for window_hours, lower, upper in window_bands(windows, now):
+        messages = pending_reminders(window_hours, lower, upper)
+        if dry_run:
+            sent[window_hours] = len(messages)
+            continue
+        sent[window_hours] = 0
+        for start in range(0, len(messages), batch_size):
+            with transaction.atomic():
+                batch = record_reminders(messages[start:start + batch_size], window_hours, now)
+            if batch:
+                backend.send_messages(batch)
+            sent[window_hours] += len(batch)
+    return sent
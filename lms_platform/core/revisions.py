@@ -0,0 +1,118 @@
+"""
+Submission version history.
+
+Each resubmission adds a SubmissionRevision. Instead of a full copy of the
+text, a revision stores the line-level edits that turn the previous version
+into this one (difflib opcodes), JSON-encoded and zlib-compressed. Every
+SUBMISSION_SNAPSHOT_INTERVAL versions, or whenever the delta would not be
+smaller, the full text is stored instead, so rebuilding any version means
+one snapshot plus a bounded number of deltas.
+"""
+import difflib
+import json
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import SubmissionRevision
+
+
+def compress(text):
+    return zlib.compress(text.encode('utf-8'))
+
+
+def make_delta(old, new):
+    """[[start, end, new_lines], ...] replacing old lines start:end, in order"""
+    old_lines, new_lines = old.splitlines(True), new.splitlines(True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != 'equal'
+    ]
+
+
+def apply_delta(old, delta):
+    old_lines, result, position = old.splitlines(True), [], 0
+    for start, end, lines in delta:
+        result.extend(old_lines[position:start])
+        result.extend(lines)
+        position = end
+    result.extend(old_lines[position:])
+    return ''.join(result)
+
+
+def decode(is_snapshot, data, previous):
+    data = zlib.decompress(bytes(data)).decode('utf-8')
+    return data if is_snapshot else apply_delta(previous, json.loads(data))
+
+
+def reconstruct(submission_id, number=None):
+    """Text of version ``number`` (default: the latest), or None if it doesn't exist"""
+    revisions = SubmissionRevision.objects.filter(submission_id=submission_id)
+    if number is not None:
+        revisions = revisions.filter(number__lte=number)
+    snapshot = revisions.filter(is_snapshot=True).order_by('-number').values_list('number', flat=True).first()
+    if snapshot is None:
+        return None
+    chain = list(
+        revisions.filter(number__gte=snapshot).order_by('number')
+        .values_list('number', 'is_snapshot', 'data')
+    )
+    if number is not None and chain[-1][0] != number:
+        return None
+    text = ''
+    for _, is_snapshot, data in chain:
+        text = decode(is_snapshot, data, text)
+    return text
+
+
+def record(submission_id, text, file_name=None):
+    """
+    Add a revision for ``text`` unless it matches the latest one.
+
+    ``file_name`` of None keeps the previous version's file. Call inside the
+    transaction that wrote the submission, whose row lock serialises
+    revision numbers per submission. Returns the new revision or None.
+    """
+    with transaction.atomic():
+        latest = (
+            SubmissionRevision.objects.filter(submission_id=submission_id)
+            .order_by('-number').only('number', 'file_name').first()
+        )
+        if latest is None:
+            number, previous, file_name = 1, None, file_name or ''
+        else:
+            number, previous = latest.number + 1, reconstruct(submission_id, latest.number)
+            file_name = latest.file_name if file_name is None else file_name
+            if previous == text and file_name == latest.file_name:
+                return None
+
+        snapshot = compress(text)
+        is_snapshot = previous is None or (number - 1) % settings.SUBMISSION_SNAPSHOT_INTERVAL == 0
+        data = snapshot
+        if not is_snapshot:
+            data = zlib.compress(json.dumps(make_delta(previous, text), separators=(',', ':')).encode('utf-8'))
+            if len(data) >= len(snapshot):
+                # A rewrite, not an edit: the full text is no bigger
+                is_snapshot, data = True, snapshot
+
+        return SubmissionRevision.objects.create(
+            submission_id=submission_id,
+            number=number,
+            is_snapshot=is_snapshot,
+            data=data,
+            file_name=file_name,
+            size=len(text),
+        )
+
+
+def diff(submission_id, old_number, new_number):
+    """Unified diff lines between two versions of a submission"""
+    old = reconstruct(submission_id, old_number) or ''
+    new = reconstruct(submission_id, new_number) or ''
+    return list(difflib.unified_diff(
+        old.splitlines(), new.splitlines(),
+        fromfile=f'v{old_number}', tofile=f'v{new_number}', lineterm='',
+    ))
@@ -0,0 +1,93 @@
+"""
+Term rollover: copy courses, with their modules and assignments, into a new
+term.
+
+Everything is copied with one bulk INSERT per model (courses, then modules,
+then assignments) inside a single transaction, so rolling hundreds of
+courses takes a handful of queries and either fully happens or not at all.
+Enrollments and submissions are never copied.
+"""
+from django.db import transaction
+
+from . import partitions
+from .models import Assignment, Course, Module
+
+BATCH_SIZE = 1000
+
+# Never copied from the source row
+SKIP_FIELDS = {'id', 'created_at', 'updated_at'}
+
+
+def clone(obj, **overrides):
+    """Unsaved copy of ``obj`` with ``overrides`` applied (FKs by attname, e.g. course_id)"""
+    values = {
+        field.attname: getattr(obj, field.attname)
+        for field in obj._meta.concrete_fields
+        if field.name not in SKIP_FIELDS
+    }
+    values.update(overrides)
+    return type(obj)(**values)
+
+
+def rollover_courses(courses, new_term, shift, instructor=None):
+    """
+    Copy ``courses`` into ``new_term``, moving assignment due dates by ``shift``.
+
+    Courses that already exist in the new term (same course_code) are
+    skipped so the rollover can be re-run safely. When the same course_code
+    is selected from several terms, only the most recently created course
+    is copied. ``instructor`` replaces the instructor on every copy when
+    given. Returns (new courses, source courses skipped as duplicates).
+    """
+    with transaction.atomic():
+        # bulk_create() skips Course.save(), which would create these
+        partitions.ensure(new_term)
+        sources, duplicates, seen = [], [], set()
+        for course in courses.exclude(term=new_term).order_by('-created_at', '-pk'):
+            if course.course_code in seen:
+                duplicates.append(course)
+            else:
+                seen.add(course.course_code)
+                sources.append(course)
+        already_rolled = set(
+            Course.objects.filter(
+                term=new_term, course_code__in=[course.course_code for course in sources]
+            ).values_list('course_code', flat=True)
+        )
+        sources = [course for course in sources if course.course_code not in already_rolled]
+        if not sources:
+            return [], duplicates
+
+        new_courses = Course.objects.bulk_create(
+            [
+                clone(
+                    course,
+                    term=new_term,
+                    enrolled_count=0,
+                    instructor_id=instructor.pk if instructor else course.instructor_id,
+                )
+                for course in sources
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        course_ids = {old.pk: new.pk for old, new in zip(sources, new_courses)}
+
+        old_modules = list(Module.objects.filter(course_id__in=course_ids).order_by('pk'))
+        new_modules = Module.objects.bulk_create(
+            [clone(module, course_id=course_ids[module.course_id]) for module in old_modules],
+            batch_size=BATCH_SIZE,
+        )
+        module_ids = {old.pk: new.pk for old, new in zip(old_modules, new_modules)}
+
+        Assignment.objects.bulk_create(
+            [
+                clone(
+                    assignment,
+                    module_id=module_ids[assignment.module_id],
+                    due_date=assignment.due_date + shift,
+                )
+                for assignment in Assignment.objects.filter(module_id__in=module_ids).iterator(chunk_size=BATCH_SIZE)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    return new_courses, duplicates
@@ -0,0 +1,177 @@
+"""
+Near-duplicate detection for submissions with MinHash and LSH.
+
+Each submission's text is reduced to a set of hashed word shingles and
+summarised by a MinHash signature of SIMILARITY_NUM_PERM values. The
+fraction of positions where two signatures agree estimates the Jaccard
+similarity of the shingle sets. Signatures use one-permutation hashing:
+each shingle hash picks a position with its low bits and competes for that
+position's minimum with the rest, so a signature costs one pass over the
+shingles instead of one pass per hash function. Empty positions borrow from
+the next filled one (rotation densification).
+
+Signatures are split into SIMILARITY_BANDS bands and each band is hashed to
+one SimilarityBucket key. Similar texts very likely share at least one band
+exactly, so finding candidates is an indexed ``key IN (...)`` lookup rather
+than a comparison against every other submission; only those candidates
+have their signatures compared.
+"""
+import hashlib
+import re
+from array import array
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import SimilarityBucket, Submission, SubmissionSignature
+
+WORD = re.compile(r"[a-z0-9']+")
+
+# Signature values are kept below 2**48; an empty position that borrows a
+# neighbour's value adds ROTATION per step so it stays distinct from real ones
+ROTATION = 1 << 48
+
+
+def hash64(value):
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'little')
+
+
+def shingles(text, size=None):
+    """Set of hashed word n-grams; empty when the text is too short to judge"""
+    size = size or settings.SIMILARITY_SHINGLE_SIZE
+    words = WORD.findall(text.lower())
+    if len(words) < max(settings.SIMILARITY_MIN_WORDS, size):
+        return set()
+    return {
+        hash64(' '.join(words[i:i + size]).encode('utf-8'))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def minhash(shingle_set, num_perm=None):
+    """MinHash signature (list of ints) of a non-empty shingle set"""
+    num_perm = num_perm or settings.SIMILARITY_NUM_PERM
+    bins = [None] * num_perm
+    for value in shingle_set:
+        position, value = value % num_perm, (value // num_perm) % ROTATION
+        if bins[position] is None or value < bins[position]:
+            bins[position] = value
+
+    signature = list(bins)
+    for position, value in enumerate(bins):
+        if value is None:
+            step = 1
+            while bins[(position + step) % num_perm] is None:
+                step += 1
+            signature[position] = bins[(position + step) % num_perm] + step * ROTATION
+    return signature
+
+
+def band_keys(signature, bands=None):
+    """One signed 64-bit bucket key per band"""
+    bands = bands or settings.SIMILARITY_BANDS
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        values = array('Q', signature[band * rows:(band + 1) * rows])
+        digest = hashlib.blake2b(values.tobytes(), digest_size=8, person=band.to_bytes(2, 'little'))
+        keys.append(int.from_bytes(digest.digest(), 'little', signed=True))
+    return keys
+
+
+def pack(signature):
+    return array('Q', signature).tobytes()
+
+
+def unpack(data):
+    values = array('Q')
+    values.frombytes(bytes(data))
+    return values
+
+
+def estimate(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+def index(submissions, batch_size=500):
+    """
+    (Re)compute signatures and buckets for ``submissions`` (a queryset).
+
+    Texts too short to compare are removed from the index. Returns the
+    number of submissions indexed.
+    """
+    indexed = 0
+    rows = submissions.order_by('pk').values_list('pk', 'submission_content')
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            indexed += _index_batch(batch)
+            batch = []
+    if batch:
+        indexed += _index_batch(batch)
+    return indexed
+
+
+def _index_batch(rows):
+    signatures, buckets = [], []
+    for pk, text in rows:
+        shingle_set = shingles(text)
+        if not shingle_set:
+            continue
+        signature = minhash(shingle_set)
+        signatures.append(SubmissionSignature(submission_id=pk, minhash=pack(signature)))
+        buckets.extend(SimilarityBucket(submission_id=pk, key=key) for key in band_keys(signature))
+
+    ids = [pk for pk, _ in rows]
+    with transaction.atomic():
+        SimilarityBucket.objects.filter(submission_id__in=ids).delete()
+        SubmissionSignature.objects.filter(submission_id__in=ids).exclude(
+            submission_id__in=[signature.submission_id for signature in signatures]
+        ).delete()
+        SubmissionSignature.objects.bulk_create(
+            signatures,
+            update_conflicts=True,
+            unique_fields=['submission'],
+            update_fields=['minhash', 'updated_at'],
+        )
+        SimilarityBucket.objects.bulk_create(buckets, batch_size=1000)
+    return len(signatures)
+
+
+def similar_to(submission, threshold=None, limit=10):
+    """
+    [(submission, similarity), ...] for indexed submissions whose estimated
+    similarity to ``submission`` is at least ``threshold``, best first. Looks
+    across all assignments and terms.
+    """
+    threshold = settings.SIMILARITY_THRESHOLD if threshold is None else threshold
+    signature = SubmissionSignature.objects.filter(submission=submission).values_list('minhash', flat=True).first()
+    if signature is None:
+        return []
+    signature = unpack(signature)
+
+    candidates = (
+        SimilarityBucket.objects.filter(key__in=band_keys(signature))
+        .exclude(submission=submission)
+        .values('submission_id')
+        .annotate(shared=Count('pk'))
+        .order_by('-shared')
+        .values_list('submission_id', flat=True)[:limit * 20]
+    )
+    scores = {
+        submission_id: estimate(signature, unpack(data))
+        for submission_id, data in SubmissionSignature.objects.filter(
+            submission_id__in=list(candidates)
+        ).values_list('submission_id', 'minhash')
+    }
+    matches = sorted(
+        ((submission_id, score) for submission_id, score in scores.items() if score >= threshold),
+        key=lambda match: -match[1],
+    )[:limit]
+    others = Submission.objects.select_related(
+        'student', 'assignment__module__course'
+    ).in_bulk([submission_id for submission_id, _ in matches])
+    return [(others[submission_id], score) for submission_id, score in matches if submission_id in others]
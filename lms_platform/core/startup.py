@@ -0,0 +1,50 @@
+"""
+Process start-up: warm-up and fork safety.
+
+With gunicorn's preload_app the master imports the project, builds the URL
+resolver (which imports the admin and everything it pulls in), compiles
+every template and reads the collected critical CSS once, then forks. Workers start with all of that already in
+(copy-on-write) memory, so spawning one is nearly free and the first
+request after a deploy doesn't pay for imports or template parsing. Before
+forking, database and cache connections are closed so no socket is shared
+between processes, and the warmed heap is frozen out of the garbage
+collector so collections in workers don't touch (and copy) those pages.
+"""
+import gc
+import time
+
+from django.core.cache import caches
+from django.db import connections
+from django.urls import get_resolver
+
+from . import assets, metrics, templating
+
+
+def warm():
+    """Load the URLconf and compile templates; {stage: ms}"""
+    timings = {}
+    started = time.perf_counter()
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict  # Populates lookups for every namespace
+    timings['urls'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    templating.warm()
+    timings['templates'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    assets.load_critical()
+    timings['critical_css'] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def prepare_fork():
+    """Drop connections opened in the master and freeze the warmed heap"""
+    # Workers count their own requests; nothing the master did belongs in them
+    metrics.reset()
+    connections.close_all()
+    for cache in caches.all(initialized_only=True):
+        cache.close()
+    gc.collect()
+    gc.freeze()
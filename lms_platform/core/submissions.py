@@ -0,0 +1,56 @@
+"""
+Online submissions.
+
+A student's submission is written with a single ``INSERT ... ON CONFLICT
+(student_id, assignment_id, term) DO UPDATE``, so the first submission and every
+resubmission are the same statement. Concurrent requests from one student
+can't create duplicate rows, and nobody waits on a lock held across a
+read-then-write: the deadline-minute spike is one short write per student.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import autograde, dashboard, revisions
+from .deadlines import classify
+from .models import Submission
+from .tasks import index_submission_similarity
+
+# Columns replaced when a student resubmits
+RESUBMIT_FIELDS = ['submission_content', 'submission_date', 'is_late', 'status']
+
+
+def submit(student, assignment, content='', file=None):
+    """
+    Create or replace ``student``'s submission for ``assignment``.
+
+    Late status is derived before the write, so it lands in the same
+    statement, and the new version is added to the revision history.
+    Quizzes with an answer key are graded straight away. A resubmission
+    without a file keeps the earlier upload. Returns the saved submission.
+    """
+    submission = Submission(
+        student=student,
+        assignment=assignment,
+        submission_content=content,
+        file_upload=file,
+        submission_date=timezone.now(),
+        term=assignment.module.course.term,
+    )
+    classify(submission)
+    update_fields = RESUBMIT_FIELDS + (['file_upload'] if file else [])
+    with transaction.atomic():
+        Submission.objects.bulk_create(
+            [submission],
+            update_conflicts=True,
+            unique_fields=['student', 'assignment', 'term'],
+            update_fields=update_fields,
+        )
+        # The upsert holds the row lock, so revision numbers can't collide
+        revisions.record(submission.pk, content, submission.file_upload.name if file else None)
+        if autograde.gradable(assignment):
+            # Quizzes with an answer key are scored before the response returns
+            autograde.grade_submissions(assignment, Submission.objects.filter(pk=submission.pk))
+            submission.refresh_from_db()
+        transaction.on_commit(lambda: dashboard.invalidate([student.pk]))
+        index_submission_similarity.enqueue([submission.pk])
+    return submission
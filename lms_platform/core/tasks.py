@@ -0,0 +1,33 @@
+"""
+Background tasks run by ``manage.py run_worker``.
+"""
+from .queue import task
+from . import autograde, images, similarity
+from .deadlines import reclassify
+from .models import Assignment, Submission
+
+
+@task(priority=-10)
+def generate_profile_variants(picture_name):
+    """Build every thumbnail size for an uploaded profile picture"""
+    images.generate_variants(picture_name)
+
+
+@task(priority=5)
+def reclassify_late_submissions(assignment_ids):
+    """Re-derive late status after due dates or grace periods change"""
+    reclassify(Submission.objects.filter(assignment_id__in=assignment_ids))
+
+
+@task(priority=-5)
+def index_submission_similarity(submission_ids):
+    """Refresh MinHash signatures and LSH buckets for changed submissions"""
+    similarity.index(Submission.objects.filter(pk__in=submission_ids))
+
+
+@task(priority=5)
+def regrade_assignment(assignment_id):
+    """Re-score every auto-graded or ungraded submission after the answer key changes"""
+    assignment = Assignment.objects.select_related('module').filter(pk=assignment_id).first()
+    if assignment is not None:
+        autograde.grade_submissions(assignment)
@@ -0,0 +1,34 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from lms_platform.core import assets
+
+register = template.Library()
+
+
+@register.simple_tag
+def critical_css(name):
+    """
+    Inline a critical CSS file from settings.ASSET_CRITICAL.
+
+    Usage: {% load assets %}{% critical_css 'critical/student-dashboard.css' %}
+    """
+    # Minified CSS from our own bundles; "</" can't occur in it
+    return format_html('<style>{}</style>', mark_safe(assets.critical_css(name)))
+
+
+@register.simple_tag
+def async_stylesheet(href):
+    """
+    A stylesheet that loads without blocking first paint, with a <noscript>
+    fallback. ``href`` is a static path or an absolute URL.
+    """
+    if '//' not in href:
+        href = static(href)
+    return format_html(
+        '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{0}"></noscript>',
+        href,
+    )
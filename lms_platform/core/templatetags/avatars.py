@@ -0,0 +1,32 @@
+from django import template
+from django.conf import settings
+from django.utils.html import format_html
+
+from lms_platform.core import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar(profile, size='small', css_class='avatar'):
+    """
+    Render a profile picture as a <picture> with WebP and JPEG sources.
+
+    Usage: {% load avatars %}{% avatar user.userprofile 'thumb' %}
+    Renders nothing when the profile has no picture.
+    """
+    if not profile or not profile.profile_picture:
+        return ''
+    pixels = settings.PROFILE_PICTURE_SIZES[size]
+    return format_html(
+        '<picture class="{}">'
+        '<source srcset="{}" type="image/webp">'
+        '<img src="{}" width="{}" height="{}" alt="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        css_class,
+        images.variant_url(profile, size, 'webp'),
+        images.variant_url(profile, size, 'jpg'),
+        pixels,
+        pixels,
+        f"{profile.first_name} {profile.last_name}",
+    )
@@ -0,0 +1,157 @@
+"""
+Template warm-up, render timing and a static check for per-row queries.
+
+Templates are compiled once per process by the cached loader. warm()
+compiles every project template up front so no request pays for parsing;
+it runs in the gunicorn master before workers fork (startup.warm, called
+from gunicorn.conf.py). ``manage.py warm_templates`` runs it in a process
+of its own, which warms nothing that serves requests: it is a compile
+check and timing report. With TEMPLATE_SLOW_RENDER_MS set,
+render times are collected per template and slow renders are logged.
+"""
+import logging
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.base import Template, VariableNode
+from django.template.defaulttags import ForNode, IfNode, WithNode
+
+logger = logging.getLogger(__name__)
+
+# Variable lookups that run a query each time they are resolved
+QUERY_LOOKUPS = {'all', 'first', 'last', 'count', 'exists'}
+
+# {template name: [renders, total seconds, slowest seconds]}
+_render_stats = defaultdict(lambda: [0, 0.0, 0.0])
+
+
+def template_dirs(engine):
+    """Directories searched by the engine's loaders, unwrapping the cached loader"""
+    for loader in engine.engine.template_loaders:
+        for inner in getattr(loader, 'loaders', [loader]):
+            yield from inner.get_dirs()
+
+
+def template_names():
+    """Every .html template the project's engines can load, by loader name"""
+    names = set()
+    for engine in engines.all():
+        for directory in template_dirs(engine):
+            root = Path(directory)
+            names.update(path.relative_to(root).as_posix() for path in root.rglob('*.html'))
+    return sorted(names)
+
+
+def warm():
+    """Compile every template into the cached loader; [(name, ms, error)]"""
+    results = []
+    for name in template_names():
+        started = time.perf_counter()
+        error = None
+        for engine in engines.all():
+            try:
+                engine.get_template(name)
+            except Exception as exc:  # noqa: BLE001 - reported, not fatal
+                error = f'{type(exc).__name__}: {exc}'
+        results.append((name, (time.perf_counter() - started) * 1000, error))
+    return results
+
+
+def _condition_expressions(condition):
+    """FilterExpressions inside a parsed {% if %} condition"""
+    if condition is None:
+        return
+    if hasattr(condition, 'value') and hasattr(condition.value, 'var'):
+        yield condition.value
+    yield from _condition_expressions(getattr(condition, 'first', None))
+    yield from _condition_expressions(getattr(condition, 'second', None))
+
+
+def _lookups(node):
+    """Dotted variable lookups used directly by ``node``"""
+    expressions = []
+    if isinstance(node, VariableNode):
+        expressions.append(node.filter_expression)
+    elif isinstance(node, WithNode):
+        expressions.extend(node.extra_context.values())
+    elif isinstance(node, ForNode):
+        expressions.append(node.sequence)
+    elif isinstance(node, IfNode):
+        for condition, _ in node.conditions_nodelists:
+            expressions.extend(_condition_expressions(condition))
+    for expression in expressions:
+        lookups = getattr(expression.var, 'lookups', None)
+        if lookups:
+            yield '.'.join(lookups)
+
+
+def _children(node):
+    for attr in getattr(node, 'child_nodelists', ()):
+        yield from getattr(node, attr, None) or ()
+    if isinstance(node, IfNode):
+        for _, nodelist in node.conditions_nodelists:
+            yield from nodelist
+
+
+def expensive_lookups(template):
+    """
+    [(line, lookup)] for queryset lookups such as ``assignment.submissions.first``
+    made inside a {% for %} loop, where each iteration runs another query.
+    """
+    found = []
+
+    def walk(nodes, in_loop):
+        for node in nodes:
+            if in_loop:
+                for lookup in _lookups(node):
+                    parts = lookup.split('.')
+                    if parts[0] != 'forloop' and set(parts[1:]) & QUERY_LOOKUPS:
+                        found.append((node.token.lineno if node.token else 0, lookup))
+            walk(_children(node), in_loop or isinstance(node, ForNode))
+
+    walk(template.nodelist, False)
+    return found
+
+
+def analyse(name):
+    """Flagged lookups for one template"""
+    template = engines['django'].get_template(name).template
+    return sorted(set(expensive_lookups(template)))
+
+
+def instrument():
+    """Time every Template render; called from AppConfig.ready when enabled"""
+    if getattr(Template, '_lms_timed', False):
+        return
+    original = Template._render
+    threshold = settings.TEMPLATE_SLOW_RENDER_MS / 1000
+
+    def timed_render(self, context):
+        started = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = _render_stats[self.name or '<string>']
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            if elapsed >= threshold:
+                logger.warning('Slow template render: %s took %.1f ms', self.name, elapsed * 1000)
+
+    Template._render = timed_render
+    Template._lms_timed = True
+
+
+def render_stats():
+    """[(name, renders, mean ms, max ms)] slowest first, for this process"""
+    return sorted(
+        (
+            (name, count, total / count * 1000, slowest * 1000)
+            for name, (count, total, slowest) in _render_stats.items()
+        ),
+        key=lambda row: -row[2],
+    )
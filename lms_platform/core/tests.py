@@ -0,0 +1,1141 @@
+"""
+Behaviour tests for the core app: ``python manage.py test lms_platform.core``.
+"""
+import gc
+import gzip
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.db import connection
+from django.template import engines
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import (
+    assets, autograde, catalog, changelists, grading, health, images, logins, metrics, partitions, queue, reminders, revisions, similarity,
+    startup, templating, transcripts,
+)
+from .deadlines import reclassify
+from .enrollment import drop, enroll, recount
+from .models import (
+    Assignment, BackgroundTask, Course, DeadlineExtension, DueDateReminder, Enrollment, Module, Submission,
+    SubmissionRevision, UserProfile,
+)
+from .rollover import rollover_courses
+from .submissions import submit
+
+
+def make_user(username, role='student', **extra):
+    user = User.objects.create_user(username, password='pw12345!', **extra)
+    UserProfile.objects.create(user=user, role=role, first_name=username, last_name='Test')
+    return user
+
+
+def make_course(code='SAFE101', term='Fall 2026', instructor=None, max_enrollment=30):
+    instructor = instructor or User.objects.get_or_create(username=f'{code}-instructor')[0]
+    return Course.objects.create(
+        course_code=code, course_name=f'{code} course', description='', credits=3, term=term,
+        instructor=instructor, max_enrollment=max_enrollment,
+    )
+
+
+def make_assignment(course, name='Homework 1', due_in=timedelta(days=7)):
+    module = Module.objects.get_or_create(
+        course=course, order_number=1,
+        defaults={'module_name': 'Module 1', 'description': '', 'content': ''},
+    )[0]
+    return Assignment.objects.create(
+        module=module, assignment_name=name, description='', due_date=timezone.now() + due_in,
+        max_points=100, assignment_type='homework', instructions='',
+    )
+
+
+class ProtectedMediaTests(TestCase):
+    """Access rules of /media/ (core.media)"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_SENDFILE_BACKEND='')
+        override.enable()
+        self.addCleanup(override.disable)
+
+        os.makedirs(os.path.join(self.media_root, 'profiles'))
+        os.makedirs(os.path.join(self.media_root, 'submissions'))
+        with open(os.path.join(self.media_root, 'profiles', 'pic.png'), 'wb') as handle:
+            handle.write(b'png')
+        with open(os.path.join(self.media_root, 'submissions', 'work.txt'), 'wb') as handle:
+            handle.write(b'my answers')
+        with open(os.path.join(self.media_root, 'submissions', 'work.csv.gz'), 'wb') as handle:
+            handle.write(gzip.compress(b'a,b\n1,2\n'))
+
+        self.owner = make_user('owner')
+        self.other = make_user('other')
+        assignment = make_assignment(make_course())
+        Submission.objects.create(student=self.owner, assignment=assignment, file_upload='submissions/work.txt')
+        Submission.objects.create(
+            student=self.owner, assignment=make_assignment(assignment.module.course, 'Homework 2'),
+            file_upload='submissions/work.csv.gz',
+        )
+
+    def get(self, user, url):
+        self.client.force_login(user)
+        response = self.client.get(url)
+        if response.streaming:
+            response.content_bytes = b''.join(response.streaming_content)
+        return response
+
+    def test_owner_downloads_submission(self):
+        response = self.get(self.owner, '/media/submissions/work.txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_bytes, b'my answers')
+
+    def test_other_student_is_forbidden(self):
+        self.assertEqual(self.get(self.other, '/media/submissions/work.txt').status_code, 403)
+
+    def test_profile_prefix_does_not_reach_submissions(self):
+        for url in (
+            '/media/profiles/../submissions/work.txt',
+            '/media/profiles/%2e%2e/submissions/work.txt',
+            '/media/profiles/%2E%2E/submissions/work.txt',
+        ):
+            with self.subTest(url=url):
+                response = self.get(self.other, url)
+                self.assertIn(response.status_code, (403, 404))
+                self.assertNotEqual(getattr(response, 'content_bytes', response.content), b'my answers')
+
+    def test_profile_pictures_are_visible_to_signed_in_users(self):
+        self.assertEqual(self.get(self.other, '/media/profiles/pic.png').status_code, 200)
+
+    def test_directory_is_not_found(self):
+        staff = make_user('staff', role='admin', is_staff=True)
+        self.assertEqual(self.get(staff, '/media/profiles/').status_code, 404)
+
+    def test_compressed_upload_is_not_decoded_by_the_browser(self):
+        response = self.get(self.owner, '/media/submissions/work.csv.gz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_ranges_of_an_empty_file_are_not_satisfiable(self):
+        open(os.path.join(self.media_root, 'profiles', 'empty.png'), 'wb').close()
+        self.client.force_login(self.owner)
+        for header in ('bytes=-5', 'bytes=0-'):
+            with self.subTest(header=header):
+                response = self.client.get('/media/profiles/empty.png', HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */0')
+
+
+class RolloverTests(TestCase):
+    """Copying courses into a new term (core.rollover)"""
+
+    def setUp(self):
+        self.fall = make_course('SAFE101', 'Fall 2026')
+        self.assignment = make_assignment(self.fall)
+
+    def test_copies_modules_and_shifts_due_dates(self):
+        new_courses, duplicates = rollover_courses(
+            Course.objects.filter(pk=self.fall.pk), 'Spring 2027', timedelta(days=90)
+        )
+        self.assertEqual(duplicates, [])
+        copy = Course.objects.get(course_code='SAFE101', term='Spring 2027')
+        self.assertEqual([course.pk for course in new_courses], [copy.pk])
+        self.assertEqual(copy.enrolled_count, 0)
+        copied = Assignment.objects.get(module__course=copy)
+        self.assertEqual(copied.due_date, self.assignment.due_date + timedelta(days=90))
+
+    def test_rerun_skips_courses_already_rolled(self):
+        courses = Course.objects.filter(pk=self.fall.pk)
+        rollover_courses(courses, 'Spring 2027', timedelta(0))
+        new_courses, _ = rollover_courses(courses, 'Spring 2027', timedelta(0))
+        self.assertEqual(new_courses, [])
+        self.assertEqual(Course.objects.filter(term='Spring 2027').count(), 1)
+
+    def test_same_code_from_two_terms_copies_the_latest(self):
+        winter = make_course('SAFE101', 'Winter 2027', instructor=self.fall.instructor)
+        admin = make_user('admin', role='admin', is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        response = self.client.post('/admin/core/course/', {
+            'action': 'rollover_to_new_term',
+            '_selected_action': [self.fall.pk, winter.pk],
+            'new_term': 'Spring 2027',
+            'shift_days': '0',
+            'index': '0',
+        }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Course.objects.filter(course_code='SAFE101', term='Spring 2027').count(), 1)
+        messages = [str(message) for message in response.context['messages']]
+        self.assertTrue(any('Skipped' in message and 'Fall 2026' in message for message in messages), messages)
+
+
+class RecordingBackend(reminders.BaseBackend):
+    def __init__(self):
+        self.sent = []
+
+    def send_messages(self, messages):
+        self.sent.extend(messages)
+        return len(messages)
+
+
+class ReminderTests(TestCase):
+    """Due date reminders (core.reminders)"""
+
+    def setUp(self):
+        self.student = make_user('student')
+        course = make_course()
+        self.assignment = make_assignment(course, due_in=timedelta(hours=12))
+        Enrollment.objects.create(student=self.student, course=course)
+
+    def test_reminds_once_per_window(self):
+        backend = RecordingBackend()
+        self.assertEqual(reminders.send_due_reminders(windows=[24], backend=backend), {24: 1})
+        self.assertEqual(reminders.send_due_reminders(windows=[24], backend=backend), {24: 0})
+        self.assertEqual([message.student_id for message in backend.sent], [self.student.pk])
+
+    def test_overlapping_run_sends_nothing_already_recorded(self):
+        now = timezone.now()
+        # Both runs find the reminder pending before either records it
+        stale = reminders.pending_reminders(24, now, now + timedelta(hours=24))
+        first, second = RecordingBackend(), RecordingBackend()
+        reminders.send_due_reminders(windows=[24], now=now, backend=first)
+        with mock.patch.object(reminders, 'pending_reminders', return_value=stale):
+            counts = reminders.send_due_reminders(windows=[24], now=now, backend=second)
+        self.assertEqual(len(first.sent), 1)
+        self.assertEqual(second.sent, [])
+        self.assertEqual(counts, {24: 0})
+        self.assertEqual(DueDateReminder.objects.count(), 1)
+
+    def test_submitted_students_are_skipped(self):
+        Submission.objects.create(student=self.student, assignment=self.assignment)
+        backend = RecordingBackend()
+        self.assertEqual(reminders.send_due_reminders(windows=[24], backend=backend), {24: 0})
+        self.assertEqual(backend.sent, [])
+
+
+class MetricsTests(TestCase):
+    """Gauges and request counters (core.metrics)"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(METRICS_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def responses(self, view):
+        """lms_http_responses_total samples for ``view``, by status"""
+        prefix = f'lms_http_responses_total{{view="{view}",method="GET",status="'
+        return {
+            line[len(prefix):].split('"')[0]: int(line.rsplit(' ', 1)[1])
+            for line in metrics.render().splitlines() if line.startswith(prefix)
+        }
+
+    def test_counters_are_summed_across_workers(self):
+        metrics.observe_request('student_login', 'GET', 200, 0.01, 2, 0.001)
+        # What another worker wrote to the shared directory
+        with open(os.path.join(self.directory, '99999-abcdef12.json'), 'w') as handle:
+            json.dump({
+                'latency': [['student_login', 'GET', [1] + [0] * len(settings.METRICS_LATENCY_BUCKETS), 0.004]],
+                'responses': [['student_login', 'GET', 200, 4]],
+                'queries': [['student_login', 3, 0.002]],
+                'cache_lookups': [],
+                'templates': [],
+            }, handle)
+        self.assertEqual(self.responses('student_login'), {'200': 5})
+        self.assertIn('lms_db_queries_total{view="student_login"} 5', metrics.render())
+
+    def test_requests_are_labelled_by_url_name(self):
+        self.client.get(reverse('student_login'))
+        self.assertEqual(self.responses('student_login'), {'200': 1})
+
+    def test_pending_counts_late_ungraded_work(self):
+        course = make_course()
+        on_time = make_assignment(course, 'On time')
+        overdue = make_assignment(course, 'Overdue', due_in=timedelta(days=-7))
+        student, other = make_user('student'), make_user('other')
+        Submission.objects.create(student=student, assignment=on_time)
+        late = Submission.objects.create(student=student, assignment=overdue)
+        Submission.objects.create(student=other, assignment=on_time, status='graded', grade=90)
+        self.assertEqual(late.status, 'late')
+
+        submissions = metrics.build_gauges()['submissions']
+        self.assertEqual(submissions, {'total': 3, 'graded': 1, 'pending': 2})
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_closed_without_a_token_outside_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(make_user('staff', role='admin', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token_opens_the_endpoint(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+
+class ProfilePictureVariantTests(TestCase):
+    """Resized profile pictures rendered on request (core.images)"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        os.makedirs(os.path.join(self.media_root, 'profiles'))
+        with open(os.path.join(self.media_root, 'profiles', 'broken.png'), 'wb') as handle:
+            handle.write(b'not an image')
+        self.user = make_user('student')
+        # update() so the upload isn't queued for background resizing
+        UserProfile.objects.filter(user=self.user).update(profile_picture='profiles/broken.png')
+        self.url = reverse('profile_picture_variant', args=[self.user.userprofile.pk, 'thumb', 'webp'])
+        self.client.force_login(self.user)
+
+    def test_variants_are_named_after_the_whole_original_name(self):
+        names = {
+            images.variant_name(original, 'small', 'webp')
+            for original in ('profiles/avatar.png', 'profiles/avatar.jpg', 'profiles/old/avatar.png')
+        }
+        self.assertEqual(len(names), 3)
+
+    def test_corrupt_upload_is_not_found(self):
+        with mock.patch.object(images, 'schedule_variants', side_effect=images.generate_variants):
+            self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_slow_render_asks_to_retry(self):
+        with mock.patch.object(images, 'schedule_variants', side_effect=TimeoutError):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertTrue(response.has_header('Retry-After'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+
+class TermCopyTests(TestCase):
+    """The term copied onto enrollments and submissions (core.partitions)"""
+
+    def test_moving_a_submission_follows_the_new_course_term(self):
+        student = make_user('student')
+        fall, spring = make_course('SAFE101', 'Fall 2026'), make_course('SAFE101', 'Spring 2027')
+        submission = Submission.objects.create(student=student, assignment=make_assignment(fall))
+        self.assertEqual(submission.term, 'Fall 2026')
+
+        submission.assignment = make_assignment(spring)
+        submission.save()
+        submission.refresh_from_db()
+        self.assertEqual(submission.term, 'Spring 2027')
+
+    def test_course_term_change_moves_its_rows(self):
+        course = make_course()
+        Enrollment.objects.create(student=make_user('student'), course=course)
+        course.term = 'Spring 2027'
+        course.save()
+        self.assertEqual(list(Enrollment.objects.values_list('term', flat=True)), ['Spring 2027'])
+
+    def test_course_saves_never_create_partitions(self):
+        with mock.patch.object(partitions, 'ensure') as ensure:
+            course = make_course()
+            course.course_name = 'Renamed'
+            course.save()
+            course.term = 'Spring 2027'
+            course.save()
+        ensure.assert_not_called()
+
+    def test_rollover_creates_the_new_terms_partitions(self):
+        course = make_course()
+        with mock.patch.object(partitions, 'ensure') as ensure:
+            rollover_courses(Course.objects.filter(pk=course.pk), 'Spring 2027', timedelta(0))
+        ensure.assert_called_once_with('Spring 2027')
+
+    def test_student_pages_read_only_the_current_term(self):
+        student = make_user('student')
+        fall, spring = make_course('SAFE101', 'Fall 2026'), make_course('SAFE102', 'Spring 2027')
+        for course in (fall, spring):
+            Enrollment.objects.create(student=student, course=course)
+            Submission.objects.create(student=student, assignment=make_assignment(course))
+        self.client.force_login(student)
+        with override_settings(CURRENT_TERM='Spring 2027'), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual([e.course for e in response.context['enrollments']], [spring])
+        self.assertEqual([s.term for s in response.context['recent_submissions']], ['Spring 2027'])
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if 'FROM "core_submission"' in sql or 'FROM "core_enrollment"' in sql:
+                self.assertIn('"term" =', sql, sql)
+
+
+class ReclassifyTests(TestCase):
+    """Late status recomputed after deadlines change (core.deadlines)"""
+
+    def test_extension_and_grading(self):
+        assignment = make_assignment(make_course(), due_in=timedelta(days=-1))
+        extended, graded = make_user('extended'), make_user('graded')
+        Submission.objects.create(student=extended, assignment=assignment)
+        Submission.objects.create(student=graded, assignment=assignment, status='graded', grade=80)
+        DeadlineExtension.objects.create(student=extended, assignment=assignment, due_date=timezone.now() + timedelta(days=1))
+
+        self.assertEqual(reclassify(Submission.objects.filter(assignment=assignment)), 2)
+        rows = dict(Submission.objects.values_list('student__username', 'status'))
+        self.assertEqual(rows, {'extended': 'submitted', 'graded': 'graded'})
+        self.assertTrue(Submission.objects.get(student=graded).is_late)
+
+    def test_grading_skips_the_deadline_lookup(self):
+        assignment = make_assignment(make_course(), due_in=timedelta(days=-1))
+        submission = Submission.objects.create(student=make_user('student'), assignment=assignment)
+        submission = Submission.objects.get(pk=submission.pk)
+        submission.grade, submission.status = 90, 'graded'
+        with CaptureQueriesContext(connection) as queries:
+            submission.save()
+        self.assertFalse(any('core_deadlineextension' in q['sql'] for q in queries.captured_queries))
+        self.assertTrue(Submission.objects.get(pk=submission.pk).is_late)
+
+    def test_moving_the_submission_date_reclassifies(self):
+        assignment = make_assignment(make_course(), due_in=timedelta(days=-1))
+        submission = Submission.objects.create(student=make_user('student'), assignment=assignment)
+        submission = Submission.objects.get(pk=submission.pk)
+        submission.submission_date = assignment.due_date - timedelta(hours=1)
+        submission.save(update_fields=['submission_date'])
+        submission = Submission.objects.get(pk=submission.pk)
+        self.assertEqual((submission.is_late, submission.status), (False, 'submitted'))
+
+    def test_migration_classifies_existing_rows(self):
+        from django.apps import apps
+        from importlib import import_module
+        migration = import_module('lms_platform.core.migrations.0018_classify_existing_submissions')
+        assignment = make_assignment(make_course(), due_in=timedelta(days=-1))
+        Submission.objects.create(student=make_user('student'), assignment=assignment)
+        Submission.objects.update(is_late=False, status='submitted')  # As 0009 left them
+
+        migration.classify_existing_submissions(apps, None)
+        self.assertEqual(list(Submission.objects.values_list('is_late', 'status')), [(True, 'late')])
+
+
+ran_tasks = []
+
+
+@queue.task(name='tests.record')
+def record_task(label):
+    ran_tasks.append(label)
+
+
+@queue.task(name='tests.fail')
+def failing_task():
+    raise ValueError('boom')
+
+
+class QueueTests(TestCase):
+    """Claiming, retrying and requeueing background tasks (core.queue)"""
+
+    def setUp(self):
+        ran_tasks.clear()
+
+    def test_claims_by_priority_and_only_once(self):
+        queue.enqueue('tests.record', 'low')
+        queue.enqueue('tests.record', 'high', priority=5)
+        first = queue.claim('worker-a', 1)
+        second = queue.claim('worker-b', 10)
+        self.assertEqual([task.args for task in first + second], [['high'], ['low']])
+        self.assertEqual(queue.claim('worker-c', 10), [])
+        self.assertEqual(set(BackgroundTask.objects.values_list('status', 'attempts')), {('running', 1)})
+
+    def test_failures_back_off_then_give_up(self):
+        failing = queue.enqueue('tests.fail', max_attempts=2)
+        queue.work('worker', once=True)
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), ('queued', 1))
+        self.assertGreater(failing.run_at, timezone.now())
+        self.assertIn('boom', failing.last_error)
+
+        BackgroundTask.objects.update(run_at=timezone.now())
+        queue.work('worker', once=True)
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), ('failed', 2))
+
+    def test_stale_tasks_are_requeued_by_the_work_loop(self):
+        queue.enqueue('tests.record', 'orphan')
+        [claimed] = queue.claim('dead-worker')
+        BackgroundTask.objects.update(locked_at=timezone.now() - timedelta(seconds=settings.TASK_LOCK_TIMEOUT + 1))
+
+        self.assertEqual(queue.work('live-worker', once=True), 1)
+        self.assertEqual(ran_tasks, ['orphan'])
+        # The dead worker's stale claim no longer runs anything
+        self.assertIsNone(queue.run(claimed))
+        self.assertEqual(ran_tasks, ['orphan'])
+
+    def test_stopping_returns_the_rest_of_the_batch(self):
+        for label in ('one', 'two', 'three'):
+            queue.enqueue('tests.record', label)
+        processed = queue.work('worker', batch_size=3, should_stop=lambda: bool(ran_tasks))
+        self.assertEqual(processed, 1)
+        rows = list(BackgroundTask.objects.order_by('id').values_list('status', 'attempts', 'locked_by'))
+        self.assertEqual(rows, [('done', 1, ''), ('queued', 0, ''), ('queued', 0, '')])
+
+    def test_worker_entry_point_survives_pickling(self):
+        import pickle
+        from .management.commands import run_worker
+        self.assertIs(pickle.loads(pickle.dumps(run_worker.work)), run_worker.work)
+
+
+class GradingTests(TestCase):
+    """Course percentages and term finalization (core.grading)"""
+
+    def setUp(self):
+        self.course = make_course()
+        self.done = make_assignment(self.course, 'Done', due_in=timedelta(days=-2))
+        self.skipped = make_assignment(self.course, 'Skipped', due_in=timedelta(days=-1))
+        make_assignment(self.course, 'Upcoming')
+        self.worker, self.skipper = make_user('worker'), make_user('skipper')
+        for student in (self.worker, self.skipper):
+            enroll(student, self.course)
+        Submission.objects.create(student=self.worker, assignment=self.done, grade=90, status='graded')
+        Submission.objects.create(student=self.worker, assignment=self.skipped, grade=70, status='graded')
+        Submission.objects.create(student=self.skipper, assignment=self.done, grade=90, status='graded')
+
+    def test_missing_past_due_work_counts_as_zero(self):
+        percentages = grading.course_percentages([self.course.pk])
+        self.assertEqual(percentages[(self.worker.pk, self.course.pk)], Decimal('80.00'))
+        self.assertEqual(percentages[(self.skipper.pk, self.course.pk)], Decimal('45.00'))
+
+    def test_work_on_an_open_extension_is_not_missing(self):
+        DeadlineExtension.objects.create(
+            student=self.skipper, assignment=self.skipped, due_date=timezone.now() + timedelta(days=1),
+        )
+        percentages = grading.course_percentages([self.course.pk], [self.skipper.pk])
+        self.assertEqual(percentages, {(self.skipper.pk, self.course.pk): Decimal('90.00')})
+
+    def test_enrolled_student_with_nothing_handed_in_gets_zero(self):
+        idle = make_user('idle')
+        enroll(idle, self.course)
+        self.assertEqual(grading.course_percentages([self.course.pk])[(idle.pk, self.course.pk)], Decimal('0.00'))
+
+    def test_finalize_dry_run_writes_nothing(self):
+        out = StringIO()
+        call_command('finalize_term', 'Fall 2026', '--dry-run', stdout=out)
+        self.assertIn('final - -> 45.00', out.getvalue())
+        self.assertFalse(Enrollment.objects.filter(status='completed').exists())
+
+        call_command('finalize_term', 'Fall 2026', stdout=StringIO())
+        grades = dict(Enrollment.objects.values_list('student__username', 'final_grade'))
+        self.assertEqual(grades, {'worker': Decimal('80.00'), 'skipper': Decimal('45.00')})
+        self.assertEqual(set(Enrollment.objects.values_list('status', flat=True)), {'completed'})
+
+
+class SubmissionViewTests(TestCase):
+    """Assignment detail and online submission (core.views, core.submissions)"""
+
+    def setUp(self):
+        self.course = make_course()
+        self.assignment = make_assignment(self.course)
+        self.student = make_user('student')
+        enroll(self.student, self.course)
+        self.client.force_login(self.student)
+
+    def submit(self, content):
+        return self.client.post(reverse('student_submit', args=[self.assignment.pk]), {'submission_content': content})
+
+    def test_only_enrolled_students_see_the_assignment(self):
+        self.assertEqual(self.client.get(reverse('student_assignment', args=[self.assignment.pk])).status_code, 200)
+        self.client.force_login(make_user('outsider'))
+        self.assertEqual(self.client.get(reverse('student_assignment', args=[self.assignment.pk])).status_code, 404)
+        self.assertEqual(self.submit('sneaky').status_code, 404)
+
+    def test_resubmitting_replaces_the_one_submission(self):
+        self.assertEqual(self.submit('first draft').status_code, 302)
+        self.submit('final answer')
+        submission = Submission.objects.get(student=self.student)
+        self.assertEqual((submission.submission_content, submission.status), ('final answer', 'submitted'))
+
+    def test_empty_submission_is_rejected(self):
+        self.assertEqual(self.submit('   ').status_code, 400)
+        self.assertFalse(Submission.objects.exists())
+
+    def test_late_work_is_flagged(self):
+        Assignment.objects.filter(pk=self.assignment.pk).update(due_date=timezone.now() - timedelta(days=1))
+        self.submit('sorry')
+        submission = Submission.objects.get(student=self.student)
+        self.assertEqual((submission.is_late, submission.status), (True, 'late'))
+
+    def test_graded_work_can_no_longer_change(self):
+        self.submit('answer')
+        Submission.objects.update(status='graded', grade=75)
+        self.submit('better answer')
+        self.assertEqual(Submission.objects.get().submission_content, 'answer')
+
+
+class RevisionTests(TestCase):
+    """Delta-compressed submission history (core.revisions)"""
+
+    def setUp(self):
+        self.submission = Submission.objects.create(
+            student=make_user('student'), assignment=make_assignment(make_course()),
+        )
+        override = override_settings(SUBMISSION_SNAPSHOT_INTERVAL=3)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_every_version_is_rebuilt_exactly(self):
+        lines = [f'Paragraph {number} of a long essay.\n' for number in range(40)]
+        versions = []
+        for edit in range(7):
+            lines[edit * 5] = f'Rewritten paragraph {edit}.\n'
+            versions.append(''.join(lines))
+            revisions.record(self.submission.pk, versions[-1])
+
+        snapshots = list(SubmissionRevision.objects.order_by('number').values_list('is_snapshot', flat=True))
+        self.assertEqual(snapshots, [True, False, False, True, False, False, True])
+        for number, text in enumerate(versions, 1):
+            self.assertEqual(revisions.reconstruct(self.submission.pk, number), text)
+        self.assertEqual(revisions.reconstruct(self.submission.pk), versions[-1])
+        self.assertIsNone(revisions.reconstruct(self.submission.pk, 8))
+
+    def test_deltas_are_smaller_than_the_text(self):
+        text = ''.join(f'Line {number} of the answer.\n' for number in range(200))
+        revisions.record(self.submission.pk, text)
+        delta = revisions.record(self.submission.pk, text.replace('Line 100 ', 'Line one hundred '))
+        self.assertFalse(delta.is_snapshot)
+        self.assertLess(len(delta.data), delta.size // 10)
+
+    def test_unchanged_resubmission_adds_nothing(self):
+        revisions.record(self.submission.pk, 'same', 'submissions/a.txt')
+        self.assertIsNone(revisions.record(self.submission.pk, 'same'))
+        self.assertIsNotNone(revisions.record(self.submission.pk, 'same', 'submissions/b.txt'))
+        self.assertEqual(SubmissionRevision.objects.count(), 2)
+
+    def test_diff_between_versions(self):
+        revisions.record(self.submission.pk, 'intro\nold claim\n')
+        revisions.record(self.submission.pk, 'intro\nnew claim\n')
+        self.assertEqual(
+            [line for line in revisions.diff(self.submission.pk, 1, 2) if line[:1] in '+-' and line[:3] not in ('---', '+++')],
+            ['-old claim', '+new claim'],
+        )
+
+
+class SimilarityTests(TestCase):
+    """MinHash signatures and LSH candidate lookup (core.similarity)"""
+
+    def setUp(self):
+        words = [f'word{number}' for number in range(500)]
+        self.random = random.Random(7)
+        self.essay = [self.random.choice(words) for _ in range(300)]
+        self.assignment = make_assignment(make_course())
+
+    def submission(self, username, words):
+        return Submission.objects.create(
+            student=make_user(username), assignment=self.assignment, submission_content=' '.join(words),
+        )
+
+    def test_estimate_tracks_jaccard_similarity(self):
+        edited = list(self.essay)
+        for position in range(0, 300, 10):
+            edited[position] = 'changed'
+        first, second = similarity.shingles(' '.join(self.essay)), similarity.shingles(' '.join(edited))
+        jaccard = len(first & second) / len(first | second)
+        estimate = similarity.estimate(similarity.minhash(first), similarity.minhash(second))
+        self.assertAlmostEqual(estimate, jaccard, delta=0.15)
+
+    def test_finds_near_copies_but_not_unrelated_work(self):
+        original = self.submission('original', self.essay)
+        copy = self.submission('copier', self.essay[:-5] + ['tweak'] * 5)
+        self.submission('honest', self.random.sample(self.essay, len(self.essay)))
+        self.submission('brief', self.essay[:10])
+        self.assertEqual(similarity.index(Submission.objects.all()), 3)
+
+        matches = similarity.similar_to(original)
+        self.assertEqual([match.pk for match, _ in matches], [copy.pk])
+        self.assertGreater(matches[0][1], 0.9)
+
+    def test_reindexing_an_edit_drops_old_buckets(self):
+        original = self.submission('original', self.essay)
+        copy = self.submission('copier', self.essay)
+        similarity.index(Submission.objects.all())
+        Submission.objects.filter(pk=copy.pk).update(submission_content=' '.join(reversed(self.essay)))
+        similarity.index(Submission.objects.filter(pk=copy.pk))
+        self.assertEqual(similarity.similar_to(original), [])
+
+
+class AutogradeTests(TestCase):
+    """Quiz scoring from an answer key (core.autograde)"""
+
+    def setUp(self):
+        self.course = make_course()
+        self.quiz = make_assignment(self.course, 'Quiz 1')
+        Assignment.objects.filter(pk=self.quiz.pk).update(
+            assignment_type='quiz', answer_key={'1': 'A', '2': ['B', 'C'], '3': {'answer': 'D', 'points': 2}},
+        )
+        self.quiz.refresh_from_db()
+        self.student = make_user('student')
+        enroll(self.student, self.course)
+
+    def test_weighted_score_and_feedback(self):
+        key = autograde.normalize_key(self.quiz.answer_key)
+        answers = autograde.parse_answers('1) a\n2. C\n3: b\n')
+        self.assertEqual(answers, {1: 'A', 2: 'C', 3: 'B'})
+        grade, feedback = autograde.score(key, answers, 100)
+        self.assertEqual(grade, Decimal('50.00'))
+        self.assertEqual(feedback, 'Auto-graded: 2 of 3 questions correct. Review question(s) 3.')
+
+    def test_malformed_keys_are_rejected(self):
+        for key in ({}, {'one': 'A'}, {'1': 'AB'}, {'1': {'answer': 'A', 'points': 0}}):
+            with self.subTest(key=key), self.assertRaises(ValueError):
+                autograde.normalize_key(key)
+
+    def test_submitting_a_quiz_grades_it_and_the_course(self):
+        submission = submit(self.student, self.quiz, content='1. A\n2. B\n3. D')
+        self.assertEqual((submission.status, submission.grade, submission.autograded), ('graded', Decimal('100.00'), True))
+        self.assertEqual(Enrollment.objects.get(student=self.student).current_grade, Decimal('100.00'))
+
+    def test_regrading_leaves_hand_graded_work_alone(self):
+        auto = submit(self.student, self.quiz, content='1. A')
+        other = make_user('other')
+        Submission.objects.create(student=other, assignment=self.quiz, submission_content='1. A\n2. B\n3. D',
+                                  status='graded', grade=10)
+        Assignment.objects.filter(pk=self.quiz.pk).update(answer_key={'1': 'A'})
+        self.quiz.refresh_from_db()
+
+        self.assertEqual(autograde.grade_submissions(self.quiz), 1)
+        self.assertEqual(Submission.objects.get(pk=auto.pk).grade, Decimal('100.00'))
+        self.assertEqual(Submission.objects.get(student=other).grade, Decimal('10.00'))
+
+
+class ChangelistTests(TestCase):
+    """Estimated counts and cached filters for big admin tables (core.changelists)"""
+
+    def setUp(self):
+        cache.clear()
+        for number in range(3):
+            queue.enqueue('tests.record', number)
+
+    def test_exact_counts_outside_postgresql(self):
+        self.assertEqual(changelists.estimated_count(BackgroundTask.objects.all()), 3)
+
+    def test_postgresql_uses_planner_estimates_for_big_tables(self):
+        tasks = BackgroundTask.objects.all()
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(changelists, '_reltuples', return_value=250000), \
+                mock.patch.object(changelists, '_plan_rows', return_value=40):
+            self.assertEqual(changelists.estimated_count(tasks, threshold=1000), 250000)
+            # Small estimates are counted exactly
+            self.assertEqual(changelists.estimated_count(tasks.filter(status='queued'), threshold=1000), 3)
+
+    def test_filters_pick_cached_classes(self):
+        self.assertEqual(
+            changelists.cached_filter(Assignment, 'module__course'),
+            ('module__course', changelists.CachedRelatedFieldListFilter),
+        )
+        self.assertEqual(changelists.cached_filter(Assignment, 'due_date'), 'due_date')
+        self.assertEqual(changelists.cached_filter(Course, 'term'), ('term', changelists.CachedAllValuesFieldListFilter))
+
+    def test_filter_choices_are_scanned_once(self):
+        self.client.force_login(make_user('admin', role='admin', is_staff=True, is_superuser=True))
+        scans = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get('/admin/core/backgroundtask/').status_code, 200)
+            scans.append(sum('DISTINCT' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(scans, [1, 0])
+
+
+class TemplatingTests(TestCase):
+    """Template warm-up and the per-row query check (core.templating)"""
+
+    def test_warm_compiles_every_template_into_the_cache(self):
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        results = templating.warm()
+        self.assertIn('student/dashboard.html', [name for name, _, _ in results])
+        self.assertEqual([error for _, _, error in results if error], [])
+        # Served from the cache without reading the file again
+        with mock.patch.object(loader.loaders[0], 'get_contents', side_effect=AssertionError('read from disk')):
+            engines['django'].get_template('student/dashboard.html')
+
+    def test_queryset_lookups_inside_loops_are_flagged(self):
+        template = engines['django'].from_string(
+            '{{ course.modules.count }}\n'
+            '{% for assignment in assignments %}\n'
+            '{{ forloop.counter }} {{ assignment.submissions.first }}\n'
+            '{% if assignment.extensions.exists %}late{% endif %}\n'
+            '{% endfor %}'
+        ).template
+        self.assertEqual(templating.expensive_lookups(template), [
+            (3, 'assignment.submissions.first'), (4, 'assignment.extensions.exists'),
+        ])
+
+    def test_warm_templates_command_reports_success(self):
+        out = StringIO()
+        call_command('warm_templates', stdout=out, stderr=StringIO())
+        self.assertIn('Compiled', out.getvalue())
+
+
+class ProfileLoadingTests(TestCase):
+    """The profile joined to the session user and role_required (core.backends, core.decorators)"""
+
+    def setUp(self):
+        self.course = make_course()
+        self.assignment = make_assignment(self.course)
+        self.student = make_user('student')
+        enroll(self.student, self.course)
+        self.url = reverse('student_assignment', args=[self.assignment.pk])
+
+    def test_profile_comes_with_the_user_query(self):
+        self.client.force_login(self.student)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        profile_queries = [q['sql'] for q in queries.captured_queries if 'core_userprofile' in q['sql']]
+        self.assertEqual(len(profile_queries), 1)
+        self.assertIn('FROM "auth_user"', profile_queries[0])
+
+    def test_other_roles_and_missing_profiles_are_forbidden(self):
+        self.client.force_login(make_user('teacher', role='instructor'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(User.objects.create_user('bare', password='pw12345!'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_anonymous_users_are_sent_to_log_in(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(f'next={self.url}', response['Location'])
+
+
+class HealthCheckTests(TestCase):
+    """Liveness and readiness endpoints (core.health, HealthCheckMiddleware)"""
+
+    def setUp(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        for patcher in (
+            mock.patch.object(health, '_result', None),
+            mock.patch.object(health, '_in_flight', {}),
+            mock.patch.dict(health.PROBES, {'database': lambda: self.calls.append('database')}, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def hang(self):
+        self.calls.append('hang')
+        self.release.wait(10)
+
+    @override_settings(ALLOWED_HOSTS=['lms.example'])
+    def test_liveness_answers_any_host_without_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/healthz', HTTP_HOST='10.0.0.7')
+        self.assertEqual((response.status_code, response.content), (200, b'ok'))
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertEqual(len(queries), 0)
+
+    def test_readiness_is_cached_between_probes(self):
+        for _ in range(3):
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['checks']['database']['ok'])
+        self.assertEqual(self.calls, ['database'])
+
+    @override_settings(HEALTH_PROBE_TIMEOUT=0.2, HEALTH_CACHE_TTL=0)
+    def test_hung_dependency_fails_fast_and_is_not_piled_on(self):
+        health.PROBES['cache'] = self.hang
+        started = time.monotonic()
+        response = self.client.get('/readyz')
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('timed out', response.json()['checks']['cache']['error'])
+
+        self.client.get('/readyz')
+        self.assertEqual(self.calls.count('hang'), 1)
+
+
+class StartupTests(TestCase):
+    """Warm-up in the gunicorn master and fork safety (core.startup)"""
+
+    def test_warm_times_each_stage(self):
+        self.assertEqual(set(startup.warm()), {'urls', 'templates', 'critical_css'})
+
+    def test_prepare_fork_drops_connections_and_freezes_the_heap(self):
+        self.addCleanup(gc.unfreeze)
+        with mock.patch.object(startup, 'connections') as connections, \
+                mock.patch.object(metrics, 'reset') as reset_metrics:
+            startup.prepare_fork()
+        connections.close_all.assert_called_once_with()
+        reset_metrics.assert_called_once_with()
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+    def test_admin_is_not_autodiscovered(self):
+        from django.contrib import admin
+        self.assertNotIn(Course, admin.site._registry)
+
+    def test_startup_profile_runs_in_a_fresh_interpreter(self):
+        out = StringIO()
+        call_command('startup_profile', '--no-warm', '--limit', '3', stdout=out)
+        self.assertIn('django.setup + wsgi', out.getvalue())
+        self.assertIn('module(s) imported', out.getvalue())
+
+
+class EnrollmentTests(TestCase):
+    """Seats, waitlist and promotion (core.enrollment)"""
+
+    def setUp(self):
+        self.course = make_course(max_enrollment=2)
+        self.students = [make_user(f'student{number}') for number in range(4)]
+
+    def seats_taken(self):
+        self.course.refresh_from_db()
+        return self.course.enrolled_count
+
+    def test_full_course_waitlists(self):
+        statuses = [enroll(student, self.course).status for student in self.students]
+        self.assertEqual(statuses, ['active', 'active', 'waitlisted', 'waitlisted'])
+        self.assertEqual(self.seats_taken(), 2)
+
+    def test_stale_course_copies_cannot_overfill(self):
+        # Every request loaded the course while one seat was still free
+        enroll(self.students[0], self.course)
+        copies = [Course.objects.get(pk=self.course.pk) for _ in self.students[1:]]
+        statuses = [enroll(student, copy).status for student, copy in zip(self.students[1:], copies)]
+        self.assertEqual(statuses, ['active', 'waitlisted', 'waitlisted'])
+        self.assertEqual(self.seats_taken(), 2)
+
+    def test_raising_capacity_promotes_in_signup_order(self):
+        for student in self.students:
+            enroll(student, self.course)
+        Course.objects.filter(pk=self.course.pk).update(max_enrollment=3)
+        recount([self.course.pk])
+        statuses = dict(Enrollment.objects.values_list('student__username', 'status'))
+        self.assertEqual((statuses['student2'], statuses['student3']), ('active', 'waitlisted'))
+        self.assertEqual(self.seats_taken(), 3)
+
+    def test_enrolling_twice_returns_the_same_enrollment(self):
+        first = enroll(self.students[0], self.course)
+        self.assertEqual(enroll(self.students[0], self.course).pk, first.pk)
+        self.assertEqual(self.seats_taken(), 1)
+
+    def test_drop_promotes_the_oldest_waitlisted_student(self):
+        enrollments = [enroll(student, self.course) for student in self.students]
+        self.assertTrue(drop(enrollments[0]))
+        statuses = dict(Enrollment.objects.values_list('student__username', 'status'))
+        self.assertEqual(statuses, {
+            'student0': 'dropped', 'student1': 'active', 'student2': 'active', 'student3': 'waitlisted',
+        })
+        self.assertEqual(self.seats_taken(), 2)
+
+    def test_reenrolling_after_a_drop_rejoins_the_queue(self):
+        first = enroll(self.students[0], self.course)
+        enroll(self.students[1], self.course)
+        drop(first)
+        self.assertEqual(self.seats_taken(), 1)
+        self.assertEqual(enroll(self.students[0], self.course).status, 'active')
+        self.assertEqual(enroll(self.students[2], self.course).status, 'waitlisted')
+        self.assertEqual(Enrollment.objects.filter(student=self.students[0]).count(), 1)
+
+    def test_recount_fills_seats_freed_outside_enroll(self):
+        enrollments = [enroll(student, self.course) for student in self.students]
+        Enrollment.objects.filter(pk=enrollments[0].pk).update(status='dropped')
+        recount([self.course.pk])
+        self.assertEqual(self.seats_taken(), 2)
+        self.assertEqual(Enrollment.objects.get(pk=enrollments[2].pk).status, 'active')
+
+    @override_settings(CURRENT_TERM='Fall 2026')
+    def test_catalog_enroll_view_waitlists_when_full(self):
+        for student in self.students[:2]:
+            enroll(student, self.course)
+        self.client.force_login(self.students[2])
+        response = self.client.post(reverse('student_enroll', args=[self.course.pk]), follow=True)
+        self.assertEqual(Enrollment.objects.get(student=self.students[2]).status, 'waitlisted')
+        self.assertIn('waitlist', ' '.join(str(message) for message in response.context['messages']))
+
+
+class SessionSettingsTests(TestCase):
+    """SESSION_BACKEND choices (settings.py)"""
+
+    def load_settings(self, **env):
+        """Import the settings in a fresh interpreter; (SESSION_ENGINE, stderr)"""
+        env = {**os.environ, 'REDIS_URL': '', 'SESSION_REDIS_URL': '', **env}
+        result = subprocess.run(
+            [sys.executable, '-c', 'import lms_platform.settings as s; print(s.SESSION_ENGINE)'],
+            env=env, capture_output=True, text=True,
+        )
+        return result.stdout.strip(), result.stderr
+
+    def test_database_sessions_without_a_shared_cache(self):
+        env = {key: value for key, value in os.environ.items() if key != 'SESSION_BACKEND'}
+        with mock.patch.dict(os.environ, env, clear=True):
+            engine, _ = self.load_settings()
+        self.assertEqual(engine, 'django.contrib.sessions.backends.db')
+
+    def test_cache_sessions_need_redis(self):
+        for backend in ('cached_db', 'cache'):
+            with self.subTest(backend=backend):
+                engine, error = self.load_settings(SESSION_BACKEND=backend)
+                self.assertEqual(engine, '')
+                self.assertIn('ImproperlyConfigured', error)
+
+
+class LoginThrottleTests(TestCase):
+    """Failed login throttling (core.logins)"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(
+            CACHES={**settings.CACHES, 'logins': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': self.directory,
+            }},
+            LOGIN_USERNAME_LIMIT=3,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        make_user('student')
+
+    def login(self, password):
+        return self.client.post(reverse('student_login'), {'username': 'student', 'password': password})
+
+    def test_username_is_locked_after_the_limit(self):
+        for _ in range(3):
+            self.assertEqual(self.login('wrong').status_code, 200)
+        response = self.login('pw12345!')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_success_clears_the_username_count(self):
+        self.login('wrong')
+        self.login('wrong')
+        self.assertEqual(self.login('pw12345!').status_code, 302)
+        self.client.logout()
+        self.login('wrong')
+        self.login('wrong')
+        self.assertEqual(self.login('pw12345!').status_code, 302)
+
+    def test_counters_are_shared_between_processes(self):
+        self.login('wrong')
+        # A second worker opens the same directory with a cache object of its own
+        other_worker = FileBasedCache(self.directory, {})
+        window = int(time.time() // settings.LOGIN_THROTTLE_WINDOW)
+        keys = [logins.cache_key('user', 'student', window - offset) for offset in (0, 1)]
+        self.assertEqual(sum(other_worker.get_many(keys).values()), 1)
+
+
+class TranscriptTests(TestCase):
+    """Transcripts and cumulative GPA (core.transcripts)"""
+
+    def setUp(self):
+        self.student = make_user('student')
+        four = make_course('SAFE101')
+        four.credits = 4
+        four.save()
+        self.enrollments = [
+            Enrollment.objects.create(student=self.student, course=four, status='completed', gpa_points='4.00'),
+            Enrollment.objects.create(
+                student=self.student, course=make_course('SAFE102'), status='completed', gpa_points='2.00',
+            ),
+            Enrollment.objects.create(student=self.student, course=make_course('SAFE103'), status='active'),
+        ]
+        self.addCleanup(transcripts.invalidate, [self.student.pk])
+
+    def test_gpa_is_weighted_by_credits(self):
+        transcript = transcripts.build_transcript(self.student.pk)
+        self.assertEqual([row['course_code'] for row in transcript['rows']], ['SAFE101', 'SAFE102'])
+        self.assertEqual(transcript['credits_graded'], 7)
+        # (4.00 * 4 + 2.00 * 3) / 7
+        self.assertEqual(str(transcript['gpa']), '3.14')
+
+    def test_invalidate_drops_the_cached_copy(self):
+        self.assertEqual(str(transcripts.get_transcript(self.student.pk)['gpa']), '3.14')
+        Enrollment.objects.filter(pk=self.enrollments[1].pk).update(gpa_points='4.00')
+        self.assertEqual(str(transcripts.get_transcript(self.student.pk)['gpa']), '3.14')
+        transcripts.invalidate([self.student.pk])
+        self.assertEqual(str(transcripts.get_transcript(self.student.pk)['gpa']), '4.00')
+
+
+class AssetTests(TestCase):
+    """Bundles and critical CSS (core.assets)"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.addCleanup(assets._critical.clear)
+        self.addCleanup(assets._built.clear)
+
+    def test_js_is_concatenated_unchanged(self):
+        source = os.path.join(self.directory, 'src')
+        os.makedirs(os.path.join(source, 'js'))
+        script = "var path = 'a/*b';\nvar pattern = /\\/*/;\nvar end = 'c*/';  // trailing\n"
+        with open(os.path.join(source, 'js', 'tricky.js'), 'w') as handle:
+            handle.write(script)
+        with override_settings(STATICFILES_DIRS=[source], ASSET_BUNDLES={'bundles/tricky.js': ['js/tricky.js']}):
+            self.assertEqual(assets.render('bundles/tricky.js'), script.strip() + '\n')
+
+    def test_critical_css_is_read_from_collected_files(self):
+        root = os.path.join(self.directory, 'static')
+        with override_settings(
+            STATIC_ROOT=root, ASSET_BUILD_DIR=os.path.join(self.directory, 'build'), DEBUG=False,
+            STORAGES={**settings.STORAGES, 'staticfiles': {
+                'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+            }},
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with mock.patch.object(assets, 'build') as build:
+                css = assets.critical_css('critical/student-dashboard.css')
+                assets.critical_css('critical/student-dashboard.css')
+            build.assert_not_called()
+        self.assertIn('.dashboard-header', css)
+        self.assertEqual(
+            css, assets.extract_critical(assets.render_bundle('bundles/student.css'), ['student/base.html', 'student/dashboard.html']),
+        )
+
+
+class DemoModeTests(TestCase):
+    """Demo users' requests are rolled back (core.demo)"""
+
+    def setUp(self):
+        self.demo = make_user('demo', role='admin', is_staff=True)
+        self.demo.groups.add(Group.objects.get_or_create(name=settings.DEMO_GROUP)[0])
+        self.course = make_course()
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_logout_deletes_the_session_for_good(self):
+        self.client.force_login(self.demo)
+        session_key = self.client.session.session_key
+        self.client.get(reverse('student_logout'))
+        self.assertFalse(Session.objects.filter(session_key=session_key).exists())
+
+    def test_writes_are_rolled_back(self):
+        self.client.force_login(self.demo)
+        self.client.post(reverse('student_enroll', args=[self.course.pk]))
+        self.assertFalse(Enrollment.objects.exists())
+
+    @override_settings(CURRENT_TERM='Fall 2026')
+    def test_nothing_read_in_a_demo_request_is_cached(self):
+        make_user('student')
+        self.demo.userprofile.role = 'student'
+        self.demo.userprofile.save()
+        self.client.force_login(self.demo)
+        with mock.patch.object(catalog.cache, 'set') as cache_set:
+            self.client.get(reverse('student_catalog'))
+        cache_set.assert_not_called()
+
+    def test_staff_need_real_permissions_for_tasks_and_extensions(self):
+        staff = make_user('staff', role='admin', is_staff=True)
+        self.client.force_login(staff)
+        for url in ('/admin/core/backgroundtask/add/', '/admin/core/deadlineextension/add/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 403)
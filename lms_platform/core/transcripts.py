@@ -0,0 +1,179 @@
+"""
+Transcripts and cumulative GPA.
+
+A transcript lists a student's completed enrollments across terms. The
+cumulative GPA is credit-weighted: sum(gpa_points * credits) / sum(credits)
+over enrollments that have GPA points, computed by a single aggregate query.
+Terms moved out of the database by core.archive leave their completed
+enrollments behind as ArchivedEnrollment rows, which are read alongside
+the live ones, so archiving never changes a transcript.
+Transcripts are cached per student and invalidated when enrollments are
+finalized or edited; invalidation only reaches other processes through a
+shared cache, so without Redis the cache time is kept to a minute. Batch exports stream CSV so a whole department never
+has to be held in memory.
+"""
+import csv
+import heapq
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DecimalField, ExpressionWrapper, F, Q, Sum
+
+from . import demo, metrics
+from .models import ArchivedEnrollment, Enrollment
+
+TWO_PLACES = Decimal('0.01')
+
+ROW_FIELDS = [
+    'term', 'course_code', 'course_name', 'credits', 'final_grade', 'gpa_points', 'completed',
+]
+
+
+def cache_key(user_id):
+    return f"transcript:{user_id}"
+
+
+def completed_enrollments():
+    return Enrollment.objects.filter(status='completed')
+
+
+def cumulative_gpa(points, credits):
+    if not credits:
+        return None
+    return (Decimal(points) / credits).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def _gpa_totals(queryset, credits):
+    """Credits and credit-weighted GPA points over the rows that have GPA points"""
+    graded = Q(gpa_points__isnull=False)
+    return queryset.aggregate(
+        graded_credits=Sum(credits, filter=graded),
+        points=Sum(
+            ExpressionWrapper(
+                F('gpa_points') * F(credits),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ),
+            filter=graded,
+        ),
+    )
+
+
+def _row_order(row):
+    return row['student_id'], row['completed'], row['course_code']
+
+
+def _rows(enrollments, **extra):
+    """One dict per enrollment with the transcript columns (plus ``extra``)"""
+    return enrollments.values(
+        'student_id',
+        'final_grade',
+        'gpa_points',
+        'term',
+        course_code=F('course__course_code'),
+        course_name=F('course__course_name'),
+        credits=F('course__credits'),
+        completed=F('enrollment_date'),
+        **extra,
+    )
+
+
+def _archived_rows(archived, **extra):
+    """The same columns from ArchivedEnrollment rows"""
+    return archived.values(
+        'student_id', 'final_grade', 'gpa_points', 'term', 'course_code', 'course_name', 'credits', 'completed',
+        **extra,
+    )
+
+
+def build_transcript(user_id):
+    """Transcript dict for one student, straight from the database"""
+    enrollments = completed_enrollments().filter(student_id=user_id)
+    archived = ArchivedEnrollment.objects.filter(student_id=user_id)
+    totals = [_gpa_totals(enrollments, 'course__credits'), _gpa_totals(archived, 'credits')]
+    credits = sum(total['graded_credits'] or 0 for total in totals)
+    points = sum(total['points'] or 0 for total in totals)
+    rows = sorted(
+        [*_archived_rows(archived), *_rows(enrollments)],
+        key=_row_order,
+    )
+    return {
+        'rows': rows,
+        'credits_attempted': sum(row['credits'] for row in rows),
+        'credits_graded': credits,
+        'gpa': cumulative_gpa(points, credits),
+    }
+
+
+def get_transcript(user_id):
+    """Cached transcript for one student"""
+    transcript = cache.get(cache_key(user_id))
+    metrics.record_cache('transcript', transcript is not None)
+    if transcript is None:
+        transcript = build_transcript(user_id)
+        demo.cache_set(cache, cache_key(user_id), transcript, settings.TRANSCRIPT_CACHE_TTL)
+    return transcript
+
+
+def invalidate(user_ids):
+    """Drop cached transcripts, e.g. after final grades change"""
+    cache.delete_many([cache_key(user_id) for user_id in set(user_ids)])
+
+
+class Echo:
+    """File-like object whose write() just returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(enrollments, archived=None, chunk_size=2000):
+    """
+    Yield CSV lines for every transcript touched by ``enrollments`` (or by
+    the ArchivedEnrollment queryset ``archived``).
+
+    Students are processed in chunks with one query per chunk for live and
+    one for archived rows; each student gets their full transcript followed
+    by a CUMULATIVE summary row.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(['username', 'first_name', 'last_name'] + ROW_FIELDS)
+
+    student_ids = set(enrollments.values_list('student_id', flat=True).distinct().order_by())
+    if archived is not None:
+        student_ids.update(archived.values_list('student_id', flat=True).distinct().order_by())
+    student_ids = sorted(student_ids)
+    person_fields = {
+        'username': F('student__username'),
+        'first_name': F('student__first_name'),
+        'last_name': F('student__last_name'),
+    }
+    for start in range(0, len(student_ids), chunk_size):
+        chunk = student_ids[start:start + chunk_size]
+        live = _rows(
+            completed_enrollments().filter(student_id__in=chunk)
+            .order_by('student_id', 'enrollment_date', 'course__course_code'),
+            **person_fields,
+        )
+        old = _archived_rows(
+            ArchivedEnrollment.objects.filter(student_id__in=chunk).order_by('student_id', 'completed', 'course_code'),
+            **person_fields,
+        )
+        rows = heapq.merge(old.iterator(chunk_size=chunk_size), live.iterator(chunk_size=chunk_size), key=_row_order)
+
+        current, points, credits, person = None, Decimal(0), 0, None
+        for row in rows:
+            if row['student_id'] != current:
+                if current is not None:
+                    yield writer.writerow(person + ['CUMULATIVE', '', '', credits, '', cumulative_gpa(points, credits), ''])
+                current, points, credits = row['student_id'], Decimal(0), 0
+                person = [row['username'], row['first_name'], row['last_name']]
+            if row['gpa_points'] is not None:
+                points += row['gpa_points'] * row['credits']
+                credits += row['credits']
+            yield writer.writerow(person + [
+                row['term'], row['course_code'], row['course_name'], row['credits'],
+                row['final_grade'], row['gpa_points'], row['completed'].date().isoformat(),
+            ])
+        if current is not None:
+            yield writer.writerow(person + ['CUMULATIVE', '', '', credits, '', cumulative_gpa(points, credits), ''])
@@ -1,9 +1,24 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.db.models import Prefetch
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from django.http import HttpResponseForbidden
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, HttpResponseForbidden, FileResponse, Http404
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.views.decorators.http import require_POST
 from .models import UserProfile, Enrollment, Course, Assignment, Submission
+from . import catalog, dashboard, images, media, metrics, transcripts
+from .deadlines import deadline_for
+from .decorators import profile_for, student_required
+from .enrollment import enroll
+from .forms import SubmissionForm
+from .submissions import submit
 
 def index(request):
     context = {
@@ -21,47 +36,55 @@ def student_login(request):
         user = authenticate(request, username=username, password=password)
         if user is not None:
             # Check if user has student role
-            try:
-                profile = UserProfile.objects.get(user=user)
-                if profile.role == 'student':
-                    login(request, user)
-                    return redirect('student_dashboard')
-                else:
-                    messages.error(request, 'Access denied. Student accounts only.')
-            except UserProfile.DoesNotExist:
+            profile = profile_for(user)
+            if profile is None:
                 messages.error(request, 'Student profile not found.')
+            elif profile.role == 'student':
+                login(request, user)
+                return redirect('student_dashboard')
+            else:
+                messages.error(request, 'Access denied. Student accounts only.')
+        elif getattr(request, 'login_retry_after', None):
+            messages.error(request, 'Too many login attempts. Please try again shortly.')
+            response = render(request, 'student/login.html', status=429)
+            response['Retry-After'] = request.login_retry_after
+            return response
         else:
             messages.error(request, 'Invalid username or password.')
     
     return render(request, 'student/login.html')
 
-@login_required
+@student_required
 def student_dashboard(request):
     """Student dashboard showing enrolled courses"""
-    # Check if user is a student
-    try:
-        profile = UserProfile.objects.get(user=request.user)
-        if profile.role != 'student':
-            return HttpResponseForbidden("Access denied. Students only.")
-    except UserProfile.DoesNotExist:
-        return HttpResponseForbidden("Student profile not found.")
-    
-    # Get student's enrollments and related data
+    profile = request.profile
+
+    # The dashboard covers the current term (past terms are on the
+    # transcript); filtering on term keeps each query to one partition
+    term = catalog.current_term()
     enrollments = Enrollment.objects.filter(
         student=request.user, 
-        status='active'
-    ).select_related('course', 'course__instructor')
+        status='active',
+        term=term,
+    ).select_related('course', 'course__instructor__userprofile')
     
     # Get recent assignments for enrolled courses
     enrolled_course_ids = enrollments.values_list('course_id', flat=True)
     recent_assignments = Assignment.objects.filter(
         module__course_id__in=enrolled_course_ids
+    ).select_related('module__course').prefetch_related(
+        # Only this student's submission, fetched for all rows in one query
+        Prefetch(
+            'submissions',
+            queryset=Submission.objects.filter(student=request.user, term=term),
+            to_attr='my_submissions',
+        )
     ).order_by('-created_at')[:5]
     
     # Get recent submissions by this student
     recent_submissions = Submission.objects.filter(
-        student=request.user
-    ).order_by('-submission_date')[:5]
+        student=request.user, term=term
+    ).select_related('assignment__module__course').order_by('-submission_date')[:5]
     
     context = {
         'profile': profile,
@@ -69,14 +92,181 @@ def student_dashboard(request):
         'recent_assignments': recent_assignments,
         'recent_submissions': recent_submissions,
         'total_courses': enrollments.count(),
-        'total_submissions': Submission.objects.filter(student=request.user).count(),
-        'graded_submissions': Submission.objects.filter(student=request.user, status='graded').count(),
+        'today': timezone.now(),
+        **dashboard.get_stats(request.user.pk, term),
     }
     
     return render(request, 'student/dashboard.html', context)
 
+def _enrolled_assignment(user, assignment_id):
+    """The assignment, if ``user`` is actively enrolled in its course"""
+    assignment = get_object_or_404(Assignment.objects.select_related('module__course'), pk=assignment_id)
+    course = assignment.module.course
+    # Looked up with the course's term so only its partition is read
+    enrolled = Enrollment.objects.filter(student=user, course=course, term=course.term, status='active').exists()
+    if not enrolled:
+        raise Http404("No Assignment matches the given query.")
+    return assignment
+
+
+def _own_submission(user, assignment):
+    """``user``'s submission for ``assignment``, read from its term's partition"""
+    return Submission.objects.filter(
+        student=user, assignment=assignment, term=assignment.module.course.term,
+    ).first()
+
+def _assignment_context(request, profile, assignment, submission, form):
+    return {
+        'profile': profile,
+        'assignment': assignment,
+        'deadline': deadline_for(assignment, request.user.pk),
+        'now': timezone.now(),
+        'submission': submission,
+        'form': form,
+    }
+
+@student_required
+def student_assignment(request, assignment_id):
+    """Assignment details with the student's current submission"""
+    profile = request.profile
+
+    assignment = _enrolled_assignment(request.user, assignment_id)
+    submission = _own_submission(request.user, assignment)
+    context = _assignment_context(request, profile, assignment, submission, SubmissionForm())
+    return render(request, 'student/assignment.html', context)
+
+@student_required
+@require_POST
+def student_submit(request, assignment_id):
+    """Submit (or resubmit) work for an assignment"""
+    profile = request.profile
+
+    assignment = _enrolled_assignment(request.user, assignment_id)
+    submission = _own_submission(request.user, assignment)
+    if submission and submission.status == 'graded':
+        messages.error(request, 'This assessment has already been graded and can no longer be changed.')
+        return redirect('student_assignment', assignment_id=assignment.pk)
+
+    form = SubmissionForm(request.POST, request.FILES)
+    if not form.is_valid():
+        context = _assignment_context(request, profile, assignment, submission, form)
+        return render(request, 'student/assignment.html', context, status=400)
+
+    submission = submit(
+        request.user,
+        assignment,
+        content=form.cleaned_data['submission_content'],
+        file=form.cleaned_data['file_upload'],
+    )
+    if submission.is_late:
+        messages.warning(request, 'Your work was submitted after the deadline and is marked late.')
+    else:
+        messages.success(request, 'Your work has been submitted.')
+    return redirect('student_assignment', assignment_id=assignment.pk)
+
+@student_required
+def student_transcript(request):
+    """Completed training across all terms with cumulative GPA"""
+    profile = request.profile
+
+    context = {
+        'profile': profile,
+        'transcript': transcripts.get_transcript(request.user.pk),
+    }
+    return render(request, 'student/transcript.html', context)
+
+@student_required
+def student_catalog(request):
+    """Courses open for self-enrollment in the current term"""
+    profile = request.profile
+
+    term = catalog.current_term()
+    statuses = catalog.enrollment_status(request.user, term)
+    courses = [
+        {**course, 'enrollment_status': statuses.get(course['id'])}
+        for course in catalog.get_listing(term)
+    ]
+    context = {
+        'profile': profile,
+        'term': term,
+        'courses': courses,
+    }
+    return render(request, 'student/catalog.html', context)
+
+@student_required
+@require_POST
+def student_enroll(request, course_id):
+    """Enroll in a catalog course, or join its waitlist when it is full"""
+    profile = request.profile
+
+    course = get_object_or_404(Course, pk=course_id, term=catalog.current_term())
+    enrollment = enroll(request.user, course)
+    if enrollment.status == 'active':
+        messages.success(request, f'You are enrolled in {course.course_code}.')
+    elif enrollment.status == 'waitlisted':
+        messages.warning(request, f'{course.course_code} is full. You have been added to the waitlist.')
+    else:
+        messages.info(request, f'You have already completed {course.course_code}.')
+    return redirect('student_catalog')
+
 def student_logout(request):
     """Student logout view"""
     logout(request)
     messages.success(request, 'You have been logged out successfully.')
-    return redirect('student_login')
\ No newline at end of file
+    return redirect('student_login')
+
+
+@login_required
+def profile_picture_variant(request, profile_id, size, ext):
+    """Serve a resized profile picture, rendering it on first request"""
+    if size not in settings.PROFILE_PICTURE_SIZES or ext not in images.VARIANT_FORMATS:
+        raise Http404("Unknown picture size.")
+
+    profile = get_object_or_404(UserProfile, pk=profile_id)
+    if not profile.profile_picture:
+        raise Http404("No profile picture.")
+
+    try:
+        name = images.ensure_variant(profile.profile_picture.name, size, ext)
+    except TimeoutError:
+        response = HttpResponse("Picture is still being resized.", status=503, content_type='text/plain')
+        response['Retry-After'] = settings.IMAGE_VARIANT_TIMEOUT
+        add_never_cache_headers(response)
+        return response
+    if name is None:
+        raise Http404("Picture could not be read.")
+    content_type = 'image/webp' if ext == 'webp' else 'image/jpeg'
+    response = FileResponse(default_storage.open(name, 'rb'), content_type=content_type)
+    patch_cache_control(response, private=True, max_age=86400)
+    return response
+
+
+def protected_media(request, path):
+    """Serve an uploaded file after checking the requester may see it"""
+    path = media.clean_name(path)
+    if path is None:
+        raise Http404("File not found.")
+    if not media.can_access(request.user, path):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return HttpResponseForbidden("You do not have access to this file.")
+    try:
+        response = media.serve(request, path)
+    except (FileNotFoundError, SuspiciousFileOperation):
+        raise Http404("File not found.")
+    # Uploads are per-user; never let shared caches keep them
+    patch_cache_control(response, private=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint: bearer token, staff session, or DEBUG without a token"""
+    if settings.METRICS_TOKEN:
+        allowed = constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+        )
+    else:
+        allowed = settings.DEBUG
+    if not (allowed or request.user.is_staff):
+        return HttpResponseForbidden("Invalid metrics token.")
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -11,9 +11,12 @@ https://docs.djangoproject.com/en/5.0/topics/settings/
 """
 
 import os
+import tempfile
+from importlib.util import find_spec
 from pathlib import Path
 from decouple import config
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,7 +41,9 @@ if 'CODESPACE_NAME' in os.environ:
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    # No autodiscover: core.admin is imported by urls.py, the only place the
+    # (custom) admin site is used
+    "django.contrib.admin.apps.SimpleAdminConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes", 
     "django.contrib.sessions",
@@ -48,13 +53,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "lms_platform.core.middleware.HealthCheckMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "lms_platform.core.middleware.MetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware", 
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "lms_platform.core.middleware.DemoModeMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
@@ -66,7 +74,6 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "lms_platform" / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -74,10 +81,28 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
             ],
+            # Compiled templates are kept per process (the dev server's
+            # autoreloader clears them when a template changes). gunicorn
+            # warms them in the master before forking (startup.warm via
+            # gunicorn.conf.py); `manage.py warm_templates` only checks that
+            # every template compiles and reports timings.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
         },
     },
 ]
 
+# Log template renders slower than this (ms) and collect per-template
+# render times; 0 disables the timing wrapper
+TEMPLATE_SLOW_RENDER_MS = config("TEMPLATE_SLOW_RENDER_MS", default=0, cast=int)
+
 WSGI_APPLICATION = "lms_platform.wsgi.application"
 
 
@@ -100,6 +125,113 @@ DATABASES = {
     )
 }
 
+# Cache: any Redis-protocol server (Redis, Valkey, KeyDB, ...) when REDIS_URL
+# is set, otherwise a per-process in-memory cache. Sessions get their own
+# alias so they can be pointed at a separate database or server. Login
+# throttle counters must be seen by every worker, so without Redis they go
+# to a file cache in LOGIN_THROTTLE_DIR, shared by the processes on one host.
+REDIS_URL = config('REDIS_URL', default='')
+SESSION_REDIS_URL = config('SESSION_REDIS_URL', default=REDIS_URL)
+LOGIN_THROTTLE_DIR = config('LOGIN_THROTTLE_DIR', default=os.path.join(tempfile.gettempdir(), 'lms-logins'))
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'lms',
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': SESSION_REDIS_URL,
+            'KEY_PREFIX': 'lms-session',
+        },
+        'logins': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'lms',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lms',
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lms-sessions',
+        },
+        'logins': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': LOGIN_THROTTLE_DIR,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+
+# Sessions: "cached_db" reads from the cache and only touches the database
+# on writes, "cache" never touches the database, "signed_cookies" keeps the
+# session in the client's cookie, "db" is Django's default. Both cache-backed
+# engines need a cache every process shares (REDIS_URL): with the in-memory
+# one, a session logged out in one gunicorn worker would stay valid in the
+# others. "cached_db" is the default when Redis is configured, "db" otherwise.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = config('SESSION_BACKEND', default='cached_db' if SESSION_REDIS_URL else 'db')
+if SESSION_BACKEND not in SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND must be one of {', '.join(SESSION_ENGINES)}, not {SESSION_BACKEND!r}"
+    )
+if SESSION_BACKEND in ('cached_db', 'cache') and not SESSION_REDIS_URL:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND={SESSION_BACKEND} needs a cache shared by every process; set REDIS_URL "
+        f"(or SESSION_REDIS_URL) or use db or signed_cookies"
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Flash messages travel in a cookie instead of writing to the session
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Logins are throttled and hashing is bounded (core/logins.py, core/backends.py)
+AUTHENTICATION_BACKENDS = ['lms_platform.core.backends.ThrottledModelBackend']
+LOGIN_THROTTLE_WINDOW = config('LOGIN_THROTTLE_WINDOW', default=300, cast=int)  # seconds
+LOGIN_IP_LIMIT = config('LOGIN_IP_LIMIT', default=50, cast=int)  # failures per window
+LOGIN_USERNAME_LIMIT = config('LOGIN_USERNAME_LIMIT', default=10, cast=int)
+LOGIN_TRUSTED_PROXIES = config('LOGIN_TRUSTED_PROXIES', default=0, cast=int)  # X-Forwarded-For hops
+LOGIN_HASH_CONCURRENCY = config('LOGIN_HASH_CONCURRENCY', default=os.cpu_count() or 4, cast=int)
+LOGIN_HASH_WAIT = 5  # seconds to wait for a hashing slot before refusing
+
+# Password hashing: "argon2" (needs argon2-cffi, the default when installed)
+# or "pbkdf2". Both remain able to verify the other's hashes, and users are
+# rehashed with the preferred hasher and cost on their next login.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='argon2' if find_spec('argon2') else 'pbkdf2')
+PASSWORD_HASHER_CLASSES = {
+    'argon2': 'lms_platform.core.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'lms_platform.core.hashers.TunedPBKDF2PasswordHasher',
+}
+if PASSWORD_HASHER not in PASSWORD_HASHER_CLASSES:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER must be one of {', '.join(PASSWORD_HASHER_CLASSES)}, not {PASSWORD_HASHER!r}"
+    )
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=1000000, cast=int)
+# Argon2id defaults follow the OWASP baseline (19 MiB, 2 passes, 1 lane)
+# rather than Django's 100 MiB, so hundreds of concurrent logins fit in memory
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=19456, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=1, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -136,16 +268,140 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Hashed names plus .gz and .br copies written at collectstatic time
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 STATICFILES_DIRS = [
     BASE_DIR / "lms_platform" / "static",
 ]
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'lms_platform.core.assets.BundleFinder',
+]
+
+# Concatenated bundles, CSS minified (core/assets.py), built into ASSET_BUILD_DIR
+ASSET_BUILD_DIR = BASE_DIR / 'build' / 'assets'
+ASSET_BUNDLES = {
+    'bundles/site.css': ['css/modern-lms.css', 'css/dropdown-navigation.css'],
+    'bundles/student.css': ['css/modern-lms.css', 'css/student-styles.css'],
+    'bundles/admin.css': ['css/modern-lms.css', 'css/admin-styles.css'],
+    'bundles/site.js': ['js/modern-lms.js', 'js/dropdown-navigation.js'],
+}
+# Critical CSS files: (bundle, templates of the page), built and collected
+# with the bundles and inlined by {% critical_css %}
+ASSET_CRITICAL = {
+    'critical/student-dashboard.css': ('bundles/student.css', ['student/base.html', 'student/dashboard.html']),
+}
+# Hashed files are served with "max-age=315360000, immutable"; this covers the rest
+WHITENOISE_MAX_AGE = 60 * 60
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media is always served through core.views.protected_media. Set to 'nginx'
+# (X-Accel-Redirect) or 'xsendfile' (Apache/lighttpd) when a front server can
+# take over the byte transfer; empty streams the file from Django.
+MEDIA_SENDFILE_BACKEND = config('MEDIA_SENDFILE_BACKEND', default='')
+# nginx: location /protected-media/ { internal; alias /path/to/media/; }
+MEDIA_ACCEL_REDIRECT_PREFIX = config('MEDIA_ACCEL_REDIRECT_PREFIX', default='/protected-media/')
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+
+# Profile picture variants (see core/images.py), name -> square size in pixels
+PROFILE_PICTURE_SIZES = {
+    'thumb': 48,
+    'small': 96,
+    'medium': 256,
+}
+IMAGE_VARIANT_QUALITY = config('IMAGE_VARIANT_QUALITY', default=80, cast=int)
+IMAGE_VARIANT_WORKERS = config('IMAGE_VARIANT_WORKERS', default=2, cast=int)
+IMAGE_VARIANT_TIMEOUT = config('IMAGE_VARIANT_TIMEOUT', default=10, cast=int)  # seconds
+
+# Background task queue (core/queue.py, run with `manage.py run_worker`)
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_BACKOFF = 30  # seconds before the first retry, doubled each attempt
+TASK_MAX_BACKOFF = 60 * 60
+TASK_LOCK_TIMEOUT = 15 * 60  # running tasks older than this are requeued
+TASK_REQUEUE_INTERVAL = 60  # seconds between each worker's sweeps for stale tasks
+
+# Due date reminders (core/reminders.py, run with `manage.py send_due_reminders`)
+REMINDER_WINDOWS = [int(hours) for hours in config('REMINDER_WINDOWS', default='72,24,2').split(',')]
+REMINDER_BACKEND = config('REMINDER_BACKEND', default='lms_platform.core.reminders.ConsoleBackend')
+REMINDER_FILE_PATH = config('REMINDER_FILE_PATH', default=str(BASE_DIR / 'reminders.log'))
+REMINDER_BATCH_SIZE = 1000
+
+# Minimum course percentage -> GPA points, used when finalizing a term
+GPA_SCALE = [
+    (93, '4.00'), (90, '3.70'), (87, '3.30'), (83, '3.00'), (80, '2.70'), (77, '2.30'),
+    (73, '2.00'), (70, '1.70'), (67, '1.30'), (63, '1.00'), (60, '0.70'), (0, '0.00'),
+]
+
+# Cached per-student transcripts, dropped when final grades change. The drop
+# only reaches every worker through a shared cache; with the per-process one
+# a worker can serve a stale transcript until its copy expires, so keep it short
+TRANSCRIPT_CACHE_TTL = config('TRANSCRIPT_CACHE_TTL', default=60 * 60 * 24 if REDIS_URL else 60, cast=int)
+
+# Submission history stores deltas, with a full snapshot every N versions
+SUBMISSION_SNAPSHOT_INTERVAL = 10
+
+# Similarity detection: MinHash signatures of word shingles, indexed with
+# LSH bands. 32 bands of 4 rows make pairs above ~0.45 Jaccard likely
+# candidates; only pairs at or above SIMILARITY_THRESHOLD are reported.
+SIMILARITY_SHINGLE_SIZE = 5  # words per shingle
+SIMILARITY_NUM_PERM = 128
+SIMILARITY_BANDS = 32
+SIMILARITY_MIN_WORDS = 50  # shorter answers are not indexed
+SIMILARITY_THRESHOLD = config('SIMILARITY_THRESHOLD', default=0.5, cast=float)
+
+# Cached submission counts on the student dashboard
+DASHBOARD_CACHE_TTL = 60 * 5
+
+# Self-service course catalog. CURRENT_TERM defaults to the newest term.
+CURRENT_TERM = config('CURRENT_TERM', default='')
+CATALOG_CACHE_TTL = config('CATALOG_CACHE_TTL', default=30, cast=int)  # seconds
+
+# Admin changelists: PostgreSQL row estimates replace COUNT(*) above this
+# many rows, and list_filter choices are cached for this many seconds
+ADMIN_COUNT_ESTIMATE_THRESHOLD = config('ADMIN_COUNT_ESTIMATE_THRESHOLD', default=100000, cast=int)
+ADMIN_FILTER_CACHE_TTL = 60 * 5
+
+# /metrics (core/metrics.py). Scrapes must send "Authorization: Bearer
+# <METRICS_TOKEN>"; signed-in staff can always look. Without a token the
+# endpoint is closed to everyone else unless DEBUG is on. Database gauges
+# are cached for METRICS_GAUGE_TTL seconds and also feed the admin index counts.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_GAUGE_TTL = config('METRICS_GAUGE_TTL', default=30, cast=int)
+METRICS_LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+# Each process's request counters are written here and summed on scrape, so
+# every gunicorn worker reports the same totals; empty keeps them per process
+METRICS_DIR = config('METRICS_DIR', default=os.path.join(tempfile.gettempdir(), 'lms-metrics'))
+METRICS_FLUSH_INTERVAL = 1  # seconds
+
+# Health checks (core/health.py): liveness never leaves memory, readiness
+# probes the database, caches and media storage and reuses the result for
+# HEALTH_CACHE_TTL seconds
+HEALTH_LIVENESS_PATH = '/healthz'
+HEALTH_READINESS_PATH = '/readyz'
+HEALTH_PROBE_TIMEOUT = config('HEALTH_PROBE_TIMEOUT', default=2.0, cast=float)  # seconds
+HEALTH_CACHE_TTL = config('HEALTH_CACHE_TTL', default=5, cast=int)  # seconds
+
+# Members of this group browse and use everything, but every request they
+# make is rolled back (core/demo.py)
+DEMO_GROUP = 'Demo'
+
+# Archived terms (core/archive.py, run with `manage.py archive_term`):
+# gzipped CSV exports of their enrollments, submissions and revisions
+ARCHIVE_ROOT = config('ARCHIVE_ROOT', default=str(BASE_DIR / 'archive'))
+ARCHIVE_BATCH_SIZE = 2000
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -2,7 +2,7 @@
 URL configuration for lms_platform project.
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -18,8 +18,29 @@ urlpatterns = [
     path("student/", core_views.student_dashboard, name='student_dashboard'),
     path("student/login/", core_views.student_login, name='student_login'),
     path("student/logout/", core_views.student_logout, name='student_logout'),
+    path("student/assignments/<int:assignment_id>/", core_views.student_assignment, name='student_assignment'),
+    path("student/assignments/<int:assignment_id>/submit/", core_views.student_submit, name='student_submit'),
+    path("student/transcript/", core_views.student_transcript, name='student_transcript'),
+    path("student/catalog/", core_views.student_catalog, name='student_catalog'),
+    path("student/catalog/<int:course_id>/enroll/", core_views.student_enroll, name='student_enroll'),
+
+    # Prometheus metrics
+    path("metrics", core_views.metrics_view, name='metrics'),
+
+    # Resized profile pictures, rendered on first request
+    path(
+        "profile-pictures/<int:profile_id>/<str:size>.<str:ext>",
+        core_views.profile_picture_variant,
+        name='profile_picture_variant',
+    ),
+
+    # Uploaded media, permission-checked in every environment
+    re_path(
+        r"^%s(?P<path>.+)$" % settings.MEDIA_URL.lstrip('/'),
+        core_views.protected_media,
+        name='protected_media',
+    ),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file